@@ -2,10 +2,12 @@
 Cliente de API para integração com o backend Flask
 Baseado no api.js do projeto web
 """
+import copy
 import requests
 import json
 import os
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, Callable
 
 try:
     from config import FLASK_BASE_URL, API_URL_BASE, ADMIN_USER
@@ -31,6 +33,8 @@ class ApiClient:
             'Content-Type': 'application/json',
         }
         self.token_file = os.path.join(os.path.expanduser('~'), '.helpwave_token')
+        # Última resposta de cada GET com ETag: em um 304 o backend não reenvia o corpo
+        self._etags: Dict[str, tuple] = {}
     
     def get_auth_token(self) -> Optional[str]:
         """Obtém o token de autenticação salvo"""
@@ -52,6 +56,7 @@ class ApiClient:
     
     def clear_auth_token(self):
         """Remove o token de autenticação"""
+        self._etags.clear()
         try:
             if os.path.exists(self.token_file):
                 os.remove(self.token_file)
@@ -105,13 +110,20 @@ class ApiClient:
     
     def get(self, endpoint: str, include_auth: bool = True) -> Dict[str, Any]:
         """Faz uma requisição GET - EXATAMENTE como no web (api.js get method)"""
+        url = f"{self.base_url}{endpoint}"
+        headers = self.get_headers(include_auth)
+        anterior = self._etags.get(url)
+        if anterior:
+            headers['If-None-Match'] = anterior[0]
         try:
-            response = requests.get(
-                f"{self.base_url}{endpoint}",
-                headers=self.get_headers(include_auth),
-                timeout=10
-            )
-            return self.handle_response(response)
+            response = requests.get(url, headers=headers, timeout=10)
+            if response.status_code == 304 and anterior:
+                return copy.deepcopy(anterior[1])
+            data = self.handle_response(response)
+            etag = response.headers.get('ETag')
+            if etag:
+                self._etags[url] = (etag, copy.deepcopy(data))
+            return data
         except requests.exceptions.ConnectionError:
             raise Exception('Erro de conexão. Verifique se o servidor está rodando.')
         except requests.exceptions.Timeout:
@@ -289,6 +301,13 @@ class UserService:
                     return user
             except ImportError:
                 pass
+            # Fallback: busca só este usuário pelo backend Flask (cache), sem baixar a lista
+            try:
+                users = UserService.get_users_batch([user_id]).get('usuarios') or []
+                if users:
+                    return users[0]
+            except Exception:
+                pass
             # Fallback: busca todos e filtra (igual ao web)
             try:
                 all_data = UserService.get_users()
@@ -309,6 +328,16 @@ class UserService:
                 pass
             raise Exception(f'Usuário {user_id} não encontrado')
     
+    @staticmethod
+    def get_users_batch(user_ids: list) -> Dict[str, Any]:
+        """
+        Obtém vários usuários em uma requisição - backend Flask: POST /api/Usuarios/batch
+        
+        Returns:
+            dict: {'usuarios': [...], 'naoEncontrados': [...], 'falhas': [...]}
+        """
+        return _post_flask_batch('/api/Usuarios/batch', user_ids, 'usuários')
+    
     @staticmethod
     def update_user(user_id: int, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Atualiza dados do usuário - API .NET: PUT /api/Usuarios/{id}"""
@@ -450,6 +479,44 @@ class TicketService:
                 return get_mock_ticket(ticket_id)
             raise
     
+    @staticmethod
+    def get_tickets_batch(ticket_ids: list) -> Dict[str, Any]:
+        """
+        Obtém vários tickets em uma requisição - backend Flask: POST /chamados/batch
+        
+        Returns:
+            dict: {'chamados': [...], 'naoEncontrados': [...], 'falhas': [...]}
+        """
+        return _post_flask_batch('/chamados/batch', ticket_ids, 'chamados')
+    
+    @staticmethod
+    def bulk_update_tickets(updates: list) -> Dict[str, Any]:
+        """
+        Atualiza vários tickets de uma vez - backend Flask: PUT /chamados/bulk
+        
+        Args:
+            updates: Lista de {'id': ..., 'fields': {...}} (ex: status 3 e solucao para fechar)
+        
+        Returns:
+            dict: {'atualizados', 'falhas', 'resultados': [{'id', 'status', 'chamado' ou 'message'}]}
+        
+        Raises:
+            Exception: Se algum item for inválido (nada é atualizado) ou o backend não responder
+        """
+        flask_base_url = 'http://localhost:5000'
+        try:
+            response = requests.put(f'{flask_base_url}/chamados/bulk', json={'chamados': updates},
+                                    headers=api_client.get_headers(), timeout=60)
+        except requests.exceptions.RequestException as e:
+            raise Exception(f'Backend Flask indisponível em {flask_base_url}: {e}')
+        data = response.json() if response.content else {}
+        if response.status_code == 400:
+            erros = '; '.join(f"{e.get('id')}: {e.get('message')}" for e in data.get('erros', []))
+            raise Exception(f"{data.get('message', 'Itens inválidos')} {erros}".strip())
+        if not response.ok:
+            raise Exception(data.get('message') or f'Erro HTTP {response.status_code} ao atualizar tickets em lote')
+        return data
+    
     @staticmethod
     def update_ticket(ticket_id: int, ticket_data: Dict[str, Any]) -> Dict[str, Any]:
         """Atualiza um ticket - API .NET: PUT /api/Chamados/{id}"""
@@ -497,6 +564,92 @@ class TicketService:
             raise
 
 
+def _post_flask_batch(path: str, ids: list, nome: str) -> Dict[str, Any]:
+    """POST {'ids': [...]} nas rotas de lote do backend Flask (localhost:5000)"""
+    flask_base_url = 'http://localhost:5000'
+    try:
+        response = requests.post(f'{flask_base_url}{path}', json={'ids': list(ids)},
+                                 headers=api_client.get_headers(), timeout=30)
+    except requests.exceptions.RequestException as e:
+        raise Exception(f'Backend Flask indisponível em {flask_base_url}: {e}')
+    if not response.ok:
+        raise Exception(f'Erro HTTP {response.status_code} ao buscar {nome} em lote')
+    return response.json()
+
+
+class TicketChangeFeed:
+    """
+    Cópia local dos tickets atualizada por deltas do backend Flask (GET /chamados/changes).
+    
+    A primeira chamada a poll() traz a lista completa; as seguintes trazem só
+    os tickets criados ou alterados (e os IDs removidos) desde a última versão.
+    """
+    
+    def __init__(self, flask_base_url: str = 'http://localhost:5000'):
+        self.flask_base_url = flask_base_url
+        self.version: Optional[int] = None
+        self.tickets: Dict[Any, Dict[str, Any]] = {}
+    
+    def poll(self) -> list:
+        """
+        Aplica as mudanças desde a última consulta.
+        
+        Returns:
+            list: Tickets criados ou alterados nesta consulta (todos, na primeira)
+        
+        Raises:
+            Exception: Se o backend Flask não responder ou retornar erro
+        """
+        url = f'{self.flask_base_url}/chamados/changes'
+        if self.version is not None:
+            url = f'{url}?since={self.version}'
+        try:
+            response = requests.get(url, headers=api_client.get_headers(), timeout=15)
+        except requests.exceptions.RequestException as e:
+            raise Exception(f'Backend Flask indisponível em {self.flask_base_url}: {e}')
+        if not response.ok:
+            raise Exception(f'Erro HTTP {response.status_code} ao buscar mudanças dos chamados')
+        
+        delta = response.json()
+        if delta.get('completo'):
+            self.tickets = {}
+        for ticket_id in delta.get('removidos') or []:
+            self.tickets.pop(ticket_id, None)
+        changed = delta.get('chamados') or []
+        for ticket in changed:
+            self.tickets[ticket.get('id')] = ticket
+        self.version = delta.get('versao')
+        return changed
+    
+    def get_tickets(self) -> list:
+        """Tickets da cópia local, na ordem de ID"""
+        return [self.tickets[k] for k in sorted(self.tickets, key=lambda k: (k is None, k or 0))]
+
+
+class StatsService:
+    """Agregados dos relatórios calculados pelo backend Flask (GET /api/stats)"""
+    
+    @staticmethod
+    def get_stats() -> Dict[str, Any]:
+        """
+        Obtém totais de chamados (por status, prioridade, tipo, técnico e tempo de
+        resolução) e de usuários por permissão, sem baixar as listas completas.
+        
+        Raises:
+            Exception: Se o backend Flask não responder ou retornar erro
+        """
+        # O endpoint está no backend Flask (localhost:5000), não na API .NET
+        flask_base_url = 'http://localhost:5000'
+        headers = api_client.get_headers()
+        try:
+            response = requests.get(f'{flask_base_url}/api/stats', headers=headers, timeout=15)
+        except requests.exceptions.RequestException as e:
+            raise Exception(f'Backend Flask indisponível em {flask_base_url}: {e}')
+        if not response.ok:
+            raise Exception(f'Erro HTTP {response.status_code} ao obter estatísticas')
+        return response.json()
+
+
 class AIService:
     """Serviço para integração com IA (Gemini) - igual ao web"""
     
@@ -537,6 +690,15 @@ class AIService:
                 else:
                     data = {'message': 'Erro interno do servidor.'}
             
+            if response.status_code == 202 and data.get('jobId'):
+                # Geração demorada: o backend devolve o jobId e o resultado é consultado depois
+                data = AIService.aguardar_tarefa(flask_base_url, data['jobId'])
+                if data.get('status') == 'erro':
+                    error = Exception(data.get('erro') or 'Erro ao gerar sugestão')
+                    error.status_code = data.get('codigo') or 500
+                    error.data = data
+                    raise error
+            
             if not response.ok:
                 # Cria erro com status_code e data (igual ao web)
                 error = Exception(data.get('erro') or data.get('message', 'Erro na requisição'))
@@ -572,6 +734,114 @@ class AIService:
             raise error
 
 
+    @staticmethod
+    def gerar_sugestao_stream(titulo: str, descricao: str,
+                              on_trecho: Callable[[str], None]) -> Dict[str, Any]:
+        """
+        Gera a sugestão recebendo o texto aos poucos (POST /api/gemini/sugerir-resposta/stream).
+        
+        on_trecho(texto) é chamado a cada trecho recebido (na thread de quem chama),
+        então o texto aparece na tela enquanto o Gemini ainda está gerando.
+        Se o backend não tiver a rota de stream, usa gerar_sugestao.
+        
+        Returns:
+            dict: {'sugestao': texto completo}, como gerar_sugestao
+        """
+        flask_base_url = 'http://localhost:5000'
+        
+        try:
+            # Timeout de leitura entre trechos (o servidor envia keepalive enquanto espera na fila)
+            response = requests.post(
+                f'{flask_base_url}/api/gemini/sugerir-resposta/stream',
+                json={
+                    'titulo': titulo or '',
+                    'descricao': descricao
+                },
+                headers={
+                    'Content-Type': 'application/json',
+                    'Accept': 'text/event-stream'
+                },
+                timeout=(5, 60),
+                stream=True
+            )
+        except requests.exceptions.RequestException:
+            # Erros de conexão/timeout tratados (e formatados) pelo caminho sem stream
+            return AIService.gerar_sugestao(titulo, descricao)
+        
+        with response:
+            if response.status_code in (404, 405):
+                # Backend sem a rota de stream
+                return AIService.gerar_sugestao(titulo, descricao)
+            
+            if not response.headers.get('Content-Type', '').startswith('text/event-stream'):
+                # Erros antes do stream (validação, fila cheia) vêm em JSON
+                try:
+                    data = response.json()
+                except ValueError:
+                    data = {'erro': 'Erro interno do servidor.'}
+                error = Exception(data.get('erro') or data.get('message', 'Erro na requisição'))
+                error.status_code = response.status_code
+                error.data = data
+                raise error
+            
+            evento, dados = None, []
+            try:
+                for linha in response.iter_lines(decode_unicode=True):
+                    if linha is None:
+                        continue
+                    if linha.startswith('event:'):
+                        evento = linha[len('event:'):].strip()
+                    elif linha.startswith('data:'):
+                        dados.append(linha[len('data:'):].strip())
+                    elif linha == '' and evento:
+                        # Linha em branco fecha o evento
+                        data = json.loads('\n'.join(dados)) if dados else {}
+                        if evento == 'trecho':
+                            on_trecho(data.get('texto', ''))
+                        elif evento == 'fim':
+                            return data
+                        elif evento == 'erro':
+                            error = Exception(data.get('erro') or 'Erro ao gerar sugestão')
+                            error.status_code = data.get('codigo') or 500
+                            error.data = data
+                            raise error
+                        evento, dados = None, []
+            except requests.exceptions.RequestException as e:
+                error = Exception(f'Conexão interrompida durante a geração da sugestão: {e}')
+                error.status_code = 0
+                error.data = {'erro': 'Conexão interrompida durante a geração da sugestão. Tente novamente.'}
+                raise error
+        
+        error = Exception('Geração da sugestão interrompida pelo servidor.')
+        error.status_code = 0
+        error.data = {'erro': 'Geração da sugestão interrompida pelo servidor. Tente novamente.'}
+        raise error
+
+    @staticmethod
+    def aguardar_tarefa(flask_base_url: str, job_id: str, limite: float = 300) -> Dict[str, Any]:
+        """
+        Consulta GET /api/gemini/jobs/<id> até a tarefa terminar.
+        
+        Cada consulta espera até 20s no servidor (?wait=20), então não há
+        consultas repetidas enquanto a sugestão é gerada.
+        
+        Returns:
+            dict: Estado final da tarefa ('sugestao' quando concluída, 'erro' em falhas)
+        """
+        prazo = time.monotonic() + limite
+        while True:
+            response = requests.get(f'{flask_base_url}/api/gemini/jobs/{job_id}',
+                                    params={'wait': 20}, timeout=30)
+            if response.status_code == 404:
+                raise Exception('Tarefa de sugestão expirada. Tente gerar novamente.')
+            response.raise_for_status()
+            data = response.json()
+            if data.get('status') in ('concluida', 'erro'):
+                return data
+            if time.monotonic() >= prazo:
+                raise requests.exceptions.Timeout('Sugestão ainda em geração; tente novamente mais tarde.')
+
+
 def _gerar_sugestao_mock(titulo: str, descricao: str) -> Dict[str, Any]:
     """Gera uma sugestão mock quando a API do Gemini não estiver disponível"""
     descricao_lower = descricao.lower()
@@ -4,7 +4,7 @@ ReportsPage - Replica ReportsPage.jsx do web
 import tkinter as tk
 import customtkinter as ctk
 from pages.base_page import BasePage
-from api_client import TicketService, UserService, AIService, api_client
+from api_client import TicketService, UserService, AIService, StatsService, api_client
 from config import COLORS
 import threading
 import requests
@@ -375,40 +375,65 @@ class ReportsPage(BasePage):
         self.loading = True
         threading.Thread(target=self._do_load_reports, daemon=True).start()
     
-    def _do_load_reports(self):
-        """Faz carregamento"""
-        try:
-            # Busca tickets
-            tickets = TicketService.get_tickets()
-            
-            total_chamados = len(tickets) if tickets else 0
+    def _load_totals_from_stats(self):
+        """Totais calculados pelo backend (GET /api/stats), sem baixar as listas"""
+        stats = StatsService.get_stats()
+        chamados = stats.get('chamados') or {}
+        por_status = chamados.get('porStatus') or {}
+        usuarios = stats.get('usuarios') or {}
+        por_permissao = usuarios.get('porPermissao') or {}
+        return {
+            'totalChamados': chamados.get('total', 0),
             # Status 3 = Fechado (concluído/resolvido) - como na versão web
-            chamados_resolvidos = len([t for t in (tickets or []) if t.get('status') == 3])
+            'chamadosResolvidos': por_status.get('fechado', 0),
             # Status 1 e 2 = Aberto e Em Atendimento (em andamento) - como na versão web
-            chamados_em_andamento = len([t for t in (tickets or []) if t.get('status') in [1, 2]])
-            
-            # Busca usuários
-            usuarios_por_nivel = {
+            'chamadosEmAndamento': por_status.get('aberto', 0) + por_status.get('emAtendimento', 0),
+            'totalUsuarios': usuarios.get('total', 0),
+            'usuariosPorNivel': {
+                'colaboradores': por_permissao.get('colaborador', 0),
+                'suporteTecnico': por_permissao.get('suporte', 0),
+                'administradores': por_permissao.get('admin', 0)
+            }
+        }
+    
+    def _load_totals_from_lists(self):
+        """Alternativa sem o backend Flask: conta a partir das listas completas"""
+        tickets = TicketService.get_tickets() or []
+        totais = {
+            'totalChamados': len(tickets),
+            'chamadosResolvidos': len([t for t in tickets if t.get('status') == 3]),
+            'chamadosEmAndamento': len([t for t in tickets if t.get('status') in [1, 2]]),
+            'totalUsuarios': 0,
+            'usuariosPorNivel': {
                 'colaboradores': 0,
                 'suporteTecnico': 0,
                 'administradores': 0
             }
-            total_usuarios = 0
-            
+        }
+        
+        try:
+            users = UserService.get_users()
+            if isinstance(users, dict):
+                users = users.get('usuarios') or []
+            if users:
+                totais['totalUsuarios'] = len(users)
+                niveis = {1: 'colaboradores', 2: 'suporteTecnico', 3: 'administradores'}
+                for user in users:
+                    nivel = niveis.get(user.get('permissao', 1))
+                    if nivel:
+                        totais['usuariosPorNivel'][nivel] += 1
+        except Exception as e:
+            print(f"Erro ao carregar usuários: {e}")
+        return totais
+    
+    def _do_load_reports(self):
+        """Faz carregamento"""
+        try:
             try:
-                users = UserService.get_users()
-                if users:
-                    total_usuarios = len(users)
-                    for user in users:
-                        permissao = user.get('permissao', 1)
-                        if permissao == 1:
-                            usuarios_por_nivel['colaboradores'] += 1
-                        elif permissao == 2:
-                            usuarios_por_nivel['suporteTecnico'] += 1
-                        elif permissao == 3:
-                            usuarios_por_nivel['administradores'] += 1
+                totais = self._load_totals_from_stats()
             except Exception as e:
-                print(f"Erro ao carregar usuários: {e}")
+                print(f"Estatísticas do backend indisponíveis, contando pelas listas: {e}")
+                totais = self._load_totals_from_lists()
             
             # Verifica status da API de banco de dados
             api_status = {'database': {'status': 'checking', 'responseTime': None}, 
@@ -416,7 +441,8 @@ class ReportsPage(BasePage):
             try:
                 import time
                 start_time = time.time()
-                TicketService.get_tickets()
+                # Endpoint leve de health check em vez de baixar a lista de chamados de novo
+                api_client.get('/api/HealthCheck', include_auth=False)
                 end_time = time.time()
                 response_time = int((end_time - start_time) * 1000)
                 api_status['database'] = {'status': 'online', 'responseTime': response_time}
@@ -462,14 +488,7 @@ class ReportsPage(BasePage):
                 # Outros erros - assume não implementado
                 api_status['ai'] = {'status': 'not-implemented', 'responseTime': None}
             
-            self.reports = {
-                'totalUsuarios': total_usuarios,
-                'totalChamados': total_chamados,
-                'chamadosResolvidos': chamados_resolvidos,
-                'chamadosEmAndamento': chamados_em_andamento,
-                'usuariosPorNivel': usuarios_por_nivel,
-                'apiStatus': api_status
-            }
+            self.reports = dict(totais, apiStatus=api_status)
         except Exception as e:
             print(f"Erro ao carregar relatórios: {e}")
         finally:
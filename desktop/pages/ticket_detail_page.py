@@ -584,6 +584,9 @@ class TicketDetailPage(BasePage):
             return
         
         self.carregando_sugestao = True
+        # A sugestão anterior deixa de valer; "Usar Sugestão" só aplica o texto completo
+        self.sugestao = ""
+        self._recebendo_trechos = False
         if hasattr(self, 'ai_button'):
             self.ai_button.config(text="🔄 Gerando Sugestão", state=tk.DISABLED, fg="white", disabledforeground="white")
         # Inicia animação
@@ -630,9 +633,11 @@ class TicketDetailPage(BasePage):
     def _do_gerar_sugestao(self):
         """Faz geração de sugestão"""
         try:
-            response = AIService.gerar_sugestao(
+            # O texto aparece na caixa de sugestão conforme o Gemini gera
+            response = AIService.gerar_sugestao_stream(
                 self.ticket.get('titulo', ''),
-                self.ticket.get('descricao', '')
+                self.ticket.get('descricao', ''),
+                on_trecho=lambda texto: self.after(0, lambda t=texto: self._append_suggestion_chunk(t))
             )
             
             if response and response.get('sugestao'):
@@ -677,6 +682,24 @@ class TicketDetailPage(BasePage):
                     fg="white"
                 ))
     
+    def _append_suggestion_chunk(self, texto):
+        """Acrescenta um trecho da sugestão em geração à caixa de sugestão"""
+        if not hasattr(self, 'suggestion_text') or not self.carregando_sugestao:
+            return
+        self.suggestion_text.config(state=tk.NORMAL)
+        if not self._recebendo_trechos:
+            # Primeiro trecho: limpa a sugestão anterior e mostra a caixa
+            self._recebendo_trechos = True
+            self.suggestion_text.delete("1.0", tk.END)
+            if hasattr(self, 'content_container'):
+                self.suggestion_box.pack(fill=tk.BOTH, pady=(0, 16), before=self.content_container)
+            else:
+                self.suggestion_box.pack(fill=tk.BOTH, pady=(0, 16))
+        self.suggestion_text.insert(tk.END, texto)
+        self.suggestion_text.config(state=tk.DISABLED)
+        # Acompanha o fim do texto enquanto ele chega
+        self.suggestion_text.see(tk.END)
+    
     def _show_suggestion_box(self):
         """Mostra caixa de sugestão"""
         if hasattr(self, 'suggestion_text') and self.sugestao:
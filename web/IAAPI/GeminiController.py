@@ -1,60 +1,322 @@
-from flask import Blueprint, request, jsonify
+import json
+import logging
+import queue
+from contextlib import nullcontext
+
+from flask import Blueprint, Response, request, jsonify, current_app, url_for
 # Importa o serviço local de Gemini (em web/IAAPI/gemini_service.py)
-from web.IAAPI.gemini_service import gerar_sugestao
+from web.IAAPI.gemini_service import gerar_sugestao, gerar_sugestao_stream, sugestao_em_cache
 
 gemini_bp = Blueprint('gemini', __name__)
+logger = logging.getLogger(__name__)
+
+# Marca o fim dos trechos no canal entre a tarefa e a resposta em stream
+_FIM = object()
+
+
+def _ler_chamado():
+    """
+    Valida o JSON com titulo/descricao.
+
+    Returns:
+        tuple: ((titulo, descricao), None) ou (None, resposta_flask) em caso de erro
+    """
+    # Valida se há dados JSON na requisição
+    if not request.is_json:
+        return None, (jsonify({"erro": "Content-Type deve ser application/json"}), 400)
+
+    data = request.json
+    if not data:
+        return None, (jsonify({"erro": "Corpo da requisição vazio"}), 400)
+
+    descricao = (data.get('descricao') or '').strip()
+    titulo = (data.get('titulo') or '').strip()
+
+    # Valida se a descrição foi fornecida
+    if not descricao:
+        return None, (jsonify({"erro": "Descrição do chamado é obrigatória"}), 400)
+    return (titulo, descricao), None
+
+
+def _erro_geracao(e):
+    """
+    Mensagem e status HTTP para uma falha de gerar_sugestao.
+
+    Returns:
+        tuple: (mensagem, status)
+    """
+    error_msg = str(e)
+    if isinstance(e, ValueError):
+        # Erros de validação (ex: chave de API não configurada)
+        if "GEMINI_API_KEY" in error_msg.upper():
+            error_msg = "GEMINI_API_KEY não configurada. Configure a chave no arquivo .env ou env em web/backend/"
+        return error_msg, 400
+
+    # Outros erros (ex: erro de comunicação com API)
+    if "GEMINI_API_KEY" in error_msg.upper() or "API key" in error_msg:
+        error_msg = "GEMINI_API_KEY não configurada ou inválida. Execute: python configurar_chave_api.py ou configure manualmente no arquivo .env ou env em web/backend/"
+    elif "modelo" in error_msg.lower() or "model" in error_msg.lower():
+        error_msg = f"Erro ao acessar modelo do Gemini: {error_msg}"
+    return f"Erro ao processar solicitação: {error_msg}", 500
+
+
+def _gerar(metrics, titulo, descricao, consultar_cache=False, canal=None):
+    """
+    Executado no pool da fila de tarefas; falhas são registradas aqui, uma vez por tarefa.
+
+    Com canal (queue.Queue), a geração é em stream: cada trecho vai para o
+    canal assim que chega, seguido de _FIM, e a tarefa termina com o texto completo.
+    """
+    try:
+        # Latência do Gemini em GET /metrics (stage="gemini"), quando as métricas estão ativas
+        with metrics.medir('gemini') if metrics else nullcontext():
+            if canal is None:
+                # Em /sugerir-resposta o cache de sugestões já foi consultado na requisição
+                return gerar_sugestao(titulo, descricao, consultar_cache=consultar_cache)
+            partes = []
+            for texto in gerar_sugestao_stream(titulo, descricao, consultar_cache=consultar_cache):
+                partes.append(texto)
+                canal.put(texto)
+            return ''.join(partes)
+    except ValueError as e:
+        logger.warning("Erro de validação: %s", e)
+        raise
+    except Exception as e:
+        logger.exception("Erro ao processar solicitação: %s", e)
+        raise
+    finally:
+        if canal is not None:
+            canal.put(_FIM)
+
+
+def _enviar_tarefa(fila, titulo, descricao, consultar_cache=False, canal=None):
+    """
+    Agenda a geração na fila.
+
+    Returns:
+        tuple: (tarefa, None) ou (None, resposta_flask) se a fila estiver cheia
+    """
+    try:
+        tarefa = fila.enviar('sugestao', _gerar, current_app.extensions.get('metrics'),
+                             titulo, descricao, consultar_cache, canal)
+    except OverflowError as e:
+        # Fila cheia (FilaCheiaError): recusa em vez de acumular espera sem limite
+        logger.warning("Geração recusada: %s", e)
+        response = jsonify({"erro": "Muitas sugestões em geração no momento. Tente novamente em instantes."})
+        response.headers['Retry-After'] = '10'
+        return None, (response, 503)
+    return tarefa, None
+
+
+def _resposta_tarefa(fila, tarefa):
+    """Estado da tarefa; com o resultado (sugestao) ou o erro quando finalizada"""
+    corpo = tarefa.resumo()
+    corpo['statusUrl'] = url_for('gemini.obter_tarefa', tarefa_id=tarefa.id)
+    if tarefa.estado == 'pendente':
+        corpo['posicao'] = fila.posicao(tarefa)
+    elif tarefa.estado == 'concluida':
+        corpo['sugestao'] = tarefa.resultado
+    elif tarefa.estado == 'erro':
+        corpo['erro'], corpo['codigo'] = _erro_geracao(tarefa.erro)
+    return corpo
+
+
+def _aceita(fila, tarefa):
+    """202 Accepted com o ID da tarefa para consulta posterior"""
+    corpo = _resposta_tarefa(fila, tarefa)
+    response = jsonify(corpo)
+    response.headers['Location'] = corpo['statusUrl']
+    response.headers['Retry-After'] = '2'
+    return response, 202
+
 
 @gemini_bp.route('/sugerir-resposta', methods=['POST'])
 def sugerir_resposta():
     """
     Endpoint para gerar sugestão de resposta técnica usando Gemini AI.
-    
+
     Espera um JSON com:
     - descricao (obrigatório): Descrição do problema do chamado
     - titulo (opcional): Título do chamado
-    
+
+    Sugestões já geradas para chamados iguais ou parecidos vêm do cache
+    (web/IAAPI/cache_sugestoes.py) na hora. As demais rodam na fila de
+    tarefas (concorrência limitada): a requisição espera até
+    GEMINI_SYNC_WAIT segundos e, se a sugestão não ficar pronta
+    nesse tempo (ou com o header 'Prefer: respond-async'), responde 202 com
+    o jobId para consulta em GET /api/gemini/jobs/<jobId>.
+
     Retorna:
     - 200: {"sugestao": "texto da sugestão"}
+    - 202: {"jobId": "...", "status": "pendente|executando", "statusUrl": "..."}
     - 400: {"erro": "mensagem de erro"}
     - 500: {"erro": "mensagem de erro do servidor"}
+    - 503: {"erro": "..."} quando a fila está cheia
     """
+    chamado, erro = _ler_chamado()
+    if erro:
+        return erro
+    titulo, descricao = chamado
+
+    # Chamado igual ou quase idêntico a um já respondido: sem fila e sem custo de API
+    em_cache = sugestao_em_cache(titulo, descricao)
+    if em_cache is not None:
+        return jsonify({"sugestao": em_cache}), 200
+
+    fila = current_app.extensions.get('gemini_jobs')
+    if fila is None:
+        # Sem a fila (app sem services.tarefas): geração síncrona na requisição
+        try:
+            return jsonify({"sugestao": _gerar(current_app.extensions.get('metrics'), titulo, descricao)}), 200
+        except Exception as e:
+            mensagem, status = _erro_geracao(e)
+            return jsonify({"erro": mensagem}), status
+
+    tarefa, erro = _enviar_tarefa(fila, titulo, descricao)
+    if erro:
+        return erro
+
+    if 'respond-async' in request.headers.get('Prefer', ''):
+        return _aceita(fila, tarefa)
+    if not tarefa.aguardar(current_app.config.get('GEMINI_SYNC_WAIT', 25)):
+        return _aceita(fila, tarefa)
+    if tarefa.estado == 'erro':
+        mensagem, status = _erro_geracao(tarefa.erro)
+        return jsonify({"erro": mensagem}), status
+    return jsonify({"sugestao": tarefa.resultado}), 200
+
+
+def _sse(evento, dados):
+    return f"event: {evento}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+
+def _resposta_sse(eventos):
+    response = Response(eventos, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Desliga o buffer de proxies reversos (nginx), senão os trechos chegam juntos no fim
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@gemini_bp.route('/sugerir-resposta/stream', methods=['POST'])
+def sugerir_resposta_stream():
+    """
+    Mesma geração de /sugerir-resposta, entregue em Server-Sent Events
+    conforme o Gemini gera o texto, em vez de esperar a resposta completa.
+
+    Eventos:
+    - tarefa: {"jobId", "status", ...} assim que a geração entra na fila
+      (o resultado também fica em GET /api/gemini/jobs/<jobId>)
+    - trecho: {"texto": "..."} a cada parte gerada
+    - fim: {"sugestao": "texto completo"}
+    - erro: {"erro": "mensagem", "codigo": status HTTP equivalente}
+
+    Enquanto a tarefa espera na fila, comentários de keepalive mantêm a
+    conexão aberta. Sugestões do cache vêm em um único trecho. Erros de
+    validação e fila cheia respondem em JSON (400/503), antes do stream.
+    """
+    chamado, erro = _ler_chamado()
+    if erro:
+        return erro
+    titulo, descricao = chamado
+
+    em_cache = sugestao_em_cache(titulo, descricao)
+    if em_cache is not None:
+        return _resposta_sse([_sse('trecho', {"texto": em_cache}), _sse('fim', {"sugestao": em_cache})])
+
+    fila = current_app.extensions.get('gemini_jobs')
+    if fila is None:
+        return jsonify({"erro": "Fila de tarefas indisponível"}), 503
+
+    canal = queue.Queue()
+    tarefa, erro = _enviar_tarefa(fila, titulo, descricao, canal=canal)
+    if erro:
+        return erro
+    # Montados ainda no contexto da requisição (url_for, config)
+    inicio = _resposta_tarefa(fila, tarefa)
+    keepalive = current_app.config.get('GEMINI_STREAM_KEEPALIVE', 15)
+    espera_final = current_app.config.get('GEMINI_JOB_MAX_WAIT', 25)
+
+    def eventos():
+        yield _sse('tarefa', inicio)
+        while True:
+            try:
+                texto = canal.get(timeout=keepalive)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            if texto is _FIM:
+                break
+            yield _sse('trecho', {"texto": texto})
+        # _FIM chega antes de a fila registrar o estado final
+        if not tarefa.aguardar(espera_final):
+            logger.error("Tarefa %s não registrou o estado final após o fim do stream", tarefa.id)
+            yield _sse('erro', {"erro": "Erro ao processar solicitação: a geração terminou sem resultado", "codigo": 500})
+        elif tarefa.estado == 'erro':
+            mensagem, status = _erro_geracao(tarefa.erro)
+            yield _sse('erro', {"erro": mensagem, "codigo": status})
+        else:
+            yield _sse('fim', {"sugestao": tarefa.resultado})
+
+    return _resposta_sse(eventos())
+
+
+@gemini_bp.route('/jobs', methods=['POST'])
+def criar_tarefa():
+    """
+    Agenda a geração de uma sugestão e retorna imediatamente (202) com o jobId.
+
+    Mesmo corpo de /sugerir-resposta. O resultado é consultado em
+    GET /api/gemini/jobs/<jobId>.
+    """
+    chamado, erro = _ler_chamado()
+    if erro:
+        return erro
+
+    fila = current_app.extensions.get('gemini_jobs')
+    if fila is None:
+        return jsonify({"erro": "Fila de tarefas indisponível"}), 503
+
+    tarefa, erro = _enviar_tarefa(fila, *chamado, consultar_cache=True)
+    if erro:
+        return erro
+    return _aceita(fila, tarefa)
+
+
+@gemini_bp.route('/jobs/<tarefa_id>', methods=['GET'])
+def obter_tarefa(tarefa_id):
+    """
+    Estado de uma tarefa: pendente (com a posição na fila), executando,
+    concluida (com 'sugestao') ou erro (com 'erro' e 'codigo').
+
+    Com ?wait=N a requisição espera até N segundos (máximo GEMINI_JOB_MAX_WAIT)
+    pela conclusão antes de responder, evitando consultas repetidas.
+    """
+    fila = current_app.extensions.get('gemini_jobs')
+    tarefa = fila.obter(tarefa_id) if fila is not None else None
+    if tarefa is None:
+        return jsonify({"erro": "Tarefa não encontrada ou expirada"}), 404
+
     try:
-        # Valida se há dados JSON na requisição
-        if not request.is_json:
-            return jsonify({"erro": "Content-Type deve ser application/json"}), 400
-        
-        data = request.json
-        if not data:
-            return jsonify({"erro": "Corpo da requisição vazio"}), 400
-        
-        descricao = data.get('descricao', '').strip()
-        titulo = data.get('titulo', '').strip()
-
-        # Valida se a descrição foi fornecida
-        if not descricao:
-            return jsonify({"erro": "Descrição do chamado é obrigatória"}), 400
-
-        # Gera a sugestão usando o Gemini AI
-        sugestao = gerar_sugestao(titulo, descricao)
-        
-        return jsonify({"sugestao": sugestao}), 200
+        espera = float(request.args.get('wait') or 0)
+    except ValueError:
+        return jsonify({"erro": "Parâmetro wait deve ser um número de segundos"}), 400
+    espera = min(max(espera, 0), current_app.config.get('GEMINI_JOB_MAX_WAIT', 25))
+    if espera and not tarefa.finalizada:
+        tarefa.aguardar(espera)
 
-    except ValueError as e:
-        # Erros de validação (ex: chave de API não configurada)
-        error_msg = str(e)
-        print(f"[GeminiController] Erro de validação: {error_msg}")
-        if "GEMINI_API_KEY" in error_msg.upper():
-            error_msg = "GEMINI_API_KEY não configurada. Configure a chave no arquivo .env ou env em web/backend/"
-        return jsonify({"erro": error_msg}), 400
-    except Exception as e:
-        # Outros erros (ex: erro de comunicação com API)
-        error_msg = str(e)
-        print(f"[GeminiController] Erro ao processar solicitação: {error_msg}")
-        import traceback
-        print(f"[GeminiController] Traceback completo:")
-        traceback.print_exc()
-        if "GEMINI_API_KEY" in error_msg.upper() or "API key" in error_msg:
-            error_msg = "GEMINI_API_KEY não configurada ou inválida. Execute: python configurar_chave_api.py ou configure manualmente no arquivo .env ou env em web/backend/"
-        elif "modelo" in error_msg.lower() or "model" in error_msg.lower():
-            error_msg = f"Erro ao acessar modelo do Gemini: {error_msg}"
-        return jsonify({"erro": f"Erro ao processar solicitação: {error_msg}"}), 500
+    return jsonify(_resposta_tarefa(fila, tarefa)), 200
+
+
+@gemini_bp.route('/modelos', methods=['GET'])
+def listar_modelos():
+    """
+    Disponibilidade e latência de cada modelo do Gemini, na ordem em que as
+    próximas gerações vão tentá-los.
+    """
+    roteador = current_app.extensions.get('gemini_modelos')
+    if roteador is None:
+        return jsonify({"erro": "Roteador de modelos indisponível"}), 503
+    corpo = roteador.stats()
+    corpo['ordem'] = roteador.ordem()
+    return jsonify(corpo), 200
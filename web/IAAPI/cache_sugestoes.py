@@ -0,0 +1,297 @@
+"""
+Cache persistente das sugestões do Gemini (SQLite)
+
+Muitos chamados descrevem o mesmo problema ("esqueci minha senha",
+"impressora não imprime") e cada um pagava uma geração completa no Gemini.
+Aqui as sugestões geradas ficam guardadas em um arquivo SQLite, compartilhado
+pelos workers do gunicorn e mantido entre restarts.
+
+Duas formas de acerto:
+- exato: hash de (categoria detectada, título e descrição normalizados:
+  minúsculas, sem acentos, pontuação e espaços repetidos);
+- similar: a descrição vira um conjunto de palavras (sem stopwords) com
+  assinatura MinHash; as bandas da assinatura (LSH) ficam indexadas no banco
+  e trazem só os candidatos parecidos, que são conferidos pela similaridade
+  de Jaccard exata (mínimo GEMINI_CACHE_SIMILARITY) e pela mesma categoria.
+
+As entradas vencem após GEMINI_CACHE_TTL segundos e, acima de
+GEMINI_CACHE_MAX_ENTRIES, as usadas há mais tempo são descartadas. Falhas do
+banco nunca impedem a geração: contam como miss e são registradas no log.
+"""
+import hashlib
+import logging
+import os
+import random
+import re
+import sqlite3
+import struct
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+# Palavras que não distinguem um problema de outro
+STOPWORDS = frozenset("""
+a ao aos as com como da das de do dos e ela ele em entao esta estou eu foi ja la mais mas me meu
+meus minha minhas na nao nas no nos o os ou para pela pelo por pra que se sem seu sua ta tem to
+um uma umas uns nada hoje agora ainda bom dia boa tarde noite ola oi favor obrigado preciso ajuda
+""".split())
+
+NUM_PERMUTACOES = 64
+LINHAS_POR_BANDA = 4
+# Sugestões similares só para descrições com pelo menos este número de palavras distintas
+MIN_PALAVRAS_SIMILAR = 2
+
+_PRIMO = (1 << 61) - 1
+# Coeficientes fixos: as assinaturas guardadas precisam valer entre processos e restarts
+_gerador = random.Random(20240601)
+_COEFICIENTES = [(_gerador.randrange(1, _PRIMO), _gerador.randrange(0, _PRIMO)) for _ in range(NUM_PERMUTACOES)]
+
+_NAO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS sugestoes (
+    chave TEXT PRIMARY KEY,
+    categoria TEXT NOT NULL,
+    palavras TEXT NOT NULL,
+    sugestao TEXT NOT NULL,
+    criada_em REAL NOT NULL,
+    usada_em REAL NOT NULL,
+    usos INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_sugestoes_usada_em ON sugestoes (usada_em);
+CREATE TABLE IF NOT EXISTS bandas (
+    banda INTEGER NOT NULL,
+    valor INTEGER NOT NULL,
+    chave TEXT NOT NULL REFERENCES sugestoes (chave) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_bandas_valor ON bandas (banda, valor);
+CREATE INDEX IF NOT EXISTS idx_bandas_chave ON bandas (chave);
+"""
+
+
+def normalizar(texto):
+    """Minúsculas, sem acentos e com a pontuação trocada por espaços"""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+    return _NAO_ALFANUMERICO.sub(' ', texto).strip()
+
+
+def palavras(texto):
+    """Conjunto de palavras relevantes de um texto já normalizado"""
+    return frozenset(p for p in texto.split() if len(p) > 1 and p not in STOPWORDS)
+
+
+def chave_exata(titulo, descricao, categoria):
+    conteudo = '\x00'.join((categoria or '', normalizar(titulo), normalizar(descricao)))
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+def assinatura(conjunto):
+    """Assinatura MinHash (NUM_PERMUTACOES inteiros) de um conjunto de palavras"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(p.encode('utf-8'), digest_size=8).digest(), 'big')
+        for p in conjunto
+    ]
+    return [min((a * h + b) % _PRIMO for h in hashes) for a, b in _COEFICIENTES]
+
+
+def bandas(conjunto):
+    """(banda, valor) das bandas LSH; descrições parecidas coincidem em pelo menos uma"""
+    sig = assinatura(conjunto)
+    saida = []
+    for banda, inicio in enumerate(range(0, NUM_PERMUTACOES, LINHAS_POR_BANDA)):
+        linhas = struct.pack(f'>{LINHAS_POR_BANDA}Q', *sig[inicio:inicio + LINHAS_POR_BANDA])
+        # Inteiro de 63 bits (cabe no INTEGER do SQLite)
+        valor = int.from_bytes(hashlib.blake2b(linhas, digest_size=8).digest(), 'big') >> 1
+        saida.append((banda, valor))
+    return saida
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class CacheSugestoes:
+    """Sugestões já geradas, por texto exato ou descrição parecida"""
+
+    def __init__(self, caminho, max_entradas=5000, ttl=7 * 24 * 3600, similaridade=0.8, enabled=True):
+        self.caminho = caminho
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.similaridade = similaridade
+        self.enabled = enabled
+        self._conexao = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.hits_exatos = 0
+        self.hits_similares = 0
+        self.misses = 0
+        self.gravacoes = 0
+        self.erros = 0
+
+    def _conectar(self):
+        """Conexão do processo atual (reaberta após fork dos workers); chamar com o lock"""
+        if self._conexao is None or self._pid != os.getpid():
+            conexao = sqlite3.connect(self.caminho, timeout=5, check_same_thread=False, isolation_level=None)
+            if self.caminho != ':memory:':
+                conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA foreign_keys=ON')
+            conexao.executescript(_ESQUEMA)
+            self._conexao, self._pid = conexao, os.getpid()
+        return self._conexao
+
+    def buscar(self, titulo, descricao, categoria):
+        """
+        Sugestão guardada para este chamado (exata ou de uma descrição parecida).
+
+        Returns:
+            str: Sugestão, ou None se não houver (ou o cache estiver desativado)
+        """
+        if not self.enabled:
+            return None
+        agora = time.time()
+        chave = chave_exata(titulo, descricao, categoria)
+        try:
+            with self._lock:
+                db = self._conectar()
+                linha = db.execute(
+                    'SELECT sugestao FROM sugestoes WHERE chave = ? AND criada_em > ?',
+                    (chave, agora - self.ttl)).fetchone()
+                tipo = 'exato'
+                if linha is None:
+                    linha, chave = self._buscar_similar(db, normalizar(descricao), categoria, agora)
+                    tipo = 'similar'
+                if linha is None:
+                    self.misses += 1
+                    return None
+                db.execute('UPDATE sugestoes SET usada_em = ?, usos = usos + 1 WHERE chave = ?', (agora, chave))
+                if tipo == 'exato':
+                    self.hits_exatos += 1
+                else:
+                    self.hits_similares += 1
+            logger.debug('Sugestão do cache (%s) para "%s"', tipo, titulo)
+            return linha[0]
+        except sqlite3.Error as e:
+            self.erros += 1
+            logger.warning('Falha ao consultar o cache de sugestões: %s', e)
+            return None
+
+    def _buscar_similar(self, db, descricao, categoria, agora):
+        conjunto = palavras(descricao)
+        if len(conjunto) < MIN_PALAVRAS_SIMILAR:
+            return None, None
+        pares = bandas(conjunto)
+        filtro = ' OR '.join(['(b.banda = ? AND b.valor = ?)'] * len(pares))
+        parametros = [v for par in pares for v in par] + [categoria, agora - self.ttl]
+        candidatos = db.execute(
+            f'SELECT DISTINCT s.chave, s.palavras, s.sugestao FROM bandas b '
+            f'JOIN sugestoes s ON s.chave = b.chave '
+            f'WHERE ({filtro}) AND s.categoria = ? AND s.criada_em > ?', parametros).fetchall()
+
+        melhor, melhor_chave, melhor_valor = None, None, self.similaridade
+        for chave, texto, sugestao in candidatos:
+            valor = jaccard(conjunto, frozenset(texto.split()))
+            if valor >= melhor_valor:
+                melhor, melhor_chave, melhor_valor = (sugestao,), chave, valor
+        return melhor, melhor_chave
+
+    def guardar(self, titulo, descricao, categoria, sugestao):
+        """Guarda uma sugestão gerada e aplica TTL e limite de entradas"""
+        if not self.enabled or not sugestao:
+            return
+        agora = time.time()
+        chave = chave_exata(titulo, descricao, categoria)
+        conjunto = palavras(normalizar(descricao))
+        try:
+            with self._lock:
+                db = self._conectar()
+                with db:
+                    db.execute('BEGIN IMMEDIATE')
+                    # REPLACE remove a linha anterior e, em cascata, as bandas dela
+                    db.execute(
+                        'INSERT OR REPLACE INTO sugestoes (chave, categoria, palavras, sugestao, criada_em, usada_em) '
+                        'VALUES (?, ?, ?, ?, ?, ?)',
+                        (chave, categoria or '', ' '.join(sorted(conjunto)), sugestao, agora, agora))
+                    if len(conjunto) >= MIN_PALAVRAS_SIMILAR:
+                        db.executemany('INSERT INTO bandas (banda, valor, chave) VALUES (?, ?, ?)',
+                                       [(banda, valor, chave) for banda, valor in bandas(conjunto)])
+                    self._descartar(db, agora)
+                self.gravacoes += 1
+        except sqlite3.Error as e:
+            self.erros += 1
+            logger.warning('Falha ao gravar no cache de sugestões: %s', e)
+
+    def _descartar(self, db, agora):
+        """Remove as vencidas e, acima do limite, as usadas há mais tempo"""
+        db.execute('DELETE FROM sugestoes WHERE criada_em <= ?', (agora - self.ttl,))
+        excesso = db.execute('SELECT COUNT(*) FROM sugestoes').fetchone()[0] - self.max_entradas
+        if excesso > 0:
+            db.execute(
+                'DELETE FROM sugestoes WHERE chave IN '
+                '(SELECT chave FROM sugestoes ORDER BY usada_em LIMIT ?)', (excesso,))
+
+    def limpar(self):
+        with self._lock:
+            db = self._conectar()
+            db.execute('DELETE FROM sugestoes')
+
+    def stats(self):
+        entradas = 0
+        if self.enabled:
+            try:
+                with self._lock:
+                    entradas = self._conectar().execute('SELECT COUNT(*) FROM sugestoes').fetchone()[0]
+            except sqlite3.Error:
+                pass
+        consultas = self.hits_exatos + self.hits_similares + self.misses
+        return {
+            'entradas': entradas,
+            'hits_exatos': self.hits_exatos,
+            'hits_similares': self.hits_similares,
+            'misses': self.misses,
+            'gravacoes': self.gravacoes,
+            'erros': self.erros,
+            'taxa_acerto': (self.hits_exatos + self.hits_similares) / consultas if consultas else 0.0,
+        }
+
+
+def _caminho_padrao():
+    backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+    return os.path.join(backend_dir, 'gemini_sugestoes.sqlite3')
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _criar(cfg):
+    return CacheSugestoes(
+        cfg.get('GEMINI_CACHE_PATH') or _caminho_padrao(),
+        max_entradas=int(cfg.get('GEMINI_CACHE_MAX_ENTRIES') or 5000),
+        ttl=float(cfg.get('GEMINI_CACHE_TTL') or 7 * 24 * 3600),
+        similaridade=float(cfg.get('GEMINI_CACHE_SIMILARITY') or 0.8),
+        enabled=str(cfg.get('GEMINI_CACHE_ENABLED', True)).lower() not in ('false', '0', 'no'),
+    )
+
+
+def init_app(app):
+    """Cria o cache a partir das configurações do app Flask (GEMINI_CACHE_*)"""
+    global _cache
+    with _cache_lock:
+        _cache = _criar(app.config)
+    app.extensions['gemini_sugestoes'] = _cache
+    return _cache
+
+
+def get_cache_sugestoes():
+    """Retorna o cache compartilhado (criado com as variáveis de ambiente se init_app não foi chamado)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _criar(os.environ)
+    return _cache
@@ -0,0 +1,97 @@
+"""
+Classificação do tipo de problema de um chamado por palavras-chave
+
+gerar_sugestao montava título + descrição em minúsculas e fazia uma busca
+de substring por palavra-chave de cada categoria (sete varreduras do texto).
+Aqui todas as palavras-chave são compiladas, uma vez, em uma única expressão
+regular em forma de trie (prefixos comuns compartilhados, mais longas
+primeiro), e o texto é percorrido uma vez só.
+
+O resultado é a pontuação de cada categoria (quantas ocorrências de suas
+palavras-chave). A busca continua sendo por substring, como antes: uma
+ocorrência conta também para as palavras-chave contidas nela (ex: 'redefinir'
+contém 'rede'), então as categorias encontradas são as mesmas das buscas
+separadas.
+"""
+import re
+from collections import Counter
+from itertools import chain
+
+# Em ordem de declaração, que desempata pontuações iguais
+CATEGORIAS = {
+    'reset_senha': ['senha', 'password', 'reset', 'redefinir', 'esqueci', 'esqueceu', 'perdeu'],
+    'acesso': ['acesso', 'permissão', 'permissao', 'autorização', 'autorizacao'],
+    'hardware': ['hardware', 'equipamento', 'computador', 'notebook', 'mouse', 'teclado', 'monitor'],
+    'rede': ['rede', 'network', 'internet', 'wifi', 'wi-fi', 'conexão', 'conexao', 'dns'],
+    'software': ['software', 'aplicativo', 'programa', 'sistema', 'erro', 'bug'],
+    'impressora': ['impressora', 'printer', 'impressão', 'impressao'],
+    'email': ['email', 'e-mail', 'correio', 'outlook', 'gmail'],
+}
+
+
+def _regex_trie(palavras):
+    """Expressão regular equivalente à alternância das palavras, fatorada por prefixos"""
+    trie = {}
+    for palavra in palavras:
+        no = trie
+        for letra in palavra:
+            no = no.setdefault(letra, {})
+        no[''] = {}
+
+    def compilar(no):
+        fim = '' in no
+        ramos = [re.escape(letra) + compilar(filho) for letra, filho in sorted(no.items()) if letra]
+        if not ramos:
+            return ''
+        # Ramos começam com letras distintas; o '?' guloso faz casar a palavra mais longa na posição
+        corpo = ramos[0] if len(ramos) == 1 else '(?:' + '|'.join(ramos) + ')'
+        return f'(?:{corpo})?' if fim else corpo
+
+    return compilar(trie)
+
+
+class Classificador:
+    """Palavras-chave de todas as categorias em um só autômato"""
+
+    def __init__(self, categorias=CATEGORIAS):
+        self.ordem = list(categorias)
+        palavras = {palavra for lista in categorias.values() for palavra in lista}
+        # Palavra casada -> categorias de todas as palavras-chave contidas nela
+        self._categorias = {
+            palavra: tuple(dict.fromkeys(
+                categoria for categoria, lista in categorias.items()
+                for outra in lista if outra in palavra
+            ))
+            for palavra in palavras
+        }
+        self._regex = re.compile(_regex_trie(palavras))
+
+    def pontuar(self, texto):
+        """
+        Returns:
+            Counter: categoria -> número de ocorrências no texto (só as encontradas)
+        """
+        # Contagem sem laço em Python: palavras casadas -> categorias -> Counter
+        return Counter(chain.from_iterable(map(self._categorias.__getitem__, self._regex.findall(texto.lower()))))
+
+    def classificar(self, titulo, descricao):
+        """
+        Categorias encontradas no título e na descrição, da mais pontuada à menos.
+
+        Returns:
+            list: [(categoria, pontos), ...]; vazia se nenhuma palavra-chave aparecer
+        """
+        pontos = self.pontuar(f"{titulo or ''} {descricao or ''}")
+        return sorted(pontos.items(), key=lambda item: (-item[1], self.ordem.index(item[0])))
+
+
+_classificador = Classificador()
+
+
+def classificar(titulo, descricao):
+    """Categorias do chamado com o classificador padrão (ver Classificador.classificar)"""
+    return _classificador.classificar(titulo, descricao)
+
+
+def pontuar(texto):
+    return _classificador.pontuar(texto)
@@ -0,0 +1,140 @@
+"""
+Configuração do módulo de IA (chave e transporte do Gemini)
+
+gerar_sugestao recarregava o .env (load_dotenv com override) e podia chamar
+genai.configure a cada sugestão. Aqui a configuração é carregada uma vez,
+na inicialização, e só é relida quando o arquivo .env (ou env) em web/backend
+muda de mtime, verificado no máximo a cada GEMINI_CONFIG_CHECK_INTERVAL
+segundos, ou por POST /api/gemini/config/reload (administradores).
+
+Os GenerativeModel de cada modelo ficam guardados e são reaproveitados entre
+as requisições; ao trocar a chave ou o transporte o genai é reconfigurado e
+os modelos são recriados.
+"""
+import logging
+import os
+import threading
+import time
+
+import google.generativeai as genai
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+
+def _arquivos_padrao():
+    """.env ou env no diretório web/backend, nessa ordem de preferência"""
+    backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+    return [os.path.join(backend_dir, '.env'), os.path.join(backend_dir, 'env')]
+
+
+class ConfiguracaoIA:
+    """Chave e transporte do Gemini, com os modelos já criados"""
+
+    def __init__(self, arquivos=None, intervalo=2.0):
+        self.arquivos = arquivos or _arquivos_padrao()
+        self.intervalo = intervalo
+        self.api_key = None
+        # Transporte do cliente genai: o serve.py usa 'rest' (requests), que coopera com o gevent;
+        # o padrão (gRPC) bloquearia o worker inteiro durante a geração
+        self.transport = None
+        self.carregada_em = None
+        self.recargas = 0
+        # (arquivo, mtime) lidos na última carga
+        self._origem = None
+        self._verificada_em = 0.0
+        # (api_key, transport) passados ao genai.configure
+        self._configurada = None
+        self._modelos = {}
+        self._lock = threading.Lock()
+
+    def _origem_atual(self):
+        """(arquivo, mtime) do primeiro arquivo existente, ou (None, None)"""
+        for arquivo in self.arquivos:
+            try:
+                return arquivo, os.stat(arquivo).st_mtime_ns
+            except OSError:
+                continue
+        return None, None
+
+    def carregar(self):
+        """Relê o arquivo de ambiente e reconfigura o genai se a chave ou o transporte mudaram"""
+        with self._lock:
+            arquivo, mtime = self._origem_atual()
+            if arquivo:
+                load_dotenv(dotenv_path=arquivo, override=True)
+            else:
+                # Sem arquivo em web/backend: procura um .env a partir do diretório atual
+                load_dotenv(override=True)
+            self._origem = (arquivo, mtime)
+            self._verificada_em = time.monotonic()
+            self.api_key = os.getenv("GEMINI_API_KEY")
+            self.transport = os.getenv("GEMINI_TRANSPORT") or None
+            self.carregada_em = time.time()
+            self.recargas += 1
+
+            # Só configura o genai se a chave estiver disponível
+            # A validação acontece em gerar_sugestao
+            if self.api_key and self._configurada != (self.api_key, self.transport):
+                genai.configure(api_key=self.api_key, transport=self.transport)
+                self._configurada = (self.api_key, self.transport)
+                # Os modelos guardam o cliente da configuração anterior
+                self._modelos.clear()
+        logger.info('Configuração da IA carregada de %s (chave %s)',
+                    arquivo or 'variáveis de ambiente', 'configurada' if self.api_key else 'ausente')
+
+    def verificar(self):
+        """Recarrega se o arquivo de ambiente mudou desde a última carga (custo: um stat por intervalo)"""
+        agora = time.monotonic()
+        if self._origem is not None and agora - self._verificada_em < self.intervalo:
+            return
+        self._verificada_em = agora
+        if self._origem != self._origem_atual():
+            self.carregar()
+
+    def modelo(self, nome):
+        """GenerativeModel do modelo, criado uma vez e reaproveitado"""
+        with self._lock:
+            modelo = self._modelos.get(nome)
+            if modelo is None:
+                modelo = self._modelos[nome] = genai.GenerativeModel(nome)
+            return modelo
+
+    def resumo(self):
+        return {
+            'arquivo': self._origem[0] if self._origem else None,
+            'chaveConfigurada': bool(self.api_key),
+            'transporte': self.transport,
+            'carregadaEm': self.carregada_em,
+            'recargas': self.recargas,
+            'modelos': sorted(self._modelos),
+        }
+
+
+_configuracao = None
+_configuracao_lock = threading.Lock()
+
+
+def _criar(intervalo):
+    configuracao = ConfiguracaoIA(intervalo=intervalo)
+    configuracao.carregar()
+    return configuracao
+
+
+def init_app(app):
+    """Carrega a configuração na inicialização do app (intervalo em GEMINI_CONFIG_CHECK_INTERVAL)"""
+    global _configuracao
+    with _configuracao_lock:
+        _configuracao = _criar(float(app.config.get('GEMINI_CONFIG_CHECK_INTERVAL', 2)))
+    app.extensions['gemini_config'] = _configuracao
+    return _configuracao
+
+
+def get_configuracao():
+    """Retorna a configuração compartilhada (carregada na primeira chamada se init_app não foi chamado)"""
+    global _configuracao
+    if _configuracao is None:
+        with _configuracao_lock:
+            if _configuracao is None:
+                _configuracao = _criar(float(os.getenv('GEMINI_CONFIG_CHECK_INTERVAL') or 2))
+    return _configuracao
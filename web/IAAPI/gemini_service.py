@@ -1,98 +1,51 @@
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
-
-# Carrega variáveis de ambiente do arquivo .env no diretório do backend
-# Procura o arquivo .env ou env no diretório web/backend
-backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
-env_path = os.path.join(backend_dir, '.env')
-env_path_alt = os.path.join(backend_dir, 'env')
-# Tenta carregar .env primeiro, se não existir, tenta env
-if os.path.exists(env_path):
-    load_dotenv(dotenv_path=env_path)
-elif os.path.exists(env_path_alt):
-    load_dotenv(dotenv_path=env_path_alt)
-else:
-    # Tenta carregar sem especificar caminho (procura no diretório atual)
-    load_dotenv()
-
-# Configure sua chave de API do Gemini
-api_key = os.getenv("GEMINI_API_KEY")
-
-# Só configura o genai se a chave estiver disponível
-# A validação acontece na função gerar_sugestao
-if api_key:
-    genai.configure(api_key=api_key)
-
-def gerar_sugestao(titulo, descricao):
+from web.IAAPI.cache_sugestoes import get_cache_sugestoes
+from web.IAAPI.classificador import pontuar
+from web.IAAPI.configuracao import get_configuracao
+from web.IAAPI.roteador_modelos import get_roteador
+
+
+# Categorias com instruções próprias no prompt, em ordem de prioridade; as demais usam o genérico
+CATEGORIAS_PROMPT = ('reset_senha', 'acesso')
+
+
+def detectar_categoria(titulo, descricao):
     """
-    Gera uma sugestão de resposta técnica para um chamado usando o Gemini AI.
-    
-    Args:
-        titulo (str): Título do chamado
-        descricao (str): Descrição do problema
-    
+    Identifica o tipo de problema pelo título e descrição (uma varredura, ver classificador.py).
+
     Returns:
-        str: Sugestão de resposta técnica gerada pelo Gemini
-    
-    Raises:
-        ValueError: Se a chave de API não estiver configurada
-        Exception: Se houver erro na comunicação com a API do Gemini
+        str: 'reset_senha', 'acesso' ou 'geral' (define as instruções do prompt)
     """
-    try:
-        # Recarrega variáveis de ambiente do arquivo .env
-        backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
-        env_path = os.path.join(backend_dir, '.env')
-        env_path_alt = os.path.join(backend_dir, 'env')
-        # Tenta carregar .env primeiro, se não existir, tenta env
-        if os.path.exists(env_path):
-            load_dotenv(dotenv_path=env_path, override=True)
-        elif os.path.exists(env_path_alt):
-            load_dotenv(dotenv_path=env_path_alt, override=True)
-        else:
-            # Tenta carregar sem especificar caminho
-            load_dotenv(override=True)
-        current_api_key = os.getenv("GEMINI_API_KEY")
-        
-        if not current_api_key:
-            raise ValueError("GEMINI_API_KEY não configurada. Configure no arquivo .env em web/backend/.env ou execute: python configurar_chave_api.py")
-        
-        # Configura o genai com a chave atual (se ainda não foi configurado)
-        if current_api_key != api_key:
-            genai.configure(api_key=current_api_key)
-        
-        # Detectar tipo de problema baseado no título e descrição
-        titulo_lower = titulo.lower() if titulo else ""
-        descricao_lower = descricao.lower() if descricao else ""
-        
-        # Identificar tipo de problema
-        is_password_reset = any(palavra in titulo_lower + " " + descricao_lower for palavra in 
-                               ['senha', 'password', 'reset', 'redefinir', 'esqueci', 'esqueceu', 'perdeu'])
-        is_access_request = any(palavra in titulo_lower + " " + descricao_lower for palavra in 
-                               ['acesso', 'permissão', 'permissao', 'autorização', 'autorizacao'])
-        is_hardware = any(palavra in titulo_lower + " " + descricao_lower for palavra in 
-                         ['hardware', 'equipamento', 'computador', 'notebook', 'mouse', 'teclado', 'monitor'])
-        is_network = any(palavra in titulo_lower + " " + descricao_lower for palavra in 
-                        ['rede', 'network', 'internet', 'wifi', 'wi-fi', 'conexão', 'conexao', 'dns'])
-        is_software = any(palavra in titulo_lower + " " + descricao_lower for palavra in 
-                         ['software', 'aplicativo', 'programa', 'sistema', 'erro', 'bug'])
-        is_printer = any(palavra in titulo_lower + " " + descricao_lower for palavra in 
-                        ['impressora', 'printer', 'impressão', 'impressao'])
-        is_email = any(palavra in titulo_lower + " " + descricao_lower for palavra in 
-                      ['email', 'e-mail', 'correio', 'outlook', 'gmail'])
-        
-        # Prompt base
-        prompt_base = f"""
+    pontos = pontuar(f"{titulo or ''} {descricao or ''}")
+    for categoria in CATEGORIAS_PROMPT:
+        if categoria in pontos:
+            return categoria
+    return 'geral'
+
+
+def sugestao_em_cache(titulo, descricao):
+    """
+    Sugestão já gerada para este chamado ou para um quase idêntico, sem chamar o Gemini.
+
+    Returns:
+        str: Sugestão do cache, ou None
+    """
+    return get_cache_sugestoes().buscar(titulo, descricao, detectar_categoria(titulo, descricao))
+
+
+def _escrever_prompt(titulo, descricao, categoria):
+    """Texto completo do prompt; usado uma vez por categoria para montar _MODELOS_PROMPT"""
+    # Prompt base
+    prompt_base = f"""
         Você é um assistente técnico de TI especializado em gerar relatórios detalhados de atendimento técnico para rastreabilidade.
 
         CONTEXTO DO CHAMADO:
         - Título: "{titulo}"
         - Descrição do problema reportado: "{descricao}"
         """
-        
-        # Adicionar instruções específicas baseadas no tipo de problema
-        if is_password_reset:
-            prompt_base += """
+    
+    # Adicionar instruções específicas baseadas no tipo de problema
+    if categoria == 'reset_senha':
+        prompt_base += """
         
         TIPO DE PROBLEMA IDENTIFICADO: RESET/REDEFINIÇÃO DE SENHA
         
@@ -141,8 +94,8 @@ def gerar_sugestao(titulo, descricao):
         
         IMPORTANTE: Para reset de senha, seja MUITO específico sobre o processo de verificação de identidade, o método usado para redefinir a senha, e como a nova senha foi comunicada ao usuário. Isso é crítico para segurança e auditoria.
         """
-        elif is_access_request:
-            prompt_base += """
+    elif categoria == 'acesso':
+        prompt_base += """
         
         TIPO DE PROBLEMA IDENTIFICADO: SOLICITAÇÃO DE ACESSO/PERMISSÃO
         
@@ -181,18 +134,18 @@ def gerar_sugestao(titulo, descricao):
         - Mencione políticas de uso e responsabilidades
         - Indique recursos de treinamento ou documentação fornecidos
         """
-        else:
-            # Prompt genérico melhorado para outros tipos de problemas
-            prompt_base += """
+    else:
+        # Prompt genérico melhorado para outros tipos de problemas
+        prompt_base += """
         
         OBJETIVO:
         Gere uma resposta técnica COMPLETA e DETALHADA que descreva TODAS as ações realizadas pelo técnico para resolver este problema.
         Esta resposta será registrada permanentemente no histórico do chamado e deve fornecer rastreabilidade completa.
         Outro técnico deve ser capaz de ler esta resposta e entender EXATAMENTE o que foi feito, como foi feito e por que foi feito.
         """
-        
-        # Adicionar estrutura comum
-        prompt = prompt_base + """
+    
+    # Adicionar estrutura comum
+    prompt = prompt_base + """
         
         ESTRUTURA OBRIGATÓRIA DA RESPOSTA:
         
@@ -251,38 +204,125 @@ def gerar_sugestao(titulo, descricao):
         FORMATO:
         Gere uma resposta em texto corrido, profissional, completa e bem estruturada que descreva TODO o processo de resolução do problema com máximo detalhamento técnico e rastreabilidade.
         """
+    return prompt
 
-        # Usa um modelo estável disponível
-        # Tenta modelos em ordem de preferência
-        modelos_tentados = []
-        response = None
-        modelos_disponiveis = [
-            "gemini-1.5-flash",
-            "gemini-1.5-pro",
-            "gemini-pro",
-            "gemini-flash-latest"
-        ]
-        
-        ultimo_erro = None
-        for modelo_nome in modelos_disponiveis:
-            try:
-                modelos_tentados.append(modelo_nome)
-                model = genai.GenerativeModel(modelo_nome)
-                response = model.generate_content(prompt)
-                # Se chegou aqui, o modelo funcionou
-                break
-            except Exception as e:
-                ultimo_erro = str(e)
-                # Se falhar, tenta o próximo modelo
-                continue
-        
-        if response is None:
-            raise Exception(f"Nenhum modelo do Gemini está disponível. Modelos tentados: {', '.join(modelos_tentados)}. Último erro: {ultimo_erro}")
+
+# Marcadores substituídos pelos campos do chamado
+_TITULO = '\x00titulo\x00'
+_DESCRICAO = '\x00descricao\x00'
+
+
+def _pre_renderizar(categoria):
+    """(antes do título, entre título e descrição, depois da descrição)"""
+    antes, resto = _escrever_prompt(_TITULO, _DESCRICAO, categoria).split(_TITULO)
+    meio, depois = resto.split(_DESCRICAO)
+    return antes, meio, depois
+
+
+# Prompts já renderizados por categoria: por chamado só entram título e descrição
+_MODELOS_PROMPT = {categoria: _pre_renderizar(categoria) for categoria in CATEGORIAS_PROMPT + ('geral',)}
+
+
+def montar_prompt(titulo, descricao, categoria):
+    """
+    Prompt da sugestão, com as instruções específicas da categoria do chamado.
+
+    Args:
+        titulo (str): Título do chamado
+        descricao (str): Descrição do problema
+        categoria (str): Resultado de detectar_categoria
+
+    Returns:
+        str: Prompt enviado ao modelo
+    """
+    antes, meio, depois = _MODELOS_PROMPT.get(categoria, _MODELOS_PROMPT['geral'])
+    return f"{antes}{titulo}{meio}{descricao}{depois}"
+
+
+def _verificar_chave():
+    """
+    Raises:
+        ValueError: Se a chave de API não estiver configurada
+    """
+    # Configuração carregada uma vez; relida só se o .env mudar
+    configuracao = get_configuracao()
+    configuracao.verificar()
+
+    if not configuracao.api_key:
+        raise ValueError("GEMINI_API_KEY não configurada. Configure no arquivo .env em web/backend/.env ou execute: python configurar_chave_api.py")
+
+
+def gerar_sugestao(titulo, descricao, consultar_cache=True):
+    """
+    Gera uma sugestão de resposta técnica para um chamado usando o Gemini AI.
+    
+    Args:
+        titulo (str): Título do chamado
+        descricao (str): Descrição do problema
+        consultar_cache (bool): False se o cache já foi consultado por quem chama
+    
+    Returns:
+        str: Sugestão de resposta técnica gerada pelo Gemini (ou do cache)
+    
+    Raises:
+        ValueError: Se a chave de API não estiver configurada
+        Exception: Se houver erro na comunicação com a API do Gemini
+    """
+    # Chamados repetidos ("esqueci minha senha") reaproveitam a sugestão já gerada
+    em_cache = sugestao_em_cache(titulo, descricao) if consultar_cache else None
+    if em_cache is not None:
+        return em_cache
+
+    try:
+        _verificar_chave()
+
+        categoria = detectar_categoria(titulo, descricao)
+
+        prompt = montar_prompt(titulo, descricao, categoria)
+
+        # Modelo disponível mais rápido (disponibilidade sondada em segundo plano)
+        response = get_roteador().gerar(prompt)
 
         if not response or not response.text:
             raise Exception("Resposta vazia do Gemini API")
 
+        get_cache_sugestoes().guardar(titulo, descricao, categoria, response.text)
         return response.text
     
     except Exception as e:
         raise Exception(f"Erro ao gerar sugestão com Gemini: {str(e)}")
+
+
+def gerar_sugestao_stream(titulo, descricao, consultar_cache=True):
+    """
+    Como gerar_sugestao, mas entrega o texto em trechos conforme o Gemini gera
+    (generate_content com stream=True). Uma sugestão do cache vem em um trecho só.
+
+    Yields:
+        str: Trechos da sugestão, na ordem
+
+    Raises:
+        Exception: Se houver erro na comunicação com a API do Gemini (antes ou durante o stream)
+    """
+    em_cache = sugestao_em_cache(titulo, descricao) if consultar_cache else None
+    if em_cache is not None:
+        yield em_cache
+        return
+
+    partes = []
+    try:
+        _verificar_chave()
+
+        categoria = detectar_categoria(titulo, descricao)
+
+        for texto in get_roteador().gerar_stream(montar_prompt(titulo, descricao, categoria)):
+            partes.append(texto)
+            yield texto
+
+        if not partes:
+            raise Exception("Resposta vazia do Gemini API")
+
+    except Exception as e:
+        raise Exception(f"Erro ao gerar sugestão com Gemini: {str(e)}")
+
+    get_cache_sugestoes().guardar(titulo, descricao, categoria, ''.join(partes))
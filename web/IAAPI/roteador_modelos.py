@@ -0,0 +1,285 @@
+"""
+Escolha do modelo do Gemini para cada sugestão
+
+gerar_sugestao tentava os modelos em sequência a cada requisição; com os
+primeiros descontinuados, toda sugestão pagava várias chamadas com erro antes
+de chegar a um modelo que responde. Aqui:
+
+- a disponibilidade vem de genai.list_models() (a mesma consulta de
+  web/backend/listar_modelos.py), feita em segundo plano e válida por
+  GEMINI_MODEL_HEALTH_TTL segundos; modelos fora da lista são pulados;
+- um modelo que falha em uma geração fica fora da rota pelo mesmo TTL;
+- entre os disponíveis, a requisição vai para o de menor latência média
+  (média móvel das gerações). Um modelo confirmado pela sonda mas sem medição
+  recente (mais antiga que o TTL) recebe a próxima geração, para que a
+  comparação valha também para os modelos que não estão sendo usados.
+
+Se nenhum modelo estiver marcado como disponível, todos são tentados na
+ordem configurada, como antes. Os GenerativeModel vêm da configuração
+(ConfiguracaoIA.modelo), que os reaproveita entre as requisições.
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+
+import google.generativeai as genai
+
+from web.IAAPI.configuracao import get_configuracao
+
+logger = logging.getLogger(__name__)
+
+# Ordem de preferência quando ainda não há medições
+MODELOS_PADRAO = ["gemini-1.5-flash", "gemini-1.5-pro", "gemini-pro", "gemini-flash-latest"]
+
+# Peso da última geração na latência média
+PESO_LATENCIA = 0.3
+
+
+class EstadoModelo:
+    """Disponibilidade e latência de um modelo"""
+
+    __slots__ = ('nome', 'disponivel', 'falhou_em', 'erro', 'sucessos', 'falhas', 'latencia_media',
+                 'ultima_latencia', 'medido_em')
+
+    def __init__(self, nome):
+        self.nome = nome
+        # None: ainda não sondado (ou sonda falhou); True/False conforme genai.list_models()
+        self.disponivel = None
+        self.falhou_em = None
+        self.erro = None
+        self.sucessos = 0
+        self.falhas = 0
+        self.latencia_media = None
+        self.ultima_latencia = None
+        self.medido_em = None
+
+    def resumo(self, agora):
+        return {
+            'modelo': self.nome,
+            'disponivel': self.disponivel,
+            # Segundos desde a última falha (None se a última geração deu certo)
+            'falhouHa': None if self.falhou_em is None else agora - self.falhou_em,
+            'erro': self.erro,
+            'sucessos': self.sucessos,
+            'falhas': self.falhas,
+            'latenciaMedia': self.latencia_media,
+            'ultimaLatencia': self.ultima_latencia,
+        }
+
+
+class RoteadorModelos:
+    """Envia cada geração ao modelo disponível mais rápido"""
+
+    def __init__(self, configuracao, modelos=None, ttl=300):
+        self.configuracao = configuracao
+        self.ttl = ttl
+        self._estados = {nome: EstadoModelo(nome) for nome in (modelos or MODELOS_PADRAO)}
+        self._sondado_em = None
+        self._sondando = False
+        # Recarga da configuração (troca de chave) invalida a disponibilidade
+        self._recargas = None
+        self._lock = threading.Lock()
+        self.sondagens = 0
+
+    @property
+    def modelos(self):
+        return list(self._estados)
+
+    def sondar(self):
+        """Consulta os modelos com generateContent na conta atual (bloqueia; usado pela thread de sonda)"""
+        try:
+            nomes = {
+                modelo.name.split('/', 1)[-1]
+                for modelo in genai.list_models()
+                if 'generateContent' in modelo.supported_generation_methods
+            }
+        except Exception as e:
+            # Sem a lista a disponibilidade fica desconhecida: as gerações decidem
+            logger.warning('Falha ao consultar os modelos do Gemini: %s', e)
+            nomes = None
+        with self._lock:
+            for estado in self._estados.values():
+                estado.disponivel = None if nomes is None else estado.nome in nomes
+            self._sondado_em = time.monotonic()
+            self._sondando = False
+            self.sondagens += 1
+        if nomes is not None:
+            logger.info('Modelos do Gemini disponíveis: %s',
+                        ', '.join(n for n, e in self._estados.items() if e.disponivel) or 'nenhum')
+
+    def _agendar_sonda(self):
+        """Inicia a sonda em segundo plano se a disponibilidade venceu; chamar com o lock"""
+        recargas = self.configuracao.recargas
+        if recargas != self._recargas:
+            self._recargas = recargas
+            self._sondado_em = None
+            for estado in self._estados.values():
+                estado.disponivel, estado.falhou_em = None, None
+        if self._sondando or not self.configuracao.api_key:
+            return
+        if self._sondado_em is not None and time.monotonic() - self._sondado_em < self.ttl:
+            return
+        self._sondando = True
+        threading.Thread(target=self.sondar, name='gemini-sonda', daemon=True).start()
+
+    def ordem(self):
+        """Modelos a tentar, do preferido ao último"""
+        with self._lock:
+            self._agendar_sonda()
+            agora = time.monotonic()
+            saudaveis = [
+                estado for estado in self._estados.values()
+                if estado.disponivel is not False
+                and (estado.falhou_em is None or agora - estado.falhou_em >= self.ttl)
+            ]
+            if not saudaveis:
+                return self.modelos
+            medidos = sorted((e for e in saudaveis if e.latencia_media is not None), key=lambda e: e.latencia_media)
+            ordem = [e.nome for e in medidos] + [e.nome for e in saudaveis if e.latencia_media is None]
+            # Um disponível sem medição recente vai à frente para ser (re)medido
+            for estado in saudaveis:
+                if estado.disponivel and (estado.medido_em is None or agora - estado.medido_em >= self.ttl):
+                    ordem.remove(estado.nome)
+                    ordem.insert(0, estado.nome)
+                    break
+            return ordem
+
+    def _registrar(self, nome, latencia=None, erro=None):
+        with self._lock:
+            estado = self._estados[nome]
+            if erro is None:
+                estado.sucessos += 1
+                estado.falhou_em, estado.erro = None, None
+                estado.ultima_latencia = latencia
+                estado.medido_em = time.monotonic()
+                estado.latencia_media = latencia if estado.latencia_media is None else (
+                    PESO_LATENCIA * latencia + (1 - PESO_LATENCIA) * estado.latencia_media)
+            else:
+                estado.falhas += 1
+                estado.falhou_em = time.monotonic()
+                estado.erro = erro
+
+    def gerar(self, prompt):
+        """
+        Gera o conteúdo no primeiro modelo da ordem que responder.
+
+        Returns:
+            Resposta do genai (GenerateContentResponse)
+
+        Raises:
+            Exception: Se nenhum modelo responder
+        """
+        modelos_tentados = []
+        ultimo_erro = None
+        for modelo_nome in self.ordem():
+            modelos_tentados.append(modelo_nome)
+            inicio = time.perf_counter()
+            try:
+                response = self.configuracao.modelo(modelo_nome).generate_content(prompt)
+            except Exception as e:
+                ultimo_erro = str(e)
+                logger.warning('Modelo %s falhou; tentando o próximo: %s', modelo_nome, e)
+                self._registrar(modelo_nome, erro=ultimo_erro)
+                continue
+            self._registrar(modelo_nome, latencia=time.perf_counter() - inicio)
+            return response
+        raise _sem_modelo(modelos_tentados, ultimo_erro)
+
+    def gerar_stream(self, prompt):
+        """
+        Como gerar, com generate_content(stream=True): entrega os trechos de
+        texto conforme o modelo gera. Só passa ao próximo modelo se a falha vier
+        antes do primeiro trecho; depois disso a exceção chega a quem consome.
+
+        Yields:
+            str: Trechos de texto da resposta
+        """
+        modelos_tentados = []
+        ultimo_erro = None
+        for modelo_nome in self.ordem():
+            modelos_tentados.append(modelo_nome)
+            inicio = time.perf_counter()
+            try:
+                partes = iter(self.configuracao.modelo(modelo_nome).generate_content(prompt, stream=True))
+                # Modelo inexistente ou chave inválida falham aqui, antes de qualquer texto
+                primeira = next(partes, None)
+            except Exception as e:
+                ultimo_erro = str(e)
+                logger.warning('Modelo %s falhou; tentando o próximo: %s', modelo_nome, e)
+                self._registrar(modelo_nome, erro=ultimo_erro)
+                continue
+            try:
+                for texto in _textos(primeira, partes):
+                    yield texto
+            except Exception as e:
+                self._registrar(modelo_nome, erro=str(e))
+                raise
+            self._registrar(modelo_nome, latencia=time.perf_counter() - inicio)
+            return
+        raise _sem_modelo(modelos_tentados, ultimo_erro)
+
+    def stats(self):
+        agora = time.monotonic()
+        with self._lock:
+            return {
+                'modelos': [estado.resumo(agora) for estado in self._estados.values()],
+                'sondagens': self.sondagens,
+                'sondadoHa': None if self._sondado_em is None else agora - self._sondado_em,
+            }
+
+
+def _textos(primeira, partes):
+    """Texto de cada trecho do stream, a partir do primeiro já lido"""
+    if primeira is None:
+        return
+    for parte in itertools.chain([primeira], partes):
+        try:
+            texto = parte.text
+        except ValueError:
+            # Trecho sem partes de texto (ex: só com o finish_reason)
+            continue
+        if texto:
+            yield texto
+
+
+def _sem_modelo(modelos_tentados, ultimo_erro):
+    return Exception(f"Nenhum modelo do Gemini está disponível. Modelos tentados: {', '.join(modelos_tentados)}. Último erro: {ultimo_erro}")
+
+
+_roteador = None
+_roteador_lock = threading.Lock()
+
+
+def _lista(valor):
+    if isinstance(valor, str):
+        valor = [nome.strip() for nome in valor.split(',')]
+    return [nome for nome in (valor or []) if nome] or None
+
+
+def init_app(app):
+    """Cria o roteador com GEMINI_MODELS e GEMINI_MODEL_HEALTH_TTL do app Flask"""
+    global _roteador
+    with _roteador_lock:
+        _roteador = RoteadorModelos(
+            get_configuracao(),
+            modelos=_lista(app.config.get('GEMINI_MODELS')),
+            ttl=float(app.config.get('GEMINI_MODEL_HEALTH_TTL', 300)),
+        )
+    app.extensions['gemini_modelos'] = _roteador
+    return _roteador
+
+
+def get_roteador():
+    """Retorna o roteador compartilhado (criado com as variáveis de ambiente se init_app não foi chamado)"""
+    global _roteador
+    if _roteador is None:
+        with _roteador_lock:
+            if _roteador is None:
+                _roteador = RoteadorModelos(
+                    get_configuracao(),
+                    modelos=_lista(os.getenv('GEMINI_MODELS')),
+                    ttl=float(os.getenv('GEMINI_MODEL_HEALTH_TTL') or 300),
+                )
+    return _roteador
@@ -1,21 +1,25 @@
 import sys
 import os
+import logging
 
 # Adiciona o diretório raiz do projeto (duas pastas acima) ao sys.path
 root_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 if root_path not in sys.path:
     sys.path.insert(0, root_path)
 
-print("[INFO] Caminho raiz adicionado ao sys.path:", root_path)
+logger = logging.getLogger(__name__)
 
 # Import absoluto a partir do diretório raiz do projeto
 # O pacote IAAPI está dentro da pasta `web/IAAPI`, portanto importamos via `web.IAAPI`.
 from web.IAAPI.GeminiController import gemini_bp
+from web.IAAPI import cache_sugestoes, configuracao as configuracao_ia, roteador_modelos
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_bcrypt import Bcrypt
 from config import config
 from dotenv import load_dotenv
+from services import (api_client, cache, user_profiles, logging_setup, metrics, response_encoding, json_codec,
+                      stats, chamados_store, eventos, lote, tarefas)
 
 
 
@@ -31,6 +35,15 @@ def create_app(config_name='default'):
     # Carrega as configurações
     app.config.from_object(config[config_name])
     
+    # Logging com nível de LOG_LEVEL, escrita em thread separada e ID por requisição
+    logging_setup.init_app(app)
+    logger.info("Caminho raiz adicionado ao sys.path: %s", root_path)
+    # Latência por rota e chamadas à API do Azure, expostas em GET /metrics
+    metrics.init_app(app)
+    
+    # jsonify/request.get_json com orjson (se instalado)
+    json_codec.init_app(app)
+    
     # Inicializa as extensões
     # CORS: Em desenvolvimento, permitir todas as origens para facilitar testes com mobile
     # Em produção, remover o '*' e especificar apenas as origens permitidas
@@ -51,6 +64,31 @@ def create_app(config_name='default'):
              methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
     bcrypt = Bcrypt(app)
     
+    # Cliente HTTP compartilhado (pool keep-alive) para a API do Azure
+    api_client.init_app(app)
+    # Cache das coleções de chamados e usuários (TTL + invalidação nas escritas)
+    cache.init_app(app)
+    # Perfis de usuário por ID (login sem segunda chamada à API)
+    user_profiles.init_app(app)
+    # Agregados dos painéis (GET /api/stats), atualizados nas escritas de chamados
+    stats.init_app(app)
+    # Versões dos chamados para GET /chamados/changes
+    store = chamados_store.init_app(app)
+    # Push das mudanças do store para GET /events/chamados (SSE)
+    eventos.init_app(app, store)
+    # Pool das chamadas em paralelo de POST .../batch e PUT /chamados/bulk
+    lote.init_app(app)
+    # Geração de sugestões do Gemini em segundo plano (GET /api/gemini/jobs/<id>)
+    tarefas.init_app(app)
+    # Sugestões já geradas para chamados iguais ou parecidos (SQLite)
+    cache_sugestoes.init_app(app)
+    # Chave e modelos do Gemini carregados uma vez (relidos quando o .env muda)
+    configuracao_ia.init_app(app)
+    # Modelo do Gemini mais rápido entre os disponíveis (GET /api/gemini/modelos)
+    roteador_modelos.init_app(app)
+    # ETag/304 e compressão (gzip/brotli) das respostas JSON
+    response_encoding.init_app(app)
+    
     return app
 
 app = create_app()
@@ -72,14 +110,36 @@ def register_routes():
         from pages.chamados_criar import criar_chamado
         app.add_url_rule('/chamados', view_func=criar_chamado, methods=['POST'])
         
-        from pages.chamados_listar import listar_chamados, listar_chamados_em_andamento
+        from pages.chamados_listar import listar_chamados, listar_chamados_em_andamento, listar_mudancas
         app.add_url_rule('/chamados', view_func=listar_chamados, methods=['GET'])
         app.add_url_rule('/chamados/andamento', view_func=listar_chamados_em_andamento, methods=['GET'])
+        app.add_url_rule('/chamados/changes', view_func=listar_mudancas, methods=['GET'])
+
+        # Vários chamados/usuários por ID em uma requisição
+        from pages.buscar_em_lote import buscar_chamados_em_lote, buscar_usuarios_em_lote
+        app.add_url_rule('/chamados/batch', view_func=buscar_chamados_em_lote, methods=['POST'])
+        app.add_url_rule('/api/Usuarios/batch', view_func=buscar_usuarios_em_lote, methods=['POST'])
+
+        # Atualização de vários chamados (fechar/atribuir em massa)
+        from pages.chamados_atualizar_em_lote import atualizar_chamados_em_lote
+        app.add_url_rule('/chamados/bulk', view_func=atualizar_chamados_em_lote, methods=['PUT'])
+
+        # Releitura da chave do Gemini sem reiniciar o servidor (administradores)
+        from pages.configuracao_ia import recarregar_configuracao_ia
+        app.add_url_rule('/api/gemini/config/reload', view_func=recarregar_configuracao_ia, methods=['POST'])
+
+        from pages.eventos_chamados import assinar_eventos_chamados, emitir_bilhete_eventos
+        app.add_url_rule('/events/chamados', view_func=assinar_eventos_chamados, methods=['GET'])
+        app.add_url_rule('/events/chamados/bilhete', view_func=emitir_bilhete_eventos, methods=['POST'])
 
         # Importa e registra rotas de detalhar e atualizar usando uma rota unificada
         from pages.chamados_detalhar_atualizar import detalhar_chamado
         app.add_url_rule('/chamados/<int:chamado_id>', view_func=detalhar_chamado, methods=['GET', 'PUT', 'OPTIONS'])
         
+        # Agregados para os painéis de relatórios
+        from pages.estatisticas import obter_estatisticas
+        app.add_url_rule('/api/stats', view_func=obter_estatisticas, methods=['GET'])
+        
         # Importa funções de usuários
         from pages.atualizar_usuario import gerenciar_usuario
         from pages.meu_perfil import gerenciar_meu_perfil
@@ -102,14 +162,11 @@ def register_routes():
         # Rota alternativa para /usuarios/<id> (mantida para compatibilidade)
         app.add_url_rule('/usuarios/<int:usuario_id>', view_func=gerenciar_usuario, methods=['GET', 'PUT', 'DELETE', 'OPTIONS'])
         
-        print("Rotas registradas com sucesso!")
-        print("Rotas de Usuários:")
-        print("  - GET, PUT, DELETE /api/Usuarios/<id>")
-        print("  - GET, PUT /api/Usuarios/meu-perfil")
-        print("  - PUT /api/Usuarios/alterar-senha")
-        print("  - GET /api/Usuarios")
+        logger.info("Rotas registradas com sucesso!")
+        logger.debug("Rotas de Usuários: GET, PUT, DELETE /api/Usuarios/<id>; GET, PUT /api/Usuarios/meu-perfil; "
+                     "PUT /api/Usuarios/alterar-senha; GET /api/Usuarios")
     except Exception as e:
-        print(f"Erro ao registrar rotas: {e}")
+        logger.exception("Erro ao registrar rotas: %s", e)
 
 # Registra as rotas após criar o app
 register_routes()
@@ -120,13 +177,12 @@ app.register_blueprint(gemini_bp, url_prefix='/api/gemini')
 # Handler para métodos não permitidos (405)
 @app.errorhandler(405)
 def method_not_allowed(e):
-    print(f'[ERROR 405] Método não permitido: {request.method} em {request.url}')
-    print(f'[ERROR 405] Rotas disponíveis: {[str(rule) for rule in app.url_map.iter_rules()]}')
+    logger.warning('Método não permitido: %s em %s', request.method, request.path)
     return jsonify({"message": f"Método {request.method} não permitido para esta rota"}), 405
 
 # ----------------------------------------------------
 # 3. Execução do Servidor
 # ----------------------------------------------------
 if __name__ == "__main__":
-    print("Iniciando servidor Flask...")
+    logger.info("Iniciando servidor Flask...")
     app.run(debug=True, port=5000)
\ No newline at end of file
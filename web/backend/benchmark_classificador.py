@@ -0,0 +1,112 @@
+"""
+Micro-benchmark da classificação e do prompt das sugestões (web/IAAPI)
+
+Compara, por chamado, a implementação anterior de gerar_sugestao (sete
+buscas any(palavra in texto) sobre título + descrição e o prompt montado por
+concatenação) com o classificador de uma varredura (classificador.py) e os
+prompts pré-renderizados por categoria (gemini_service.montar_prompt).
+Os textos são gerados com os assuntos mais comuns dos chamados; as
+categorias encontradas e os prompts são conferidos antes da medição.
+
+Uso:
+    python benchmark_classificador.py --chamados 10000 --repeticoes 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+backend_path = os.path.dirname(os.path.abspath(__file__))
+root_path = os.path.abspath(os.path.join(backend_path, '..', '..'))
+if root_path not in sys.path:
+    sys.path.insert(0, root_path)
+
+from web.IAAPI.classificador import CATEGORIAS, pontuar
+from web.IAAPI.gemini_service import detectar_categoria, montar_prompt, _escrever_prompt
+
+ASSUNTOS = [
+    ('Esqueci minha senha', 'Esqueci a senha do meu computador e não consigo entrar no sistema.'),
+    ('Solicitação de acesso', 'Preciso de permissão de acesso à pasta do financeiro.'),
+    ('Impressora não imprime', 'A impressora do {andar} andar não imprime, fica na fila de impressão.'),
+    ('Sem internet', 'Estou sem conexão com a internet desde cedo, o wi-fi conecta mas não navega.'),
+    ('Outlook travando', 'O Outlook não abre e o e-mail não sincroniza.'),
+    ('Mouse com defeito', 'O mouse e o teclado do notebook pararam de responder.'),
+    ('Erro no sistema', 'O sistema de vendas mostra um erro ao salvar o pedido.'),
+    ('Monitor piscando', 'O monitor fica piscando depois que liguei o computador.'),
+    ('Cadeira quebrada', 'A cadeira da sala de reuniões do {andar} andar está quebrada.'),
+]
+ANDARES = ['primeiro', 'segundo', 'terceiro', 'quarto']
+
+
+def gerar_textos(total, semente=42):
+    aleatorio = random.Random(semente)
+    textos = []
+    for i in range(total):
+        titulo, descricao = aleatorio.choice(ASSUNTOS)
+        descricao = descricao.format(andar=aleatorio.choice(ANDARES)) + f' Chamado {i}.'
+        textos.append((titulo, descricao))
+    return textos
+
+
+def categorias_busca_separada(titulo, descricao):
+    """Implementação anterior: uma busca de substring por categoria"""
+    titulo_lower = titulo.lower() if titulo else ""
+    descricao_lower = descricao.lower() if descricao else ""
+    return {
+        categoria for categoria, palavras in CATEGORIAS.items()
+        if any(palavra in titulo_lower + " " + descricao_lower for palavra in palavras)
+    }
+
+
+def prompt_busca_separada(titulo, descricao):
+    """Implementação anterior: categorias e prompt montado por concatenação a cada chamado"""
+    categorias = categorias_busca_separada(titulo, descricao)
+    categoria = next((c for c in ('reset_senha', 'acesso') if c in categorias), 'geral')
+    return _escrever_prompt(titulo, descricao, categoria)
+
+
+def prompt_classificador(titulo, descricao):
+    return montar_prompt(titulo, descricao, detectar_categoria(titulo, descricao))
+
+
+def melhor_tempo(funcao, textos, repeticoes):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for titulo, descricao in textos:
+            funcao(titulo, descricao)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da classificação e do prompt das sugestões')
+    parser.add_argument('--chamados', type=int, default=10000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    textos = gerar_textos(args.chamados)
+    for titulo, descricao in textos:
+        assert categorias_busca_separada(titulo, descricao) == set(pontuar(f'{titulo} {descricao}'))
+        assert prompt_busca_separada(titulo, descricao) == prompt_classificador(titulo, descricao)
+
+    etapas = [
+        ('categorias', categorias_busca_separada, lambda t, d: pontuar(f'{t} {d}')),
+        ('prompt', prompt_busca_separada, prompt_classificador),
+    ]
+    print('=' * 64)
+    print(f"{'etapa':<12}{'chamados':>10}{'busca separada':>16}{'autômato':>12}{'ganho':>10}")
+    print(f"{'':<12}{'':>10}{'µs/chamado':>16}{'µs/cham.':>12}")
+    print('-' * 64)
+    por_chamado = 1e6 / len(textos)
+    for etapa, antes_funcao, depois_funcao in etapas:
+        antes = melhor_tempo(antes_funcao, textos, args.repeticoes)
+        depois = melhor_tempo(depois_funcao, textos, args.repeticoes)
+        print(f"{etapa:<12}{len(textos):>10}{antes * por_chamado:>16.2f}"
+              f"{depois * por_chamado:>12.2f}{antes / depois:>9.1f}x")
+    print('=' * 64)
+
+
+if __name__ == '__main__':
+    main()
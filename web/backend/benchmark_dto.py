@@ -0,0 +1,74 @@
+"""
+Micro-benchmark da normalização de DTOs (services/dto.py)
+
+Compara, por registro, a normalização campo a campo usada antes nas páginas
+(usuario.get('nome') or usuario.get('Nome') ...) com USUARIO_RESUMO, em
+listas de usuários no formato da API do Azure geradas por fake_azure_api.py.
+Mede listas em camelCase e em PascalCase.
+
+Uso:
+    python benchmark_dto.py --usuarios 50000 --repeticoes 5
+"""
+import argparse
+import os
+import sys
+import time
+
+backend_path = os.path.dirname(os.path.abspath(__file__))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from fake_azure_api import Dados, _sem_hash
+from services.dto import USUARIO_RESUMO, pascal
+
+
+def normalizar_campo_a_campo(usuarios):
+    """Implementação anterior de listar_usuarios"""
+    return [{
+        'id': usuario.get('id') or usuario.get('Id'),
+        'nome': usuario.get('nome') or usuario.get('Nome') or '',
+        'email': usuario.get('email') or usuario.get('Email') or '',
+        'telefone': usuario.get('telefone') or usuario.get('Telefone') or '',
+        'cargo': usuario.get('cargo') or usuario.get('Cargo') or '',
+        'permissao': usuario.get('permissao') if usuario.get('permissao') is not None else usuario.get('Permissao')
+    } for usuario in usuarios]
+
+
+def melhor_tempo(funcao, repeticoes):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da normalização de DTOs')
+    parser.add_argument('--usuarios', type=int, default=50000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    dados = Dados(total_chamados=0, total_usuarios=args.usuarios)
+    camel = [_sem_hash(u) for u in dados.usuarios.values()]
+    listas = {
+        'camelCase': camel,
+        'PascalCase': [{pascal(k): v for k, v in u.items()} for u in camel],
+    }
+
+    print('=' * 64)
+    print(f"{'formato':<12}{'usuarios':>10}{'campo a campo':>16}{'dto':>10}{'ganho':>10}")
+    print(f"{'':<12}{'':>10}{'µs/registro':>16}{'µs/reg.':>10}")
+    print('-' * 64)
+    for formato, usuarios in listas.items():
+        assert normalizar_campo_a_campo(usuarios) == USUARIO_RESUMO.normalizar_lista(usuarios)
+        antes = melhor_tempo(lambda: normalizar_campo_a_campo(usuarios), args.repeticoes)
+        depois = melhor_tempo(lambda: USUARIO_RESUMO.normalizar_lista(usuarios), args.repeticoes)
+        por_registro = 1e6 / len(usuarios)
+        print(f"{formato:<12}{len(usuarios):>10}{antes * por_registro:>16.2f}"
+              f"{depois * por_registro:>10.2f}{antes / depois:>9.1f}x")
+    print('=' * 64)
+
+
+if __name__ == '__main__':
+    main()
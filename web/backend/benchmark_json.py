@@ -0,0 +1,72 @@
+"""
+Micro-benchmark do codec JSON (json da biblioteca padrão x orjson)
+
+Mede leitura (loads) e escrita (dumps) de listas de chamados e usuários no
+mesmo formato da API do Azure, geradas por fake_azure_api.py.
+
+Uso:
+    python benchmark_json.py --chamados 20000 --usuarios 5000 --repeticoes 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+backend_path = os.path.dirname(os.path.abspath(__file__))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from fake_azure_api import Dados, _sem_hash
+from services import json_codec
+
+
+def melhor_tempo(funcao, repeticoes):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do codec JSON')
+    parser.add_argument('--chamados', type=int, default=20000)
+    parser.add_argument('--usuarios', type=int, default=5000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    dados = Dados(args.chamados, args.usuarios)
+    payloads = {
+        'Chamado': [dados.chamado_completo(c) for c in dados.chamados.values()],
+        'Usuario': [_sem_hash(u) for u in dados.usuarios.values()],
+    }
+
+    codecs = ['stdlib']
+    if json_codec.orjson is not None:
+        codecs.append('orjson')
+    else:
+        print('⚠️  orjson não instalado: apenas a biblioteca padrão será medida')
+
+    print('=' * 78)
+    print(f"{'payload':<10}{'itens':>8}{'MB':>7}{'codec':>9}{'loads ms':>12}{'dumps ms':>12}{'ganho':>10}")
+    print('-' * 78)
+    for nome, itens in payloads.items():
+        # Entrada no formato em que chega da API (WriteIndented)
+        texto = json.dumps(itens, indent=2, ensure_ascii=False).encode('utf-8')
+        base = None
+        for codec in codecs:
+            json_codec.configurar(codec)
+            t_loads = melhor_tempo(lambda: json_codec.loads(texto), args.repeticoes) * 1000
+            t_dumps = melhor_tempo(lambda: json_codec.dumps_bytes(itens), args.repeticoes) * 1000
+            total = t_loads + t_dumps
+            base = base or total
+            print(f"{nome:<10}{len(itens):>8}{len(texto) / 1e6:>7.1f}{codec:>9}"
+                  f"{t_loads:>12.1f}{t_dumps:>12.1f}{base / total:>9.1f}x")
+    print('=' * 78)
+    json_codec.configurar('auto')
+
+
+if __name__ == '__main__':
+    main()
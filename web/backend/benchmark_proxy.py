@@ -0,0 +1,171 @@
+"""
+Benchmark de vazão e latência do backend Flask
+
+Dispara requisições concorrentes contra as rotas do backend e mostra, por
+cenário, requisições por segundo e percentis de latência.
+
+Uso típico (tudo local, sem acessar o Azure):
+    python benchmark_proxy.py --local --chamados 100000 --cenarios listar_paginado,detalhar
+
+Com --local, a API fake (fake_azure_api.py) e o backend sobem neste mesmo
+processo em portas livres; como dividem o GIL com o gerador de carga, os
+números servem para comparar versões, não como capacidade absoluta. Sem
+--local, o benchmark usa um backend já em execução (--backend, padrão
+http://localhost:5000), que deve estar apontado para a API fake com API_URL_BASE.
+"""
+import argparse
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Adiciona o diretório do backend ao path (para o modo --local)
+backend_path = os.path.dirname(os.path.abspath(__file__))
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+
+# nome -> função que recebe o gerador aleatório e devolve o caminho
+CENARIOS = {
+    'listar': lambda rnd, total: '/chamados',
+    'listar_filtrado': lambda rnd, total: f'/chamados?status={rnd.randint(1, 3)}&sort=-dataAbertura',
+    'listar_paginado': lambda rnd, total: f'/chamados?page={rnd.randint(1, 10)}&pageSize=20',
+    'andamento': lambda rnd, total: '/chamados/andamento',
+    'detalhar': lambda rnd, total: f'/chamados/{rnd.randint(1, total)}',
+    'usuarios': lambda rnd, total: '/api/Usuarios',
+}
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _servir(app, porta):
+    from werkzeug.serving import make_server
+    servidor = make_server('127.0.0.1', porta, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def iniciar_local(args):
+    """Sobe a API fake e o backend em threads; retorna a URL do backend"""
+    from fake_azure_api import create_fake_app
+
+    porta_fake = _porta_livre()
+    _servir(create_fake_app(args.chamados, args.usuarios, args.latencia_ms, args.jitter_ms), porta_fake)
+
+    # O backend lê API_URL_BASE ao importar config.py
+    os.environ['API_URL_BASE'] = f'http://127.0.0.1:{porta_fake}'
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('API_POOL_MAXSIZE', str(max(args.concorrencia, 16)))
+    from app import app
+
+    porta_backend = _porta_livre()
+    _servir(app, porta_backend)
+    return f'http://127.0.0.1:{porta_backend}'
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100.0 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def executar_cenario(sessao, base_url, nome, total_requisicoes, concorrencia, total_chamados, seed):
+    gerar_caminho = CENARIOS[nome]
+    rnd = random.Random(seed)
+    caminhos = [gerar_caminho(rnd, total_chamados) for _ in range(total_requisicoes)]
+    latencias = []
+    erros = 0
+    lock = threading.Lock()
+
+    def uma_requisicao(caminho):
+        nonlocal erros
+        inicio = time.perf_counter()
+        try:
+            resp = sessao.get(f'{base_url}{caminho}', timeout=60)
+            _ = resp.content
+            ok = resp.status_code < 400 or resp.status_code == 404
+        except requests.exceptions.RequestException:
+            ok = False
+        duracao = time.perf_counter() - inicio
+        with lock:
+            latencias.append(duracao)
+            if not ok:
+                erros += 1
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        list(executor.map(uma_requisicao, caminhos))
+    total = time.perf_counter() - inicio
+
+    return {
+        'cenario': nome,
+        'requisicoes': total_requisicoes,
+        'erros': erros,
+        'rps': total_requisicoes / total if total else 0.0,
+        'p50': percentil(latencias, 50) * 1000,
+        'p95': percentil(latencias, 95) * 1000,
+        'p99': percentil(latencias, 99) * 1000,
+        'max': max(latencias) * 1000 if latencias else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do backend HelpWave')
+    parser.add_argument('--backend', default='http://localhost:5000', help='URL do backend (sem --local)')
+    parser.add_argument('--local', action='store_true', help='Sobe API fake + backend neste processo')
+    parser.add_argument('--chamados', type=int, default=5000, help='Tamanho do conjunto (modo --local)')
+    parser.add_argument('--usuarios', type=int, default=500, help='Usuários gerados (modo --local)')
+    parser.add_argument('--latencia-ms', type=float, default=40.0, help='Latência da API fake (modo --local)')
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help='Variação da latência (modo --local)')
+    parser.add_argument('--requisicoes', type=int, default=200, help='Requisições por cenário')
+    parser.add_argument('--concorrencia', type=int, default=20)
+    parser.add_argument('--cenarios', default=','.join(CENARIOS), help='Lista separada por vírgula')
+    parser.add_argument('--email', default='admin@helpwave.local')
+    parser.add_argument('--senha', default='senha123')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    base_url = iniciar_local(args) if args.local else args.backend.rstrip('/')
+
+    sessao = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=args.concorrencia)
+    sessao.mount('http://', adapter)
+    sessao.mount('https://', adapter)
+
+    resp = sessao.post(f'{base_url}/login', json={'email': args.email, 'senha': args.senha}, timeout=30)
+    if resp.status_code != 200:
+        print(f'❌ Login falhou ({resp.status_code}): {resp.text[:200]}')
+        sys.exit(1)
+    sessao.headers['Authorization'] = f"Bearer {resp.json()['token']}"
+
+    print('=' * 86)
+    print(f'BENCHMARK {base_url} | {args.requisicoes} requisições por cenário, concorrência {args.concorrencia}')
+    if args.local:
+        print(f'API fake: {args.chamados} chamados, latência {args.latencia_ms}ms + até {args.jitter_ms}ms')
+    print('=' * 86)
+    print(f"{'cenário':<18}{'req':>7}{'erros':>7}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    print('-' * 86)
+    for nome in [c.strip() for c in args.cenarios.split(',') if c.strip()]:
+        if nome not in CENARIOS:
+            print(f'⚠️  Cenário desconhecido: {nome}')
+            continue
+        r = executar_cenario(sessao, base_url, nome, args.requisicoes, args.concorrencia, args.chamados, args.seed)
+        print(f"{r['cenario']:<18}{r['requisicoes']:>7}{r['erros']:>7}{r['rps']:>10.1f}"
+              f"{r['p50']:>10.1f}{r['p95']:>10.1f}{r['p99']:>10.1f}{r['max']:>10.1f}")
+    print('=' * 86)
+
+
+if __name__ == '__main__':
+    main()
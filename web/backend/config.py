@@ -23,19 +23,148 @@ class Config:
     ]
     
     # Configurações da API externa
-    API_URL_BASE = 'https://api-suporte-grupoads-e4hmccf7gaczdbht.brazilsouth-01.azurewebsites.net'
-    API_TIMEOUT = 30
+    API_URL_BASE = os.environ.get('API_URL_BASE') or 'https://api-suporte-grupoads-e4hmccf7gaczdbht.brazilsouth-01.azurewebsites.net'
+    API_TIMEOUT = int(os.environ.get('API_TIMEOUT', 30))  # Timeout de leitura (segundos)
+    API_CONNECT_TIMEOUT = int(os.environ.get('API_CONNECT_TIMEOUT', 5))  # Timeout de conexão (segundos)
+    
+    # Pool de conexões keep-alive com a API externa (por processo/worker)
+    # API_POOL_MAXSIZE deve acompanhar o número de threads de cada worker
+    API_POOL_CONNECTIONS = int(os.environ.get('API_POOL_CONNECTIONS', 4))
+    API_POOL_MAXSIZE = int(os.environ.get('API_POOL_MAXSIZE', 16))
+    
+    # Circuit breaker por endpoint da API externa
+    BREAKER_FAILURE_THRESHOLD = 5  # Falhas seguidas (rede, timeout ou 5xx) para abrir o circuito
+    BREAKER_RESET_TIMEOUT = 30     # Segundos com o circuito aberto antes de uma chamada de teste
+    
+    # Servidor de produção (serve.py): workers gevent, cada um com muitas requisições simultâneas
+    SERVER_HOST = os.environ.get('SERVER_HOST') or '0.0.0.0'
+    SERVER_PORT = int(os.environ.get('SERVER_PORT', 5000))
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', os.cpu_count() or 1))
+    SERVER_WORKER_CONNECTIONS = int(os.environ.get('SERVER_WORKER_CONNECTIONS', 1000))
+    SERVER_KEEPALIVE = int(os.environ.get('SERVER_KEEPALIVE', 5))  # Segundos de keep-alive com os clientes
+    SERVER_TIMEOUT = int(os.environ.get('SERVER_TIMEOUT', 120))  # Sugestões da IA podem levar dezenas de segundos
+    
+    # Paginação de GET /chamados (usada quando ?page ou ?pageSize são informados)
+    CHAMADOS_PAGE_SIZE = 20
+    CHAMADOS_MAX_PAGE_SIZE = 200
+    # Listas sem paginação a partir deste tamanho são enviadas em streaming (chunked)
+    CHAMADOS_STREAM_MIN_ITEMS = 1000
+    # Chamados removidos lembrados por GET /chamados/changes; clientes mais atrasados recebem a lista completa
+    CHAMADOS_MAX_TOMBSTONES = 10000
+    # Lista da API com menos que esta fração dos chamados conhecidos não é sincronizada (evita remover tudo)
+    CHAMADOS_SYNC_MIN_FRACAO = 0.1
     
     # Configurações de autenticação
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-helpwave'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     
     # Configurações de logging
-    LOG_LEVEL = 'INFO'
+    LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
+    # Fração das requisições cujos payloads completos são logados (somente em DEBUG)
+    LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get('LOG_PAYLOAD_SAMPLE_RATE', 0.01))
+    
+    # Métricas no formato do Prometheus em GET /metrics
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() != 'false'
+    
+    # ETag/304 e compressão das respostas GET em JSON (brotli se o pacote estiver instalado, senão gzip)
+    ETAG_ENABLED = os.environ.get('ETAG_ENABLED', 'true').lower() != 'false'
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() != 'false'
+    COMPRESS_MIN_SIZE = 1024        # Respostas menores (bytes) não compensam a compressão
+    COMPRESS_LEVEL = 6              # Nível do gzip (1-9)
+    COMPRESS_BROTLI_QUALITY = 4     # Qualidade do brotli (0-11); valores altos custam muita CPU
+    
+    # Codec JSON: 'auto' (orjson se instalado), 'orjson' ou 'stdlib'
+    JSON_CODEC = os.environ.get('JSON_CODEC') or 'auto'
     
     # Configurações de cache
-    CACHE_TYPE = 'simple'
+    # 'simple' = cache LRU em memória do processo; 'null' desativa o cache
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'simple'
     CACHE_DEFAULT_TIMEOUT = 300
+    # TTL (segundos) por coleção; coleções sem entrada usam CACHE_DEFAULT_TIMEOUT
+    CACHE_TIMEOUTS = {
+        'chamados': 30,
+        'usuarios': 60,
+        # meu-perfil, usado para validar o chamador de /api/stats
+        'perfil': 120,
+    }
+    # Por quanto tempo após vencer uma resposta ainda pode ser servida (marcada como
+    # desatualizada) enquanto a API externa estiver indisponível
+    CACHE_STALE_TIMEOUT = 600
+    CACHE_MAX_ENTRIES = 1024
+    CACHE_MAX_BYTES = 64 * 1024 * 1024  # Limite aproximado pelo tamanho dos payloads
+    
+    # Perfis de usuário por ID, usados pelo login para evitar uma segunda chamada à API
+    USER_PROFILE_TTL = 120
+    USER_PROFILE_CACHE_SIZE = 5000
+    # 'eager': no login, busca o perfil na API se não estiver em cache
+    # 'lazy': responde só com o token e dados do JWT; o front-end busca /api/Usuarios/meu-perfil
+    LOGIN_PROFILE_MODE = os.environ.get('LOGIN_PROFILE_MODE') or 'eager'
+    
+    # Agregados de GET /api/stats: recalculados após este tempo (segundos); antes disso
+    # só são atualizados pelas escritas de chamados que passam pelo proxy
+    STATS_TIMEOUT = int(os.environ.get('STATS_TIMEOUT', 300))
+
+    # Eventos de chamados (GET /events/chamados, Server-Sent Events)
+    EVENTS_MAX_CLIENTS = int(os.environ.get('EVENTS_MAX_CLIENTS', 5000))
+    # Eventos recentes guardados para reconexões com Last-Event-ID
+    EVENTS_BUFFER_SIZE = 1000
+    # Segundos sem eventos até enviar um comentário de keepalive
+    EVENTS_KEEPALIVE = 15
+    # Intervalo (segundos) da busca em segundo plano que detecta mudanças feitas direto na API
+    EVENTS_REFRESH_INTERVAL = int(os.environ.get('EVENTS_REFRESH_INTERVAL', 15))
+    # Validade (segundos) do bilhete de uso único que abre o stream (POST /events/chamados/bilhete)
+    EVENTS_TICKET_TTL = 30
+    # Arquivo SQLite dos bilhetes, compartilhado pelos workers; vazio usa web/backend/eventos_bilhetes.sqlite3
+    EVENTS_TICKETS_PATH = os.environ.get('EVENTS_TICKETS_PATH', '')
+
+    # POST /chamados/batch e /api/Usuarios/batch
+    BATCH_MAX_IDS = 200
+    # Buscas simultâneas na API para os IDs fora do cache (compartilhadas entre requisições);
+    # não deve passar de API_POOL_MAXSIZE
+    BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 8))
+    # PUT /chamados/bulk (usa o mesmo pool de BATCH_MAX_WORKERS)
+    BULK_MAX_ITEMS = 100
+
+    # Fila de geração de sugestões do Gemini (services/tarefas.py)
+    GEMINI_MAX_CONCURRENCY = int(os.environ.get('GEMINI_MAX_CONCURRENCY', 4))
+    # Tarefas pendentes ou em execução; acima disso novas gerações recebem 503
+    GEMINI_MAX_QUEUE = int(os.environ.get('GEMINI_MAX_QUEUE', 100))
+    # Por quanto tempo o resultado fica disponível em GET /api/gemini/jobs/<id> (segundos)
+    GEMINI_JOB_TTL = 600
+    # Arquivo SQLite com o estado das tarefas, consultado por todos os workers;
+    # vazio usa o mesmo arquivo do cache de sugestões (GEMINI_CACHE_PATH)
+    GEMINI_JOBS_PATH = os.environ.get('GEMINI_JOBS_PATH', '')
+    # Espera de POST /api/gemini/sugerir-resposta antes de responder 202 com o jobId
+    # (abaixo do timeout de 30s do cliente desktop)
+    GEMINI_SYNC_WAIT = float(os.environ.get('GEMINI_SYNC_WAIT', 25))
+    # Máximo de ?wait= em GET /api/gemini/jobs/<id>
+    GEMINI_JOB_MAX_WAIT = 25
+    # Intervalo dos comentários de keepalive de POST /api/gemini/sugerir-resposta/stream
+    # enquanto a geração espera na fila (segundos)
+    GEMINI_STREAM_KEEPALIVE = 15
+
+    # Intervalo mínimo entre verificações do mtime do .env do módulo de IA (segundos);
+    # a chave também pode ser relida por POST /api/gemini/config/reload
+    GEMINI_CONFIG_CHECK_INTERVAL = float(os.environ.get('GEMINI_CONFIG_CHECK_INTERVAL', 2))
+
+    # Modelos do Gemini tentados, em ordem de preferência (separados por vírgula);
+    # vazio usa a lista de web/IAAPI/roteador_modelos.py
+    GEMINI_MODELS = os.environ.get('GEMINI_MODELS', '')
+    # Validade da lista de modelos disponíveis (genai.list_models) e por quanto tempo
+    # um modelo que falhou fica fora da rota (segundos)
+    GEMINI_MODEL_HEALTH_TTL = float(os.environ.get('GEMINI_MODEL_HEALTH_TTL', 300))
+
+    # Cache persistente de sugestões do Gemini (web/IAAPI/cache_sugestoes.py)
+    GEMINI_CACHE_ENABLED = os.environ.get('GEMINI_CACHE_ENABLED', 'true').lower() not in ('false', '0', 'no')
+    # Arquivo SQLite compartilhado pelos workers; vazio usa web/backend/gemini_sugestoes.sqlite3
+    GEMINI_CACHE_PATH = os.environ.get('GEMINI_CACHE_PATH', '')
+    # Acima disso as sugestões usadas há mais tempo são descartadas
+    GEMINI_CACHE_MAX_ENTRIES = int(os.environ.get('GEMINI_CACHE_MAX_ENTRIES', 5000))
+    # Validade de uma sugestão guardada (segundos)
+    GEMINI_CACHE_TTL = int(os.environ.get('GEMINI_CACHE_TTL', 7 * 24 * 3600))
+    # Similaridade mínima (Jaccard das palavras da descrição) para reaproveitar a sugestão
+    # de um chamado parecido; 1.0 aceita só descrições com as mesmas palavras
+    GEMINI_CACHE_SIMILARITY = float(os.environ.get('GEMINI_CACHE_SIMILARITY', 0.8))
 
 class DevelopmentConfig(Config):
     """Configuração para desenvolvimento"""
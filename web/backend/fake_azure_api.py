@@ -0,0 +1,452 @@
+"""
+API fake do Azure para testes de carga do backend (sem acessar produção)
+
+Implementa os mesmos endpoints e formatos de resposta da API .NET em
+api/ApiParaBD: login (JWT), chamados e usuários, com um conjunto de dados
+gerado em memória de tamanho configurável e latência artificial por
+requisição. O backend passa a usá-la apontando API_URL_BASE para ela.
+
+Uso:
+    python fake_azure_api.py --chamados 100000 --latencia-ms 40
+    API_URL_BASE=http://127.0.0.1:5099 python app.py
+
+Todos os usuários gerados usam a senha 'senha123'. Contas fixas:
+    admin@helpwave.local    (Administrador)
+    suporte@helpwave.local  (SuporteTecnico)
+    colaborador@helpwave.local (Colaborador)
+
+As mesmas opções podem ser passadas por variáveis de ambiente
+(FAKE_CHAMADOS, FAKE_USUARIOS, FAKE_LATENCIA_MS, FAKE_JITTER_MS, FAKE_SEED, FAKE_PORT).
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask, Response, g, jsonify, request
+
+
+SENHA_PADRAO = 'senha123'
+JWT_KEY = b'helpwave-fake-azure-key'
+
+PERMISSOES = {1: 'Colaborador', 2: 'SuporteTecnico', 3: 'Administrador'}
+TIPOS = ['Hardware', 'Software', 'Rede', 'Acesso', 'Impressora', 'Email']
+ASSUNTOS = ['impressora', 'computador', 'internet', 'sistema', 'e-mail', 'VPN', 'monitor', 'senha']
+CARGOS = ['Analista', 'Assistente', 'Coordenador', 'Gerente', 'Técnico de Suporte']
+
+# A API real devolve o hash bcrypt do solicitante/técnico dentro dos chamados
+HASH_FICTICIO = '$2a$11$' + 'x' * 53
+
+
+# ----------------------------------------------------
+# Dados em memória
+# ----------------------------------------------------
+
+def _data_dotnet(data):
+    """DateTime lido do SQL Server, serializado pelo System.Text.Json (7 casas, sem fuso)"""
+    return data.strftime('%Y-%m-%dT%H:%M:%S.%f') + '0'
+
+
+def _agora_utc():
+    """DateTime.UtcNow serializado (com 'Z')"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f') + '0Z'
+
+
+class Dados:
+    """Usuários e chamados no formato das entidades Usuario e Chamado"""
+
+    def __init__(self, total_chamados=1000, total_usuarios=200, seed=42):
+        self.lock = threading.Lock()
+        self.usuarios = {}
+        self.chamados = {}
+        # Corpo pré-serializado de GET /api/Chamados (refeito após escritas)
+        self._lista_chamados = None
+        self._gerar(max(total_usuarios, 3), total_chamados, random.Random(seed))
+
+    def _gerar(self, total_usuarios, total_chamados, rnd):
+        fixos = [
+            ('Administrador HelpWave', 'admin@helpwave.local', 'Gerente', 3),
+            ('Suporte HelpWave', 'suporte@helpwave.local', 'Técnico de Suporte', 2),
+            ('Colaborador HelpWave', 'colaborador@helpwave.local', 'Analista', 1),
+        ]
+        for i in range(1, total_usuarios + 1):
+            if i <= len(fixos):
+                nome, email, cargo, permissao = fixos[i - 1]
+            else:
+                permissao = rnd.choices([1, 2, 3], weights=[80, 15, 5])[0]
+                nome, email, cargo = f'Usuário {i}', f'usuario{i}@helpwave.local', rnd.choice(CARGOS)
+            self.usuarios[i] = {
+                'id': i,
+                'nome': nome,
+                'email': email,
+                'senhaHash': HASH_FICTICIO,
+                'telefone': f'(11) 9{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}',
+                'cargo': cargo,
+                'permissao': permissao,
+                'primeiroAcesso': False,
+            }
+        self.senhas = {i: SENHA_PADRAO for i in self.usuarios}
+        self.proximo_usuario = total_usuarios + 1
+
+        tecnicos = [u['id'] for u in self.usuarios.values() if u['permissao'] in (2, 3)]
+        inicio = datetime(2025, 1, 1)
+        for i in range(1, total_chamados + 1):
+            abertura = inicio + timedelta(minutes=rnd.randint(0, 60 * 24 * 365), microseconds=rnd.randint(0, 999999))
+            status = rnd.choices([1, 2, 3], weights=[30, 20, 50])[0]
+            tecnico = rnd.choice(tecnicos) if status != 1 else None
+            assunto = rnd.choice(ASSUNTOS)
+            self.chamados[i] = {
+                'id': i,
+                'titulo': f'Problema com {assunto} #{i}',
+                'descricao': f'O usuário relatou que o {assunto} parou de funcionar. Chamado {i} gerado para teste de carga.',
+                'dataAbertura': _data_dotnet(abertura),
+                'dataFechamento': _data_dotnet(abertura + timedelta(hours=rnd.randint(1, 72))) if status == 3 else None,
+                'solucao': 'Equipamento reiniciado e configuração restaurada.' if status == 3 else None,
+                'solicitanteId': rnd.randint(1, total_usuarios),
+                'tecnicoResponsavelId': tecnico,
+                'prioridade': rnd.choice([1, 2, 3]),
+                'status': status,
+                'tipo': rnd.choice(TIPOS),
+            }
+        self.proximo_chamado = total_chamados + 1
+
+    def chamado_completo(self, chamado):
+        """Chamado com .Include(Solicitante) e .Include(TecnicoResponsavel)"""
+        completo = dict(chamado)
+        completo['solicitante'] = self.usuarios.get(chamado['solicitanteId'])
+        completo['tecnicoResponsavel'] = self.usuarios.get(chamado['tecnicoResponsavelId'])
+        return completo
+
+    def lista_chamados(self, indent):
+        with self.lock:
+            if self._lista_chamados is None:
+                corpo = [self.chamado_completo(c) for c in self.chamados.values()]
+                self._lista_chamados = json.dumps(corpo, ensure_ascii=False, indent=indent).encode('utf-8')
+            return self._lista_chamados
+
+    def alterou_chamados(self):
+        self._lista_chamados = None
+
+
+def _sem_hash(usuario):
+    return dict(usuario, senhaHash='')
+
+
+# ----------------------------------------------------
+# JWT (mesmos claims do AuthController: sub, email, role)
+# ----------------------------------------------------
+
+def _b64(dados):
+    return base64.urlsafe_b64encode(dados).rstrip(b'=').decode('ascii')
+
+
+def gerar_token(usuario):
+    cabecalho = _b64(json.dumps({'alg': 'HS256', 'typ': 'JWT'}).encode())
+    payload = _b64(json.dumps({
+        'sub': str(usuario['id']),
+        'email': usuario['email'],
+        'role': PERMISSOES[usuario['permissao']],
+        'exp': int(time.time()) + 8 * 3600,
+    }).encode())
+    assinatura = hmac.new(JWT_KEY, f'{cabecalho}.{payload}'.encode(), hashlib.sha256).digest()
+    return f'{cabecalho}.{payload}.{_b64(assinatura)}'
+
+
+def validar_token(auth):
+    """Retorna os claims de um 'Bearer <token>' válido ou None"""
+    if not auth or not auth.startswith('Bearer '):
+        return None
+    try:
+        cabecalho, payload, assinatura = auth[len('Bearer '):].split('.')
+    except ValueError:
+        return None
+    esperada = hmac.new(JWT_KEY, f'{cabecalho}.{payload}'.encode(), hashlib.sha256).digest()
+    if not hmac.compare_digest(_b64(esperada), assinatura):
+        return None
+    claims = json.loads(base64.urlsafe_b64decode(payload + '==='))
+    if claims.get('exp', 0) < time.time():
+        return None
+    return claims
+
+
+# ----------------------------------------------------
+# Aplicativo Flask
+# ----------------------------------------------------
+
+def create_fake_app(total_chamados=1000, total_usuarios=200, latencia_ms=0.0, jitter_ms=0.0,
+                    seed=42, indent=2):
+    """
+    Cria a API fake.
+
+    Args:
+        total_chamados (int): Quantidade de chamados gerados
+        total_usuarios (int): Quantidade de usuários gerados (mínimo 3)
+        latencia_ms (float): Atraso fixo aplicado a cada requisição
+        jitter_ms (float): Atraso adicional aleatório entre 0 e jitter_ms
+        seed (int): Semente do gerador (mesmos dados a cada execução)
+        indent (int|None): Indentação do JSON (a API real usa WriteIndented = true)
+    """
+    app = Flask('fake_azure_api')
+    app.json.ensure_ascii = False
+    dados = Dados(total_chamados, total_usuarios, seed)
+    app.extensions['fake_dados'] = dados
+
+    @app.before_request
+    def _latencia_e_autenticacao():
+        atraso = latencia_ms + (random.uniform(0, jitter_ms) if jitter_ms else 0)
+        if atraso:
+            time.sleep(atraso / 1000.0)
+        g.claims = validar_token(request.headers.get('Authorization'))
+
+    def exigir(*roles):
+        """None se autorizado; senão a resposta 401/403 do [Authorize]"""
+        if g.claims is None:
+            return Response(status=401)
+        if roles and g.claims.get('role') not in roles:
+            return Response(status=403)
+        return None
+
+    def usuario_logado():
+        return dados.usuarios.get(int(g.claims['sub']))
+
+    @app.get('/api/HealthCheck')
+    def health_check():
+        return jsonify({'status': 'API está online e funcionando!', 'timestamp': _agora_utc()})
+
+    # --- AuthController ---
+    @app.post('/api/Auth/login')
+    def login():
+        body = request.get_json(silent=True) or {}
+        email = str(body.get('email') or body.get('Email') or '').lower()
+        senha = body.get('senha') or body.get('Senha')
+        usuario = next((u for u in dados.usuarios.values() if u['email'].lower() == email), None)
+        if usuario is None or dados.senhas.get(usuario['id']) != senha:
+            return jsonify({'message': 'E-mail ou senha inválidos.'}), 401
+        return jsonify({'token': gerar_token(usuario), 'primeiroAcesso': usuario['primeiroAcesso']})
+
+    # --- ChamadosController ---
+    @app.get('/api/Chamados')
+    def listar_chamados():
+        negado = exigir()
+        if negado:
+            return negado
+        return Response(dados.lista_chamados(indent), mimetype='application/json; charset=utf-8')
+
+    @app.get('/api/Chamados/<int:chamado_id>')
+    def obter_chamado(chamado_id):
+        negado = exigir()
+        if negado:
+            return negado
+        chamado = dados.chamados.get(chamado_id)
+        if chamado is None:
+            return jsonify({'message': 'Chamado não encontrado.'}), 404
+        return jsonify(dados.chamado_completo(chamado))
+
+    @app.post('/api/Chamados')
+    def criar_chamado():
+        negado = exigir()
+        if negado:
+            return negado
+        body = request.get_json(silent=True) or {}
+        faltando = [c for c in ('Titulo', 'Descricao', 'Tipo') if not (body.get(c) or body.get(c.lower()))]
+        if faltando:
+            return jsonify({'errors': {c: [f'The {c} field is required.'] for c in faltando}}), 400
+        solicitante_id = body.get('SolicitanteId') or body.get('solicitanteId')
+        if solicitante_id not in dados.usuarios:
+            return jsonify({'message': 'O usuário solicitante não foi encontrado.'}), 400
+        with dados.lock:
+            chamado = {
+                'id': dados.proximo_chamado,
+                'titulo': body.get('Titulo') or body.get('titulo'),
+                'descricao': body.get('Descricao') or body.get('descricao'),
+                'dataAbertura': _agora_utc(),
+                'dataFechamento': None,
+                'solucao': None,
+                'solicitanteId': solicitante_id,
+                'tecnicoResponsavelId': None,
+                'prioridade': body.get('Prioridade') or body.get('prioridade') or 1,
+                'status': 1,
+                'tipo': body.get('Tipo') or body.get('tipo'),
+            }
+            dados.chamados[chamado['id']] = chamado
+            dados.proximo_chamado += 1
+            dados.alterou_chamados()
+        return jsonify(dados.chamado_completo(chamado)), 201
+
+    @app.put('/api/Chamados/<int:chamado_id>')
+    def atualizar_chamado(chamado_id):
+        negado = exigir()
+        if negado:
+            return negado
+        body = {k[0].lower() + k[1:]: v for k, v in (request.get_json(silent=True) or {}).items()}
+        with dados.lock:
+            chamado = dados.chamados.get(chamado_id)
+            if chamado is None:
+                return jsonify({'message': 'Chamado não encontrado.'}), 404
+            # Mesma ordem de regras do AtualizarChamado da API real
+            tecnico_id = body.get('tecnicoResponsavelId')
+            if tecnico_id is not None:
+                if tecnico_id not in dados.usuarios:
+                    return jsonify({'message': 'Técnico responsável não encontrado.'}), 400
+                chamado['tecnicoResponsavelId'] = tecnico_id
+                if chamado['status'] == 1:
+                    chamado['status'] = 2
+            if body.get('solucao'):
+                chamado['solucao'] = body['solucao']
+                chamado['status'] = 3
+                chamado['dataFechamento'] = _agora_utc()
+            if body.get('status') is not None:
+                chamado['status'] = int(body['status'])
+            if body.get('dataFechamento'):
+                chamado['dataFechamento'] = body['dataFechamento']
+            for campo in ('titulo', 'descricao'):
+                if body.get(campo):
+                    chamado[campo] = body[campo]
+            if body.get('prioridade') is not None:
+                chamado['prioridade'] = int(body['prioridade'])
+            dados.alterou_chamados()
+        return jsonify(dados.chamado_completo(chamado))
+
+    # --- UsuariosController ---
+    @app.post('/api/Usuarios')
+    def criar_usuario():
+        body = {k[0].lower() + k[1:]: v for k, v in (request.get_json(silent=True) or {}).items()}
+        with dados.lock:
+            if any(u['email'] == body.get('email') for u in dados.usuarios.values()):
+                return jsonify({'message': 'E-mail já cadastrado.'}), 400
+            usuario = {
+                'id': dados.proximo_usuario,
+                'nome': body.get('nome'),
+                'email': body.get('email'),
+                'senhaHash': HASH_FICTICIO,
+                'telefone': body.get('telefone'),
+                'cargo': body.get('cargo'),
+                'permissao': int(body.get('permissao') or 1),
+                'primeiroAcesso': True,
+            }
+            dados.usuarios[usuario['id']] = usuario
+            dados.senhas[usuario['id']] = body.get('senha')
+            dados.proximo_usuario += 1
+        return jsonify(_sem_hash(usuario)), 201
+
+    @app.put('/api/Usuarios/alterar-senha')
+    def alterar_senha():
+        negado = exigir()
+        if negado:
+            return negado
+        body = {k[0].lower() + k[1:]: v for k, v in (request.get_json(silent=True) or {}).items()}
+        usuario = usuario_logado()
+        if usuario is None:
+            return Response(status=404)
+        if dados.senhas.get(usuario['id']) != body.get('senhaAtual'):
+            return jsonify({'message': 'A senha atual está incorreta.'}), 400
+        dados.senhas[usuario['id']] = body.get('novaSenha')
+        usuario['primeiroAcesso'] = False
+        return jsonify({'message': 'Senha alterada com sucesso!'})
+
+    @app.route('/api/Usuarios/meu-perfil', methods=['GET', 'PUT'])
+    def meu_perfil():
+        negado = exigir()
+        if negado:
+            return negado
+        usuario = usuario_logado()
+        if usuario is None:
+            return Response(status=404)
+        if request.method == 'GET':
+            return jsonify(_sem_hash(usuario))
+        body = {k[0].lower() + k[1:]: v for k, v in (request.get_json(silent=True) or {}).items()}
+        for campo in ('nome', 'email', 'telefone'):
+            if body.get(campo) is not None:
+                usuario[campo] = body[campo]
+        if body.get('cargo') is not None and usuario['permissao'] == 3:
+            usuario['cargo'] = body['cargo']
+        dados.alterou_chamados()
+        return jsonify({'message': 'Perfil atualizado.'})
+
+    @app.get('/api/Usuarios')
+    def listar_usuarios():
+        negado = exigir('Administrador', 'SuporteTecnico')
+        if negado:
+            return negado
+        return jsonify([_sem_hash(u) for u in dados.usuarios.values()])
+
+    @app.get('/api/Usuarios/<int:usuario_id>')
+    def obter_usuario(usuario_id):
+        negado = exigir('Administrador', 'SuporteTecnico')
+        if negado:
+            return negado
+        usuario = dados.usuarios.get(usuario_id)
+        if usuario is None:
+            return Response(status=404)
+        return jsonify(_sem_hash(usuario))
+
+    @app.put('/api/Usuarios/<int:usuario_id>')
+    def atualizar_usuario(usuario_id):
+        negado = exigir('Administrador')
+        if negado:
+            return negado
+        body = {k[0].lower() + k[1:]: v for k, v in (request.get_json(silent=True) or {}).items()}
+        usuario = dados.usuarios.get(usuario_id)
+        if usuario is None:
+            return jsonify({'message': 'Usuário não encontrado.'}), 404
+        for campo in ('nome', 'email', 'telefone', 'cargo', 'permissao'):
+            if body.get(campo) is not None:
+                usuario[campo] = body[campo]
+        senha_alterada = False
+        if body.get('novaSenha'):
+            if len(body['novaSenha']) < 6:
+                return jsonify({'message': 'A senha deve ter pelo menos 6 caracteres.'}), 400
+            dados.senhas[usuario_id] = body['novaSenha']
+            usuario['primeiroAcesso'] = True
+            senha_alterada = True
+        dados.alterou_chamados()
+        return jsonify({
+            'message': 'Usuário atualizado com sucesso.',
+            'usuario': _sem_hash(usuario),
+            'senhaAlterada': senha_alterada,
+            'primeiroAcesso': usuario['primeiroAcesso'],
+        })
+
+    @app.delete('/api/Usuarios/<int:usuario_id>')
+    def excluir_usuario(usuario_id):
+        negado = exigir('Administrador')
+        if negado:
+            return negado
+        if usuario_id == int(g.claims['sub']):
+            return jsonify({'message': 'Não pode excluir a si mesmo.'}), 400
+        if dados.usuarios.pop(usuario_id, None) is None:
+            return Response(status=404)
+        dados.alterou_chamados()
+        return Response(status=204)
+
+    return app
+
+
+def _argumentos():
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description='API fake do Azure para testes de carga')
+    parser.add_argument('--host', default=env('FAKE_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(env('FAKE_PORT', 5099)))
+    parser.add_argument('--chamados', type=int, default=int(env('FAKE_CHAMADOS', 1000)))
+    parser.add_argument('--usuarios', type=int, default=int(env('FAKE_USUARIOS', 200)))
+    parser.add_argument('--latencia-ms', type=float, default=float(env('FAKE_LATENCIA_MS', 0)))
+    parser.add_argument('--jitter-ms', type=float, default=float(env('FAKE_JITTER_MS', 0)))
+    parser.add_argument('--seed', type=int, default=int(env('FAKE_SEED', 42)))
+    parser.add_argument('--compacto', action='store_true', help='JSON sem indentação')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = _argumentos()
+    fake = create_fake_app(args.chamados, args.usuarios, args.latencia_ms, args.jitter_ms,
+                           args.seed, None if args.compacto else 2)
+    print(f"[INFO] API fake com {args.chamados} chamados e {max(args.usuarios, 3)} usuários "
+          f"em http://{args.host}:{args.port} (latência {args.latencia_ms}ms + até {args.jitter_ms}ms)")
+    print(f"[INFO] Use: API_URL_BASE=http://{args.host}:{args.port} python app.py")
+    fake.run(host=args.host, port=args.port, threaded=True)
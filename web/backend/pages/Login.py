@@ -1,12 +1,42 @@
+import logging
+
 from flask import request, jsonify, current_app
 import requests
 
+from services.api_client import get_client, build_headers
+from services.user_profiles import get_profile, remember, token_claims, permissao_from_role
+from services.dto import LOGIN_RESPOSTA, USUARIO_RESUMO
+
 # Importação será feita dinamicamente
 app = None 
 # Não usamos o bcrypt aqui, pois enviamos a senha para a API do Azure validar.
 
-# ENDPOINT BASE da sua API externa (Azure)
-API_URL_BASE = 'https://api-suporte-grupoads-e4hmccf7gaczdbht.brazilsouth-01.azurewebsites.net'
+logger = logging.getLogger(__name__)
+
+
+def _buscar_perfil(client, token_value):
+    """
+    Busca o perfil do usuário recém-autenticado e guarda no cache de perfis.
+
+    Usa /api/Usuarios/meu-perfil com o token novo, que funciona para qualquer
+    permissão (GET /api/Usuarios/{id} exige Administrador ou SuporteTecnico).
+    Retorna None se não for possível obter o perfil.
+    """
+    try:
+        headers = build_headers(forward_auth=False)
+        headers['Authorization'] = f"Bearer {token_value}"
+        usuario_resp = client.get('/api/Usuarios/meu-perfil', headers=headers)
+        if usuario_resp.status_code != 200:
+            logger.warning("Erro ao buscar usuário pós-login: %s", usuario_resp.status_code)
+            return None
+
+        # Normaliza campos (pode vir com maiúscula ou minúscula)
+        perfil = USUARIO_RESUMO.normalizar(usuario_resp.json())
+        remember(perfil)
+        return perfil
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.warning("Falha ao enriquecer dados do usuário pós-login: %s", e)
+        return None
 
 # Rota para o Login. O front-end envia email e senha para este endpoint.
 def login_user():
@@ -27,102 +57,50 @@ def login_user():
     }
 
     try:
+        client = get_client()
+
         # CORREÇÃO: Endpoint correto da API C# é /api/Auth/login
-        url_autenticacao = f"{API_URL_BASE}/api/Auth/login" 
-        
-        # CORREÇÃO: Adicionar headers corretos
-        headers = {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
+        headers = build_headers(json_body=True, forward_auth=False)
         
-        response = requests.post(url_autenticacao, json=dados_para_api, headers=headers)
+        response = client.post('/api/Auth/login', json=dados_para_api, headers=headers)
         
-        # DEBUG: Log da resposta para facilitar debug
-        print(f"Status Code: {response.status_code}")
-        print(f"Response Headers: {response.headers}")
-        print(f"Response Content: {response.text}")
+        logger.debug("Resposta da API de autenticação: Status %s", response.status_code)
 
         # ----------------------------------------------------
         # 1. Login BEM-SUCEDIDO (Geralmente retorna 200)
         # ----------------------------------------------------
         if response.status_code == 200:
             # A API do Azure deve retornar o Token de Autenticação (JWT)
-            token_payload = response.json() or {}
             # Normaliza a chave do token para minúsculo para o front-end
-            token_value = token_payload.get('token') or token_payload.get('Token')
+            token_value = LOGIN_RESPOSTA.normalizar(response.json())['token']
 
-            user_info = None
-            try:
-                # Decodifica o payload do JWT sem validação (apenas para obter o ID)
-                # O formato é header.payload.signature (base64url)
-                import base64, json
-                parts = (token_value or '').split('.')
-                if len(parts) >= 2:
-                    padded = parts[1] + '==='  # padding para base64url
-                    decoded = base64.urlsafe_b64decode(padded)
-                    payload_obj = json.loads(decoded.decode('utf-8'))
-                    user_id = payload_obj.get('sub')
-                    user_role = payload_obj.get('role')
-
-                    if user_id:
-                        # Busca dados do usuário para obter nome e permissão
-                        usuario_resp = requests.get(f"{API_URL_BASE}/api/Usuarios/{user_id}")
-                        print(f"[Login] Resposta da API de usuário: Status {usuario_resp.status_code}")
-                        
-                        if usuario_resp.status_code == 200:
-                            usuario_json = usuario_resp.json() or {}
-                            print(f"[Login] Dados recebidos da API C#: {usuario_json}")
-                            
-                            # Normaliza campos (pode vir com maiúscula ou minúscula)
-                            nome_api = usuario_json.get('nome') or usuario_json.get('Nome') or ''
-                            email_api = usuario_json.get('email') or usuario_json.get('Email') or email
-                            cargo_api = usuario_json.get('cargo') or usuario_json.get('Cargo') or ''
-                            telefone_api = usuario_json.get('telefone') or usuario_json.get('Telefone') or ''
-                            
-                            print(f"[Login] Nome extraído: '{nome_api}'")
-                            print(f"[Login] Email extraído: '{email_api}'")
-                            print(f"[Login] Cargo extraído: '{cargo_api}'")
-                            
-                            user_info = {
-                                'id': usuario_json.get('id') or usuario_json.get('Id') or user_id,
-                                'nome': nome_api,
-                                'email': email_api,
-                                'cargo': cargo_api,
-                                'telefone': telefone_api,
-                                'permissao': usuario_json.get('permissao') if usuario_json.get('permissao') is not None else (usuario_json.get('Permissao') if usuario_json.get('Permissao') is not None else user_role)
-                            }
-                            print(f"[Login] user_info final: {user_info}")
-                        else:
-                            print(f"[Login] Erro ao buscar usuário: {usuario_resp.status_code}")
-                            # Fallback: retorna apenas dados do token
-                            user_info = {
-                                'id': user_id,
-                                'nome': '',
-                                'email': email,
-                                'cargo': '',
-                                'telefone': '',
-                                'permissao': user_role if user_role else 1  # Default para colaborador se não houver role
-                            }
-            except Exception as e:
-                print(f"Falha ao enriquecer dados do usuário pós-login: {e}")
-                # Garantir que sempre há um user_info válido
-                if not user_info:
-                    user_info = {
-                        'id': None,
-                        'nome': '',
-                        'email': email,
-                        'permissao': 1  # Default para colaborador
-                    }
-
-            # Garantir que user_info não seja None antes de retornar
-            if not user_info:
-                user_info = {
-                    'id': None,
-                    'nome': '',
-                    'email': email,
-                    'permissao': 1
-                }
+            # Decodifica o payload do JWT sem validação (apenas para obter o ID)
+            claims = token_claims(token_value)
+            user_id = claims.get('sub')
+            user_role = claims.get('role')
+
+            # Dados mínimos vindos do próprio token (usados se o perfil não puder ser obtido)
+            user_info = {
+                'id': int(user_id) if user_id and str(user_id).isdigit() else user_id,
+                'nome': '',
+                'email': claims.get('email') or email,
+                'cargo': '',
+                'telefone': '',
+                'permissao': permissao_from_role(user_role)  # Default para colaborador se não houver role
+            }
+
+            if user_id:
+                # Perfil já conhecido (listagem, consulta ou login anterior): sem segunda chamada à API
+                perfil = get_profile(user_id)
+                if perfil:
+                    user_info.update(perfil)
+                elif current_app.config.get('LOGIN_PROFILE_MODE') == 'lazy':
+                    # O front-end busca /api/Usuarios/meu-perfil depois do login
+                    user_info['perfilPendente'] = True
+                else:
+                    perfil = _buscar_perfil(client, token_value)
+                    if perfil:
+                        user_info.update(perfil)
 
             # Monta resposta unificada
             return jsonify({
@@ -149,5 +127,5 @@ def login_user():
 
     except requests.exceptions.RequestException as e:
         # Erro de rede ou servidor indisponível
-        print(f"Erro ao conectar à API do Azure: {e}")
+        logger.error("Erro ao conectar à API do Azure: %s", e)
         return jsonify({"message": "Serviço indisponível. Verifique a conexão com a API externa."}), 503
@@ -1,8 +1,11 @@
+import logging
+
 from flask import request, jsonify
 import requests
 
-# ENDPOINT BASE da sua API externa (Azure)
-API_URL_BASE = 'https://api-suporte-grupoads-e4hmccf7gaczdbht.brazilsouth-01.azurewebsites.net'
+from services.api_client import get_client, build_headers
+
+logger = logging.getLogger(__name__)
 
 def alterar_senha():
     # Tratamento de requisições OPTIONS para CORS
@@ -32,25 +35,11 @@ def alterar_senha():
             }
             
             # Endpoint de alteração de senha na API do Azure
-            url = f"{API_URL_BASE}/api/Usuarios/alterar-senha"
-            
-            headers = {
-                'Content-Type': 'application/json',
-                'Accept': 'application/json'
-            }
-            
-            auth = request.headers.get('Authorization')
-            if auth:
-                headers['Authorization'] = auth
-            
-            print(f'[PUT /api/Usuarios/alterar-senha] Enviando para API Azure: {url}')
-            print(f'[PUT /api/Usuarios/alterar-senha] Headers: {headers}')
-            print(f'[PUT /api/Usuarios/alterar-senha] Payload (senha ocultada): {{"SenhaAtual": "***", "NovaSenha": "***"}}')
+            headers = build_headers(json_body=True)
             
-            response = requests.put(url, json=dados_para_api, headers=headers)
+            response = get_client().put('/api/Usuarios/alterar-senha', json=dados_para_api, headers=headers)
             
-            print(f'[PUT /api/Usuarios/alterar-senha] Resposta da API Azure: {response.status_code}')
-            print(f'[PUT /api/Usuarios/alterar-senha] Resposta (text): {response.text[:200]}')
+            logger.debug('[PUT /api/Usuarios/alterar-senha] Resposta da API Azure: %s', response.status_code)
             
             # Resposta bem-sucedida
             if response.status_code in [200, 204]:
@@ -83,9 +72,9 @@ def alterar_senha():
                 return jsonify({"message": erro_message}), response.status_code
         
         except requests.exceptions.RequestException as e:
-            print(f"Erro ao conectar à API do Azure: {e}")
+            logger.error("Erro ao conectar à API do Azure: %s", e)
             return jsonify({"message": "Erro de conexão com o serviço de dados."}), 503
         except Exception as e:
-            print(f"Erro inesperado: {e}")
+            logger.exception("Erro inesperado: %s", e)
             return jsonify({"message": "Erro interno do servidor."}), 500
 
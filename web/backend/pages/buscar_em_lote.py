@@ -0,0 +1,87 @@
+import logging
+
+from flask import request, jsonify, current_app
+
+from services.api_client import caller_scope
+from services.cache import get_cache
+from services.dto import USUARIO_RESUMO
+from services.lote import ler_ids, buscar_lote
+from services.user_profiles import remember_many
+
+logger = logging.getLogger(__name__)
+
+
+def _ler_ids():
+    """
+    IDs do corpo da requisição.
+
+    Returns:
+        tuple: (ids, None) ou (None, resposta_flask) em caso de erro
+    """
+    if not request.headers.get('Authorization'):
+        return None, (jsonify({'message': 'Token de autenticação não fornecido.'}), 401)
+    try:
+        ids = ler_ids(request.get_json(silent=True), current_app.config.get('BATCH_MAX_IDS', 200))
+    except ValueError as e:
+        return None, (jsonify({'message': str(e)}), 400)
+    return ids, None
+
+
+def _responder(chave, ids, resultado, converter=None):
+    """Itens na ordem dos IDs pedidos, mais os IDs não encontrados e os que falharam"""
+    if resultado.negado is not None:
+        msg = resultado.negado.message(f'Erro HTTP {resultado.negado.status_code} ao buscar {chave}.')
+        return jsonify({'message': msg}), resultado.negado.status_code
+    if resultado.falhas and not resultado.encontrados and not resultado.nao_encontrados:
+        return jsonify({'message': f'Serviço de {chave} indisponível.'}), 503
+
+    itens = [resultado.encontrados[i] for i in ids if i in resultado.encontrados]
+    if converter is not None:
+        itens = converter(itens)
+    logger.debug('[batch %s] %d pedidos, %d do cache local, %d falhas',
+                 chave, len(ids), resultado.locais, len(resultado.falhas))
+
+    response = jsonify({
+        chave: itens,
+        'naoEncontrados': resultado.nao_encontrados,
+        'falhas': resultado.falhas,
+    })
+    if resultado.stale:
+        response.headers['Warning'] = '110 - "Response is Stale"'
+    return response
+
+
+def buscar_chamados_em_lote():
+    """
+    POST /chamados/batch com {'ids': [...]}: vários chamados em uma resposta.
+
+    Os chamados vêm do cache (GET individual ou a lista de GET /chamados já
+    em cache) e os que faltam são buscados na API em paralelo.
+    """
+    ids, erro = _ler_ids()
+    if erro:
+        return erro
+
+    # Lista completa já indexada em cache (mesmo formato do GET individual)
+    lista = get_cache().get(('chamados', '/api/Chamados', caller_scope()))
+    buscar_local = lista.data.buscar if lista is not None else None
+
+    resultado = buscar_lote('chamados', '/api/Chamados/{id}', ids, buscar_local)
+    return _responder('chamados', ids, resultado)
+
+
+def buscar_usuarios_em_lote():
+    """
+    POST /api/Usuarios/batch com {'ids': [...]}: vários usuários em uma resposta.
+
+    Mesmas permissões de GET /api/Usuarios/{id} na API do Azure; os usuários
+    vêm normalizados como na rota individual.
+    """
+    ids, erro = _ler_ids()
+    if erro:
+        return erro
+
+    resultado = buscar_lote('usuarios', '/api/Usuarios/{id}', ids)
+    # Só os usuários que vieram da API agora alimentam o cache de perfis (os do cache já passaram por ele)
+    remember_many(USUARIO_RESUMO.normalizar_lista([resultado.encontrados[i] for i in resultado.buscados]))
+    return _responder('usuarios', ids, resultado, USUARIO_RESUMO.normalizar_lista)
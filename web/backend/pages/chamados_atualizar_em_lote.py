@@ -0,0 +1,145 @@
+import logging
+
+from flask import request, jsonify, current_app
+import requests
+
+from services.api_client import get_client, build_headers, STATUS_RESPOSTA_INVALIDA
+from services.cache import get_cache
+from services.dto import CHAMADO_ATUALIZACAO
+from services.lote import executar_em_paralelo
+from services.stats import get_painel, STATUS, PRIORIDADES
+from services.chamados_store import get_store
+
+logger = logging.getLogger(__name__)
+
+
+def _inteiro(valor):
+    """int para IDs e enums (rejeita bool e texto não numérico), ou None"""
+    if isinstance(valor, bool):
+        return None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _validar_item(item):
+    """
+    Valida um item {id, fields} e monta o corpo do PUT (AtualizarChamadoDto).
+
+    Returns:
+        tuple: (id, payload_api, None) ou (id, None, mensagem de erro)
+    """
+    if not isinstance(item, dict):
+        return None, None, 'Cada item deve ser um objeto {id, fields}.'
+    chamado_id = _inteiro(item.get('id', item.get('Id')))
+    if chamado_id is None or chamado_id <= 0:
+        return None, None, 'ID do chamado ausente ou inválido.'
+
+    campos = item.get('fields', item.get('campos'))
+    if campos is None:
+        # Também aceita os campos direto no item: {id, status, ...}
+        campos = {k: v for k, v in item.items() if k not in ('id', 'Id')}
+    if not isinstance(campos, dict):
+        return chamado_id, None, "'fields' deve ser um objeto."
+
+    payload_api = CHAMADO_ATUALIZACAO.para_api(campos)
+    if not payload_api:
+        return chamado_id, None, 'Nenhum campo para atualizar.'
+    for campo, valores in (('Status', STATUS), ('Prioridade', PRIORIDADES)):
+        if campo in payload_api and _inteiro(payload_api[campo]) not in valores:
+            return chamado_id, None, f'{campo} inválido: {payload_api[campo]!r}.'
+    if 'TecnicoResponsavelId' in payload_api and _inteiro(payload_api['TecnicoResponsavelId']) is None:
+        return chamado_id, None, 'TecnicoResponsavelId deve ser um número inteiro.'
+    return chamado_id, payload_api, None
+
+
+def _validar(dados, maximo):
+    """
+    Valida todos os itens antes de enviar qualquer atualização.
+
+    Returns:
+        tuple: (lista de (id, payload_api), None) ou (None, lista de erros)
+    """
+    itens = dados.get('chamados', dados.get('items')) if isinstance(dados, dict) else dados
+    if not isinstance(itens, list) or not itens:
+        return None, [{'message': "Envie uma lista de itens: {'chamados': [{'id': 1, 'fields': {...}}]}."}]
+    if len(itens) > maximo:
+        return None, [{'message': f'Máximo de {maximo} chamados por requisição.'}]
+
+    validos, erros, vistos = [], [], set()
+    for posicao, item in enumerate(itens):
+        chamado_id, payload_api, erro = _validar_item(item)
+        if erro is None and chamado_id in vistos:
+            erro = 'Chamado repetido na requisição.'
+        if erro is not None:
+            erros.append({'indice': posicao, 'id': chamado_id, 'message': erro})
+            continue
+        vistos.add(chamado_id)
+        validos.append((chamado_id, payload_api))
+    return (None, erros) if erros else (validos, None)
+
+
+def atualizar_chamados_em_lote():
+    """
+    PUT /chamados/bulk: atualiza vários chamados (ex: fechar ou atribuir em massa).
+
+    Corpo: {'chamados': [{'id': 1, 'fields': {'status': 3, 'solucao': '...'}}, ...]}
+
+    Todos os itens são validados antes; se algum for inválido, nada é enviado
+    (400 com os erros por item). Os PUTs individuais vão à API do Azure em
+    paralelo (limitados por BATCH_MAX_WORKERS) e a resposta traz o resultado
+    de cada item. O cache de chamados é invalidado uma vez, no final.
+    """
+    if not request.headers.get('Authorization'):
+        return jsonify({'message': 'Token de autenticação não fornecido.'}), 401
+
+    itens, erros = _validar(request.get_json(silent=True), current_app.config.get('BULK_MAX_ITEMS', 100))
+    if erros:
+        return jsonify({'message': 'Nenhum chamado foi atualizado: corrija os itens inválidos.', 'erros': erros}), 400
+
+    headers = build_headers(json_body=True)
+    # Chamados que a API aceitou (2xx) mas devolveu com um corpo ilegível
+    invalidos = []
+
+    def enviar(item):
+        chamado_id, payload_api = item
+        try:
+            resp = get_client().put(f"/api/Chamados/{chamado_id}", json=payload_api, headers=headers)
+        except requests.exceptions.RequestException as e:
+            logger.error('Erro ao conectar à API externa (chamado %s): %s', chamado_id, e)
+            return {'id': chamado_id, 'status': 503, 'message': 'Serviço de chamados indisponível.'}
+
+        if resp.status_code in [200, 204]:
+            try:
+                chamado = resp.json() if resp.content else None
+            except ValueError as e:
+                logger.warning('Resposta inválida da API ao atualizar o chamado %s: %s', chamado_id, e)
+                invalidos.append(chamado_id)
+                return {'id': chamado_id, 'status': STATUS_RESPOSTA_INVALIDA,
+                        'message': f'Resposta inválida do serviço externo ao atualizar chamado {chamado_id}.'}
+            return {'id': chamado_id, 'status': 200, 'chamado': chamado}
+        try:
+            msg = resp.json().get('message', f'Erro HTTP {resp.status_code} ao atualizar chamado {chamado_id}.')
+        except Exception:
+            msg = f'Erro HTTP {resp.status_code} ao atualizar chamado {chamado_id}.'
+        return {'id': chamado_id, 'status': resp.status_code, 'message': msg}
+
+    resultados = executar_em_paralelo(enviar, itens)
+    sucessos = [r for r in resultados if r['status'] == 200]
+
+    alterados = [r['id'] for r in sucessos] + invalidos
+    if alterados:
+        # Uma invalidação para a lista e todos os chamados alterados (com resposta inválida a escrita pode ter ocorrido)
+        get_cache().invalidate_paths(
+            'chamados', ['/api/Chamados'] + [f"/api/Chamados/{chamado_id}" for chamado_id in alterados])
+    if sucessos:
+        painel, store = get_painel(), get_store()
+        for r in sucessos:
+            painel.registrar_chamado(r['chamado'])
+            store.registrar(r['chamado'])
+
+    logger.info('[PUT /chamados/bulk] %d de %d chamados atualizados', len(sucessos), len(resultados))
+    corpo = {'atualizados': len(sucessos), 'falhas': len(resultados) - len(sucessos), 'resultados': resultados}
+    # Sem nenhum sucesso, o status HTTP é o da primeira falha (ex: 401/403 para todos)
+    return jsonify(corpo), 200 if sucessos else resultados[0]['status']
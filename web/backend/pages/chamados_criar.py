@@ -1,17 +1,26 @@
+import logging
+
 from flask import request, jsonify
 import requests
 
-API_URL_BASE = 'https://api-suporte-grupoads-e4hmccf7gaczdbht.brazilsouth-01.azurewebsites.net'
+from services.api_client import get_client, build_headers
+from services.cache import get_cache
+from services.dto import CHAMADO_CRIACAO
+from services.stats import get_painel
+from services.chamados_store import get_store
+
+logger = logging.getLogger(__name__)
 
 
 def criar_chamado():
-    dados = request.json or {}
+    # Aceita tipoChamado/tipo e solicitanteId/solicitante_id
+    campos = CHAMADO_CRIACAO.normalizar(request.json or {})
 
-    tipoChamado = dados.get('tipoChamado') or dados.get('tipo')
-    titulo = dados.get('titulo')
-    descricao = dados.get('descricao')
-    prioridade = dados.get('prioridade', 2)  # padrão: Média
-    solicitante_id = dados.get('solicitanteId') or dados.get('solicitante_id')
+    tipoChamado = campos['tipo']
+    titulo = campos['titulo']
+    descricao = campos['descricao']
+    prioridade = campos['prioridade'] or 2  # padrão: Média
+    solicitante_id = campos['solicitanteId']
 
     if not tipoChamado or not titulo or not descricao or not solicitante_id:
         return jsonify({'message': 'Campos obrigatórios: tipoChamado, titulo, descricao e solicitanteId.'}), 400
@@ -26,24 +35,25 @@ def criar_chamado():
         else:
             prioridade = 2
 
-    payload_api = {
+    # CriarChamadoDto
+    payload_api = CHAMADO_CRIACAO.para_api({
         'tipo': tipoChamado,
         'titulo': titulo,
         'descricao': descricao,
         'solicitanteId': int(solicitante_id),
         'prioridade': int(prioridade),
-    }
-    payload_api = {k: v for k, v in payload_api.items() if v is not None}
+    })
 
     try:
-        url = f"{API_URL_BASE}/api/Chamados"
-        headers = { 'Content-Type': 'application/json', 'Accept': 'application/json' }
-        auth = request.headers.get('Authorization')
-        if auth:
-            headers['Authorization'] = auth
-        resp = requests.post(url, json=payload_api, headers=headers)
+        headers = build_headers(json_body=True)
+        resp = get_client().post('/api/Chamados', json=payload_api, headers=headers)
         if resp.status_code in [200, 201]:
-            return jsonify(resp.json() if resp.content else {'message': 'Chamado criado com sucesso.'}), 201
+            # Novo chamado: listas em cache ficam desatualizadas
+            get_cache().invalidate('chamados', '/api/Chamados')
+            chamado = resp.json() if resp.content else None
+            get_painel().registrar_chamado(chamado)
+            get_store().registrar(chamado)
+            return jsonify(chamado or {'message': 'Chamado criado com sucesso.'}), 201
 
         try:
             msg = resp.json().get('message', f'Erro HTTP {resp.status_code} ao criar chamado.')
@@ -52,7 +62,7 @@ def criar_chamado():
         return jsonify({'message': msg}), resp.status_code
 
     except requests.exceptions.RequestException as e:
-        print(f'Erro ao conectar à API externa: {e}')
+        logger.error('Erro ao conectar à API externa: %s', e)
         return jsonify({'message': 'Serviço de chamados indisponível.'}), 503
 
 
@@ -1,7 +1,15 @@
+import logging
+
 from flask import request, jsonify
 import requests
 
-API_URL_BASE = 'https://api-suporte-grupoads-e4hmccf7gaczdbht.brazilsouth-01.azurewebsites.net'
+from services.api_client import get_client, build_headers
+from services.cache import cached_get, get_cache
+from services.dto import CHAMADO_ATUALIZACAO
+from services.stats import get_painel
+from services.chamados_store import get_store
+
+logger = logging.getLogger(__name__)
 
 
 def detalhar_chamado(chamado_id: int):
@@ -16,53 +24,38 @@ def detalhar_chamado(chamado_id: int):
     # Rota GET - Buscar chamado por ID
     if request.method == 'GET':
         try:
-            url = f"{API_URL_BASE}/api/Chamados/{chamado_id}"
-            headers = { 'Accept': 'application/json' }
-            auth = request.headers.get('Authorization')
-            if auth:
-                headers['Authorization'] = auth
-            resp = requests.get(url, headers=headers)
-            if resp.status_code == 200:
-                return jsonify(resp.json())
+            result = cached_get('chamados', f"/api/Chamados/{chamado_id}")
+            if result.status_code == 200:
+                return jsonify(result.data)
 
-            try:
-                msg = resp.json().get('message', f'Erro HTTP {resp.status_code} ao buscar chamado {chamado_id}.')
-            except Exception:
-                msg = f'Erro HTTP {resp.status_code} ao buscar chamado {chamado_id}.'
-            return jsonify({'message': msg}), resp.status_code
+            msg = result.message(f'Erro HTTP {result.status_code} ao buscar chamado {chamado_id}.')
+            return jsonify({'message': msg}), result.status_code
 
         except requests.exceptions.RequestException as e:
-            print(f'Erro ao conectar à API externa: {e}')
+            logger.error('Erro ao conectar à API externa: %s', e)
             return jsonify({'message': 'Serviço de chamados indisponível.'}), 503
     
     # Rota PUT - Atualizar chamado
     if request.method == 'PUT':
         dados = request.json or {}
 
-        # Aceita tanto minúsculo quanto maiúsculo dos campos
-        payload_api = {
-            'Status': dados.get('status') or dados.get('Status'),
-            'TecnicoResponsavelId': dados.get('tecnicoResponsavelId') or dados.get('TecnicoResponsavelId'),
-            'DataFechamento': dados.get('dataFechamento') or dados.get('DataFechamento'),
-            'Titulo': dados.get('titulo') or dados.get('Titulo'),
-            'Descricao': dados.get('descricao') or dados.get('Descricao'),
-            'Solucao': dados.get('solucao') or dados.get('Solucao'),
-            'Prioridade': dados.get('prioridade') or dados.get('Prioridade')
-        }
-        payload_api = {k: v for k, v in payload_api.items() if v is not None}
+        # Aceita tanto minúsculo quanto maiúsculo dos campos (AtualizarChamadoDto)
+        payload_api = CHAMADO_ATUALIZACAO.para_api(dados)
 
         if not payload_api:
             return jsonify({'message': 'Nenhum campo para atualizar.'}), 400
 
         try:
-            url = f"{API_URL_BASE}/api/Chamados/{chamado_id}"
-            headers = { 'Content-Type': 'application/json', 'Accept': 'application/json' }
-            auth = request.headers.get('Authorization')
-            if auth:
-                headers['Authorization'] = auth
-            resp = requests.put(url, json=payload_api, headers=headers)
+            headers = build_headers(json_body=True)
+            resp = get_client().put(f"/api/Chamados/{chamado_id}", json=payload_api, headers=headers)
             if resp.status_code in [200, 204]:
-                return jsonify(resp.json() if resp.content else {'message': 'Chamado atualizado com sucesso.'})
+                cache = get_cache()
+                cache.invalidate('chamados', '/api/Chamados')
+                cache.invalidate('chamados', f"/api/Chamados/{chamado_id}")
+                chamado = resp.json() if resp.content else None
+                get_painel().registrar_chamado(chamado)
+                get_store().registrar(chamado)
+                return jsonify(chamado or {'message': 'Chamado atualizado com sucesso.'})
 
             try:
                 msg = resp.json().get('message', f'Erro HTTP {resp.status_code} ao atualizar chamado {chamado_id}.')
@@ -71,7 +64,7 @@ def detalhar_chamado(chamado_id: int):
             return jsonify({'message': msg}), resp.status_code
 
         except requests.exceptions.RequestException as e:
-            print(f'Erro ao conectar à API externa: {e}')
+            logger.error('Erro ao conectar à API externa: %s', e)
             return jsonify({'message': 'Serviço de chamados indisponível.'}), 503
 
 
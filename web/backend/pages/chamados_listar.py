@@ -1,92 +1,181 @@
-from flask import request, jsonify
+import logging
+
+from flask import request, jsonify, current_app
 import requests
 
-API_URL_BASE = 'https://api-suporte-grupoads-e4hmccf7gaczdbht.brazilsouth-01.azurewebsites.net'
+from services.chamados_index import paginar, parse_data
+from services.response_encoding import resposta_json_streaming
+from services.chamados_store import get_store, buscar_chamados
+
+logger = logging.getLogger(__name__)
+
+# Mapear status textual para numérico se necessário
+STATUS_MAP = {
+    'andamento': 2,
+    'em_andamento': 2,
+    'resolvido': 4,
+    'fechado': 5,
+    'aberto': 1
+}
+# StatusChamado da API (Aberto, EmAtendimento, Fechado)
+STATUS_VALIDOS = (1, 2, 3)
+
+
+def _int_ou_none(valor):
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        return None
+
+
+def _buscar_index():
+    """
+    Busca os chamados na API do Azure e monta a visão indexada.
+
+    O array da API é lido incrementalmente, chamado por chamado, direto para
+    o índice. A visão fica no cache (por chamador) até expirar ou até uma
+    rota de escrita invalidar a coleção 'chamados'.
+
+    Returns:
+        tuple: (UpstreamResult com o ChamadosIndex em .data, None) em caso de sucesso
+            ou (None, resposta_flask) em caso de erro
+    """
+    # A API C# não suporta filtros por query parameters, então buscamos todos e filtramos aqui
+    result = buscar_chamados()
+    if result.status_code == 200:
+        return result, None
+
+    msg = result.message(f'Erro HTTP {result.status_code} ao listar chamados.')
+    return None, (jsonify({'message': msg}), result.status_code)
+
+
+def _responder_lista(chamados, result):
+    """
+    Lista completa (sem paginação), com o total em X-Total-Count.
+
+    Listas grandes são serializadas em blocos (streaming): a requisição só
+    guarda referências aos chamados do índice em cache, nunca o JSON inteiro.
+    O ETag vem da versão dos dados da API e dos filtros, então um 304 não
+    serializa nada.
+    """
+    total = str(len(chamados))
+    if len(chamados) >= current_app.config.get('CHAMADOS_STREAM_MIN_ITEMS', 1000):
+        versao = f"{result.digest}:{request.path}?{request.query_string.decode('latin-1')}"
+        return resposta_json_streaming(chamados, versao=versao, headers={'X-Total-Count': total})
+
+    response = jsonify(chamados)
+    response.headers['X-Total-Count'] = total
+    return response
 
 
 def listar_chamados():
-    status_param = request.args.get('status')
-    solicitante_id = request.args.get('solicitanteId')
+    """
+    Lista chamados com filtros, ordenação e paginação feitos no proxy.
+
+    Query params:
+        status: numérico ou textual (aberto, andamento, ...)
+        solicitanteId, tecnicoId: IDs numéricos
+        dataInicio, dataFim: intervalo de abertura (ISO 8601)
+        sort: campo de ordenação, '-' para decrescente (ex: -dataAbertura)
+        page, pageSize: quando informados, a resposta é paginada
+
+    Sem page/pageSize a resposta continua sendo a lista de chamados,
+    com o total no header X-Total-Count.
+    """
+    args = request.args
+
+    # Filtrar por solicitanteId se fornecido (para colaboradores verem apenas seus chamados)
+    solicitante_id = _int_ou_none(args.get('solicitanteId'))
+    tecnico_id = _int_ou_none(args.get('tecnicoId'))
+    # Filtro inválido responde 400: ignorá-lo devolveria a lista inteira, sem filtro
+    for nome, valor in (('solicitanteId', solicitante_id), ('tecnicoId', tecnico_id)):
+        if args.get(nome) and valor is None:
+            return jsonify({'message': f'Parâmetro {nome} deve ser um número inteiro.'}), 400
+
+    status = None
+    status_param = args.get('status')
+    if status_param:
+        status = STATUS_MAP.get(status_param.lower())
+        if status is None:
+            status = _int_ou_none(status_param)
+            if status not in STATUS_VALIDOS:
+                return jsonify({'message': f"Parâmetro status inválido: use 1 a 3 ou {', '.join(STATUS_MAP)}."}), 400
+
+    data_inicio = parse_data(args.get('dataInicio'))
+    data_fim = parse_data(args.get('dataFim'))
+    # Datas sem horário incluem o dia inteiro
+    if data_fim is not None and len(args.get('dataFim', '')) == 10:
+        data_fim = data_fim.replace(hour=23, minute=59, second=59, microsecond=999999)
+
+    paginado = 'page' in args or 'pageSize' in args
+    page = _int_ou_none(args.get('page', 1))
+    page_size = _int_ou_none(args.get('pageSize', current_app.config['CHAMADOS_PAGE_SIZE']))
+    if paginado and (not page or page < 1 or not page_size or page_size < 1):
+        return jsonify({'message': 'Parâmetros page e pageSize devem ser inteiros positivos.'}), 400
+    if paginado:
+        page_size = min(page_size, current_app.config['CHAMADOS_MAX_PAGE_SIZE'])
 
     try:
-        url = f"{API_URL_BASE}/api/Chamados"
-        headers = {
-            'Accept': 'application/json'
-        }
-        auth = request.headers.get('Authorization')
-        if auth:
-            headers['Authorization'] = auth
-        
-        # A API C# não suporta filtros por query parameters, então buscamos todos e filtramos aqui
-        resp = requests.get(url, headers=headers)
-        if resp.status_code == 200:
-            chamados = resp.json()
-            
-            # Filtrar por solicitanteId se fornecido (para colaboradores verem apenas seus chamados)
-            if solicitante_id:
-                try:
-                    solicitante_id_int = int(solicitante_id)
-                    chamados = [
-                        chamado for chamado in chamados 
-                        if (chamado.get('solicitanteId') == solicitante_id_int or 
-                            chamado.get('SolicitanteId') == solicitante_id_int)
-                    ]
-                except (ValueError, TypeError):
-                    pass
-            
-            # Filtrar por status se fornecido
-            if status_param:
-                # Mapear status textual para numérico se necessário
-                status_map = {
-                    'andamento': 2,
-                    'em_andamento': 2,
-                    'resolvido': 4,
-                    'fechado': 5,
-                    'aberto': 1
-                }
-                status_value = status_map.get(status_param.lower(), status_param)
-                try:
-                    status_int = int(status_value)
-                    chamados = [c for c in chamados if c.get('status') == status_int]
-                except (ValueError, TypeError):
-                    pass
-            
-            return jsonify(chamados)
+        result, erro = _buscar_index()
+        if erro:
+            return erro
 
         try:
-            msg = resp.json().get('message', f'Erro HTTP {resp.status_code} ao listar chamados.')
-        except Exception:
-            msg = f'Erro HTTP {resp.status_code} ao listar chamados.'
-        return jsonify({'message': msg}), resp.status_code
+            chamados = result.data.consultar(
+                solicitante_id=solicitante_id,
+                tecnico_id=tecnico_id,
+                status=status,
+                data_inicio=data_inicio,
+                data_fim=data_fim,
+                sort=args.get('sort'),
+            )
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        if paginado:
+            return jsonify(paginar(chamados, page, page_size))
+
+        return _responder_lista(chamados, result)
 
     except requests.exceptions.RequestException as e:
-        print(f'Erro ao conectar à API externa: {e}')
+        logger.error('Erro ao conectar à API externa: %s', e)
         return jsonify({'message': 'Serviço de chamados indisponível.'}), 503
 
 
 def listar_chamados_em_andamento():
     try:
-        url = f"{API_URL_BASE}/api/Chamados"
-        headers = {
-            'Accept': 'application/json'
-        }
-        auth = request.headers.get('Authorization')
-        if auth:
-            headers['Authorization'] = auth
-        params = {'status': 'andamento'}
-        resp = requests.get(url, params=params, headers=headers)
-        if resp.status_code == 200:
-            return jsonify(resp.json())
-
-        try:
-            msg = resp.json().get('message', f'Erro HTTP {resp.status_code} ao listar chamados em andamento.')
-        except Exception:
-            msg = f'Erro HTTP {resp.status_code} ao listar chamados em andamento.'
-        return jsonify({'message': msg}), resp.status_code
+        result, erro = _buscar_index()
+        if erro:
+            return erro
+        return _responder_lista(result.data.consultar(status=STATUS_MAP['andamento']), result)
 
     except requests.exceptions.RequestException as e:
-        print(f'Erro ao conectar à API externa: {e}')
+        logger.error('Erro ao conectar à API externa: %s', e)
         return jsonify({'message': 'Serviço de chamados indisponível.'}), 503
 
 
+def listar_mudancas():
+    """
+    Chamados criados ou alterados (e IDs removidos) desde uma versão.
+
+    Query params:
+        since: valor de 'versao' da resposta anterior; sem ele, ou se a versão
+            não puder ser atendida, a resposta traz a lista completa (completo=true)
 
+    Resposta: {'versao', 'completo', 'chamados', 'removidos'}
+    """
+    since = request.args.get('since')
+    desde = _int_ou_none(since)
+    if since and desde is None:
+        return jsonify({'message': 'Parâmetro since deve ser um inteiro.'}), 400
+
+    try:
+        # Valida o chamador e traz a lista da API quando o cache vence
+        _, erro = _buscar_index()
+        if erro:
+            return erro
+        return jsonify(get_store().mudancas(desde))
+
+    except requests.exceptions.RequestException as e:
+        logger.error('Erro ao conectar à API externa: %s', e)
+        return jsonify({'message': 'Serviço de chamados indisponível.'}), 503
@@ -0,0 +1,45 @@
+import logging
+
+from flask import request, jsonify
+import requests
+
+from services.api_client import get_client, build_headers
+from services.user_profiles import permissao_from_role
+from web.IAAPI.configuracao import get_configuracao
+
+logger = logging.getLogger(__name__)
+
+# Só administradores recarregam a configuração da IA
+PERMISSAO_ADMIN = 3
+
+
+def recarregar_configuracao_ia():
+    """
+    POST /api/gemini/config/reload: relê o .env do módulo de IA na hora.
+
+    A configuração já é relida sozinha quando o arquivo muda (mtime); esta
+    rota serve para aplicar uma troca de chave sem esperar a verificação ou
+    quando a chave vem de variáveis de ambiente. Responde com o resumo da
+    configuração (sem a chave).
+    """
+    if not request.headers.get('Authorization'):
+        return jsonify({'message': 'Token de autenticação não fornecido.'}), 401
+
+    try:
+        # Ação privilegiada: a permissão vem da API do Azure na hora, sem o cache de 'perfil'
+        perfil = get_client().get_result('/api/Usuarios/meu-perfil', headers=build_headers())
+    except requests.exceptions.RequestException as e:
+        logger.error('Erro ao conectar à API externa: %s', e)
+        return jsonify({'message': 'Serviço de usuários indisponível.'}), 503
+    if perfil.status_code != 200:
+        msg = perfil.message(f'Erro HTTP {perfil.status_code} ao validar o usuário.')
+        return jsonify({'message': msg}), perfil.status_code
+
+    dados_perfil = perfil.data if isinstance(perfil.data, dict) else {}
+    if permissao_from_role(dados_perfil.get('permissao', dados_perfil.get('Permissao'))) != PERMISSAO_ADMIN:
+        return jsonify({'message': 'Apenas administradores podem recarregar a configuração da IA.'}), 403
+
+    configuracao = get_configuracao()
+    configuracao.carregar()
+    logger.info('[POST /api/gemini/config/reload] Configuração da IA recarregada por %s', dados_perfil.get('email'))
+    return jsonify(configuracao.resumo()), 200
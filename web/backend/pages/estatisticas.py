@@ -0,0 +1,65 @@
+import logging
+
+from flask import request, jsonify
+import requests
+
+from services.cache import cached_get
+from services.chamados_index import ChamadosIndex
+from services.stats import get_painel, resumo_usuarios
+from services.user_profiles import permissao_from_role
+
+logger = logging.getLogger(__name__)
+
+# Permissões que podem listar usuários na API do Azure (SuporteTecnico, Administrador)
+PERMISSOES_USUARIOS = (2, 3)
+
+
+def _erro(result, mensagem):
+    msg = result.message(mensagem)
+    return jsonify({'message': msg}), result.status_code
+
+
+def obter_estatisticas():
+    """
+    Agregados para os painéis de relatórios, sem baixar as coleções no cliente.
+
+    Resposta:
+        chamados: total, porStatus, porPrioridade, porTipo, porTecnico,
+            semTecnico, tempoResolucaoHoras (média e percentis), geradoEm
+        usuarios: total e porPermissao (null para colaboradores, que não
+            podem listar usuários)
+    """
+    if not request.headers.get('Authorization'):
+        return jsonify({'message': 'Token de autenticação não fornecido.'}), 401
+
+    try:
+        # Valida o chamador na API do Azure (resposta pequena e em cache por token)
+        perfil = cached_get('perfil', '/api/Usuarios/meu-perfil')
+        if perfil.status_code != 200:
+            return _erro(perfil, f'Erro HTTP {perfil.status_code} ao validar o usuário.')
+        dados_perfil = perfil.data if isinstance(perfil.data, dict) else {}
+        permissao = permissao_from_role(dados_perfil.get('permissao', dados_perfil.get('Permissao')))
+
+        painel = get_painel()
+        chamados = painel.chamados()
+        if chamados is None:
+            geracao = painel.geracao()
+            # Mesma entrada de cache de GET /chamados: se a lista já estiver em cache, não há nova chamada
+            result = cached_get('chamados', '/api/Chamados', transform=ChamadosIndex, stream=True)
+            if result.status_code != 200:
+                return _erro(result, f'Erro HTTP {result.status_code} ao listar chamados.')
+            chamados = painel.carregar_chamados(result.data, geracao=geracao, guardar=not result.stale)
+
+        usuarios = None
+        if permissao in PERMISSOES_USUARIOS:
+            result = cached_get('usuarios', '/api/Usuarios', transform=resumo_usuarios)
+            if result.status_code == 200:
+                usuarios = {'total': result.data['total'], 'porPermissao': result.data['porPermissao']}
+            else:
+                logger.warning('[GET /api/stats] Usuários indisponíveis (HTTP %s)', result.status_code)
+
+        return jsonify({'chamados': chamados, 'usuarios': usuarios})
+
+    except requests.exceptions.RequestException as e:
+        logger.error('Erro ao conectar à API externa: %s', e)
+        return jsonify({'message': 'Serviço de estatísticas indisponível.'}), 503
@@ -0,0 +1,119 @@
+import logging
+import sqlite3
+
+from flask import request, jsonify, Response
+import requests
+
+from services.cache import cached_get
+from services.chamados_store import get_store, buscar_chamados
+from services.dto import USUARIO
+from services.eventos import Assinante, get_canal, get_atualizador, get_bilhetes
+from services.user_profiles import token_claims, permissao_from_role
+
+logger = logging.getLogger(__name__)
+
+
+def _ultimo_id():
+    """Last-Event-ID enviado pelo EventSource na reconexão (header ou ?lastEventId=)"""
+    valor = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    try:
+        return int(valor) if valor else None
+    except ValueError:
+        return None
+
+
+def _validar_chamador():
+    """
+    Valida o header Authorization na API do Azure.
+
+    Returns:
+        tuple: (usuario normalizado, None) ou (None, resposta_flask) em caso de erro
+    """
+    try:
+        # Resposta pequena e em cache por token
+        perfil = cached_get('perfil', '/api/Usuarios/meu-perfil')
+    except requests.exceptions.RequestException as e:
+        logger.error('Erro ao conectar à API externa: %s', e)
+        return None, (jsonify({'message': 'Serviço de eventos indisponível.'}), 503)
+    if perfil.status_code != 200:
+        msg = perfil.message(f'Erro HTTP {perfil.status_code} ao validar o usuário.')
+        return None, (jsonify({'message': msg}), perfil.status_code)
+    return USUARIO.normalizar(perfil.data if isinstance(perfil.data, dict) else {}), None
+
+
+def emitir_bilhete_eventos():
+    """
+    POST /events/chamados/bilhete: troca o token (header Authorization) por um
+    bilhete de uso único para abrir GET /events/chamados?bilhete=.
+
+    O EventSource do navegador não envia headers, e o JWT na query string
+    ficaria nos logs de acesso; o bilhete vale uma vez, por poucos segundos.
+    """
+    authorization = request.headers.get('Authorization')
+    if not authorization:
+        return jsonify({'message': 'Token de autenticação não fornecido.'}), 401
+    _, erro = _validar_chamador()
+    if erro:
+        return erro
+
+    bilhetes = get_bilhetes()
+    try:
+        bilhete = bilhetes.emitir(authorization)
+    except sqlite3.Error as e:
+        logger.error('Falha ao emitir bilhete de eventos: %s', e)
+        return jsonify({'message': 'Serviço de eventos indisponível.'}), 503
+    return jsonify({'bilhete': bilhete, 'expiraEm': bilhetes.ttl}), 201
+
+
+def assinar_eventos_chamados():
+    """
+    Stream SSE com os chamados criados, alterados ou removidos.
+
+    O EventSource do navegador não envia headers: em vez do token, ele usa um
+    bilhete de POST /events/chamados/bilhete em ?bilhete= (o token nunca vai
+    na URL). Clientes que enviam headers continuam usando Authorization.
+    Colaboradores recebem só eventos dos próprios chamados; suporte e
+    administradores recebem todos. Cada evento 'chamado' tem
+    {tipo, versao, id, chamado}; um evento 'reset' indica que o cliente
+    perdeu mudanças e deve recarregar a lista (ex: GET /chamados/changes).
+    """
+    bilhete = request.args.get('bilhete')
+    if bilhete and not request.headers.get('Authorization'):
+        authorization = get_bilhetes().resgatar(bilhete)
+        if authorization is None:
+            return jsonify({'message': 'Bilhete de eventos inválido, vencido ou já usado.'}), 401
+        # Repassado à API do Azure como se tivesse vindo no header
+        request.environ['HTTP_AUTHORIZATION'] = authorization
+    authorization = request.headers.get('Authorization')
+    if not authorization:
+        return jsonify({'message': 'Token de autenticação não fornecido.'}), 401
+
+    usuario, erro = _validar_chamador()
+    if erro:
+        return erro
+    try:
+        # Os eventos partem da versão atual do store: carrega-o na primeira conexão
+        if not get_store().carregado:
+            buscar_chamados()
+    except requests.exceptions.RequestException as e:
+        logger.error('Erro ao conectar à API externa: %s', e)
+        return jsonify({'message': 'Serviço de eventos indisponível.'}), 503
+
+    assinante = Assinante(
+        usuario['id'],
+        permissao_from_role(usuario['permissao']),
+        authorization=authorization,
+        expira_em=token_claims(authorization).get('exp'),
+    )
+    try:
+        stream = get_canal().assinar(assinante, _ultimo_id())
+    except OverflowError as e:
+        logger.warning('[GET /events/chamados] %s', e)
+        return jsonify({'message': 'Muitas conexões de eventos abertas. Tente novamente mais tarde.'}), 503
+    get_atualizador().garantir()
+
+    response = Response(stream, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Desliga o buffer de proxies reversos (nginx), senão os eventos chegam atrasados
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,8 +1,13 @@
+import logging
+
 from flask import request, jsonify
 import requests
 
-# ENDPOINT BASE da sua API externa (Azure)
-API_URL_BASE = 'https://api-suporte-grupoads-e4hmccf7gaczdbht.brazilsouth-01.azurewebsites.net'
+from services.cache import cached_get
+from services.stats import resumo_usuarios
+from services.logging_setup import log_payload
+
+logger = logging.getLogger(__name__)
 
 # Rota para listar usuários e obter estatísticas
 def listar_usuarios():
@@ -17,73 +22,23 @@ def listar_usuarios():
     # Rota GET - Listar todos os usuários
     if request.method == 'GET':
         try:
-            url = f"{API_URL_BASE}/api/Usuarios"
-            headers = {
-                'Accept': 'application/json'
-            }
-            auth = request.headers.get('Authorization')
-            if auth:
-                headers['Authorization'] = auth
-            
-            resp = requests.get(url, headers=headers)
+            # Normalização, contagem por permissão e cache de perfis do login: uma vez por resposta da API
+            result = cached_get('usuarios', '/api/Usuarios', transform=resumo_usuarios)
             
-            if resp.status_code == 200:
-                usuarios_data = resp.json()
-                
-                # Se a resposta for um dict com 'data' ou similar, ajusta
-                if isinstance(usuarios_data, dict) and 'data' in usuarios_data:
-                    usuarios = usuarios_data['data']
-                elif isinstance(usuarios_data, list):
-                    usuarios = usuarios_data
-                else:
-                    usuarios = []
+            if result.status_code == 200:
+                compilado = result.data
                 
                 # Debug: verificar dados recebidos da API C#
-                print(f'[GET /api/Usuarios] Total de usuários recebidos da API C#: {len(usuarios)}')
-                
-                # Normaliza os dados para o frontend
-                usuarios_normalizados = []
-                contador_por_permissao = {
-                    'colaborador': 0,
-                    'suporte': 0,
-                    'admin': 0
-                }
-                
-                for usuario in usuarios:
-                    usuarios_normalizados.append({
-                        'id': usuario.get('id') or usuario.get('Id'),
-                        'nome': usuario.get('nome') or usuario.get('Nome') or '',
-                        'email': usuario.get('email') or usuario.get('Email') or '',
-                        'telefone': usuario.get('telefone') or usuario.get('Telefone') or '',
-                        'cargo': usuario.get('cargo') or usuario.get('Cargo') or '',
-                        'permissao': usuario.get('permissao') if usuario.get('permissao') is not None else usuario.get('Permissao')
-                    })
-                    
-                    # Contar por nível de permissão
-                    permissao = usuario.get('permissao') if usuario.get('permissao') is not None else usuario.get('Permissao')
-                    if permissao == 1:
-                        contador_por_permissao['colaborador'] += 1
-                    elif permissao == 2:
-                        contador_por_permissao['suporte'] += 1
-                    elif permissao == 3:
-                        contador_por_permissao['admin'] += 1
+                logger.debug('[GET /api/Usuarios] Total de usuários recebidos da API C#: %d', compilado['total'])
                 
-                print(f'[GET /api/Usuarios] Usuários normalizados:', len(usuarios_normalizados))
-                print(f'[GET /api/Usuarios] Contagem por permissão:', contador_por_permissao)
+                log_payload(logger, '[GET /api/Usuarios] Contagem por permissão: %s', compilado['porPermissao'])
                 
                 # Retorna dados compilados
-                return jsonify({
-                    'total': len(usuarios_normalizados),
-                    'usuarios': usuarios_normalizados,
-                    'porPermissao': contador_por_permissao
-                })
+                return jsonify(compilado)
             
-            try:
-                msg = resp.json().get('message', f'Erro HTTP {resp.status_code} ao listar usuários.')
-            except Exception:
-                msg = f'Erro HTTP {resp.status_code} ao listar usuários.'
-            return jsonify({'message': msg}), resp.status_code
+            msg = result.message(f'Erro HTTP {result.status_code} ao listar usuários.')
+            return jsonify({'message': msg}), result.status_code
 
         except requests.exceptions.RequestException as e:
-            print(f'Erro ao conectar à API externa: {e}')
+            logger.error('Erro ao conectar à API externa: %s', e)
             return jsonify({'message': 'Serviço de usuários indisponível.'}), 503
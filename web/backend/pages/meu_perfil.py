@@ -1,8 +1,15 @@
+import logging
+
 from flask import request, jsonify
 import requests
 
-# ENDPOINT BASE da sua API externa (Azure)
-API_URL_BASE = 'https://api-suporte-grupoads-e4hmccf7gaczdbht.brazilsouth-01.azurewebsites.net'
+from services.api_client import get_client, build_headers
+from services.cache import get_cache
+from services.user_profiles import remember, forget, token_claims
+from services.dto import USUARIO, USUARIO_ATUALIZACAO
+from services.logging_setup import log_payload
+
+logger = logging.getLogger(__name__)
 
 # Rota unificada para GET (meu perfil) e PUT (atualizar meu perfil)
 def gerenciar_meu_perfil():
@@ -17,88 +24,54 @@ def gerenciar_meu_perfil():
     # Rota GET - Buscar meu perfil (usuário logado)
     if request.method == 'GET':
         try:
-            url = f"{API_URL_BASE}/api/Usuarios/meu-perfil"
-            headers = {
-                'Accept': 'application/json'
-            }
-            auth = request.headers.get('Authorization')
-            if auth:
-                headers['Authorization'] = auth
+            headers = build_headers()
             
-            resp = requests.get(url, headers=headers)
+            resp = get_client().get_result('/api/Usuarios/meu-perfil', headers=headers)
             
             if resp.status_code == 200:
-                usuario_data = resp.json()
+                usuario_data = resp.data
                 # Debug: verificar dados recebidos da API C#
-                print(f'[GET /api/Usuarios/meu-perfil] Dados recebidos da API C#:', usuario_data)
+                log_payload(logger, '[GET /api/Usuarios/meu-perfil] Dados recebidos da API C#: %s', usuario_data)
                 
                 # Normaliza os dados para o frontend
-                normalized_data = {
-                    'id': usuario_data.get('id') or usuario_data.get('Id'),
-                    'nome': usuario_data.get('nome') or usuario_data.get('Nome') or '',
-                    'email': usuario_data.get('email') or usuario_data.get('Email') or '',
-                    'telefone': usuario_data.get('telefone') or usuario_data.get('Telefone') or '',
-                    'cargo': usuario_data.get('cargo') or usuario_data.get('Cargo') or '',
-                    'permissao': usuario_data.get('permissao') if usuario_data.get('permissao') is not None else usuario_data.get('Permissao'),
-                    # IMPORTANTE: Inclui o campo primeiroAcesso para o modal de primeiro acesso funcionar
-                    'primeiroAcesso': usuario_data.get('primeiroAcesso') if usuario_data.get('primeiroAcesso') is not None else usuario_data.get('PrimeiroAcesso', False)
-                }
+                # IMPORTANTE: Inclui o campo primeiroAcesso para o modal de primeiro acesso funcionar
+                normalized_data = USUARIO.normalizar(usuario_data)
                 
-                print(f'[GET /api/Usuarios/meu-perfil] Dados normalizados:', normalized_data)
+                remember(normalized_data)
                 return jsonify(normalized_data)
             
-            try:
-                msg = resp.json().get('message', f'Erro HTTP {resp.status_code} ao buscar seu perfil.')
-            except Exception:
-                msg = f'Erro HTTP {resp.status_code} ao buscar seu perfil.'
+            msg = resp.message(f'Erro HTTP {resp.status_code} ao buscar seu perfil.')
             return jsonify({'message': msg}), resp.status_code
 
         except requests.exceptions.RequestException as e:
-            print(f'Erro ao conectar à API externa: {e}')
+            logger.error('Erro ao conectar à API externa: %s', e)
             return jsonify({'message': 'Serviço de perfil indisponível.'}), 503
     
     # Rota PUT - Atualizar meu próprio perfil (usuário logado)
     if request.method == 'PUT':
         data = request.json
         
-        # Mapeamento dos campos que podem ser atualizados
-        nome = data.get('nome')
-        email = data.get('email')
-        telefone = data.get('telefone')
-        cargo = data.get('cargo')
+        # Prepara os dados no formato esperado pela API do Azure (telefone pode ser apagado com "")
+        dados_para_api = USUARIO_ATUALIZACAO.para_api(data, vazios_permitidos=('telefone',))
         
         # Validação mínima
-        if not nome and not email and not telefone and not cargo:
+        if not any(dados_para_api.values()):
             return jsonify({"message": "Pelo menos um campo deve ser fornecido para atualização."}), 400
         
-        # Prepara os dados no formato esperado pela API do Azure
-        dados_para_api = {}
-        if nome:
-            dados_para_api['Nome'] = nome
-        if email:
-            dados_para_api['Email'] = email
-        if telefone is not None:  # Permite string vazia
-            dados_para_api['Telefone'] = telefone or ""
-        if cargo:
-            dados_para_api['Cargo'] = cargo
-        
         try:
             # Endpoint de Atualização na API do Azure (PUT)
-            url_atualizacao = f"{API_URL_BASE}/api/Usuarios/meu-perfil"
-            
-            headers = {
-                'Content-Type': 'application/json',
-                'Accept': 'application/json'
-            }
-            
-            auth = request.headers.get('Authorization')
-            if auth:
-                headers['Authorization'] = auth
+            headers = build_headers(json_body=True)
             
-            response = requests.put(url_atualizacao, json=dados_para_api, headers=headers)
+            response = get_client().put('/api/Usuarios/meu-perfil', json=dados_para_api, headers=headers)
             
             # 1. Atualização BEM-SUCEDIDA
             if response.status_code in [200, 204]:
+                # Nome/e-mail alterados aparecem na lista de usuários, nos chamados e no meu-perfil em cache
+                cache = get_cache()
+                cache.invalidate('usuarios')
+                cache.invalidate('chamados')
+                cache.invalidate('perfil')
+                forget(token_claims(request.headers.get('Authorization')).get('sub'))
                 # Se retornar dados, retorna; senão, retorna sucesso
                 try:
                     return jsonify({
@@ -123,5 +96,5 @@ def gerenciar_meu_perfil():
         
         except requests.exceptions.RequestException as e:
             # Erro de conexão com a API do Azure
-            print(f"Erro ao conectar à API do Azure: {e}")
+            logger.error("Erro ao conectar à API do Azure: %s", e)
             return jsonify({"message": "Erro de conexão com o serviço de dados."}), 503
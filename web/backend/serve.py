@@ -0,0 +1,104 @@
+"""
+Servidor de produção do backend HelpWave (modo assíncrono com gevent)
+
+O app.run() do Flask ocupa uma thread por requisição durante toda a ida à
+API do Azure (ou ao Gemini). Aqui o mesmo app WSGI roda sobre gevent: cada
+requisição é um greenlet e as chamadas de rede feitas com requests cedem a
+vez enquanto aguardam, então um único processo mantém centenas de
+requisições em andamento. As rotas registradas em app.py não mudam.
+
+Uso:
+    python serve.py
+
+Linux/macOS: sobe o gunicorn com SERVER_WORKERS workers gevent.
+Windows (sem gunicorn): sobe um único processo gevent.
+As opções ficam em config.py (SERVER_*) e podem ser trocadas por variáveis de ambiente.
+"""
+import logging
+import os
+import re
+import sys
+
+# Cada greenlet pode usar uma conexão com a API do Azure; o pool por worker
+# precisa ser maior que o padrão pensado para threads
+os.environ.setdefault('API_POOL_MAXSIZE', '100')
+# O cliente do Gemini via REST usa requests e coopera com o gevent
+os.environ.setdefault('GEMINI_TRANSPORT', 'rest')
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def _opcoes_gunicorn():
+    return {
+        'bind': f"{Config.SERVER_HOST}:{Config.SERVER_PORT}",
+        'workers': Config.SERVER_WORKERS,
+        'worker_class': 'gevent',
+        'worker_connections': Config.SERVER_WORKER_CONNECTIONS,
+        'keepalive': Config.SERVER_KEEPALIVE,
+        'timeout': Config.SERVER_TIMEOUT,
+        'graceful_timeout': 30,
+        'accesslog': '-',
+        # Formato padrão do gunicorn com o caminho sem a query string (%(U)s no lugar da linha
+        # da requisição): parâmetros como ?bilhete= de /events/chamados não vão para o log
+        'access_log_format': '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"',
+    }
+
+
+def run_gunicorn():
+    from gunicorn.app.base import BaseApplication
+
+    class HelpWaveServer(BaseApplication):
+        def load_config(self):
+            for chave, valor in _opcoes_gunicorn().items():
+                self.cfg.set(chave, valor)
+
+        def load(self):
+            # Importado dentro do worker, depois do monkey-patch do gevent
+            from app import app
+            return app
+
+    HelpWaveServer().run()
+
+
+def _handler_sem_query():
+    """WSGIHandler do gevent cujo log de acesso mostra o caminho sem a query string"""
+    from gevent.pywsgi import WSGIHandler
+
+    class HandlerSemQuery(WSGIHandler):
+        def format_request(self):
+            linha = self.requestline
+            if linha:
+                # "GET /events/chamados?bilhete=... HTTP/1.1" -> "GET /events/chamados HTTP/1.1"
+                self.requestline = re.sub(r'\?\S*', '', linha)
+            try:
+                return super().format_request()
+            finally:
+                self.requestline = linha
+
+    return HandlerSemQuery
+
+
+def run_gevent():
+    from gevent import monkey
+    monkey.patch_all()
+
+    from gevent.pool import Pool
+    from gevent.pywsgi import WSGIServer
+    from app import app
+
+    endereco = (Config.SERVER_HOST, Config.SERVER_PORT)
+    # O log já está configurado pelo create_app (services/logging_setup.py)
+    logger.info('Servidor gevent em http://%s:%s (até %d conexões simultâneas)',
+                endereco[0], endereco[1], Config.SERVER_WORKER_CONNECTIONS)
+    servidor = WSGIServer(endereco, app, spawn=Pool(Config.SERVER_WORKER_CONNECTIONS),
+                          handler_class=_handler_sem_query())
+    servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        run_gevent()
+    else:
+        run_gunicorn()
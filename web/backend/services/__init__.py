@@ -0,0 +1,2 @@
+# Arquivo __init__.py para tornar 'services' um pacote Python
+# Este pacote reúne a infraestrutura compartilhada pelas rotas em 'pages'
@@ -0,0 +1,286 @@
+"""
+Cliente HTTP compartilhado para a API externa (Azure)
+
+Todas as rotas em 'pages' usam este módulo em vez de chamar requests.get/post
+diretamente. Uma única requests.Session mantém um pool de conexões keep-alive,
+evitando um novo handshake TCP+TLS a cada requisição, e todas as chamadas
+recebem os timeouts de conexão/leitura definidos em config.py. Cada endpoint
+passa por um circuit breaker, que recusa chamadas na hora enquanto o Azure
+estiver falhando (CircuitOpenError, uma RequestException).
+"""
+import hashlib
+import logging
+from http.cookiejar import DefaultCookiePolicy
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from flask import request, has_request_context
+
+from config import Config
+from services import json_codec, metrics
+from services.json_stream import iter_array
+from services.singleflight import SingleFlight
+from services.circuit_breaker import CircuitBreakerRegistry, CircuitOpenError, endpoint_key
+
+logger = logging.getLogger(__name__)
+
+# Status devolvido quando a API responde 2xx com um corpo que não é JSON válido
+STATUS_RESPOSTA_INVALIDA = 502
+
+
+class UpstreamResult:
+    """
+    Resposta da API do Azure já convertida de JSON.
+
+    Usada pelas camadas que reaproveitam respostas entre requisições (cache),
+    onde o objeto requests.Response original não pode ser compartilhado.
+    """
+
+    __slots__ = ('status_code', 'data', 'size', 'stale', 'digest')
+
+    def __init__(self, status_code, data=None, size=0, stale=False, digest=None):
+        self.status_code = status_code
+        self.data = data
+        self.size = size
+        # True quando servida do cache vencido porque a API está indisponível
+        self.stale = stale
+        # Hash do corpo recebido da API (identifica a versão dos dados, ex: para ETags)
+        self.digest = digest
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 300
+
+    @classmethod
+    def invalida(cls, resp, erro, size=0, digest=None):
+        """
+        Resultado 502 para uma resposta 2xx cujo corpo não pôde ser lido
+        (cortado, HTML de proxy...). Não é passado a transform e, por não ser
+        2xx, não entra no cache (cached_get serve a última resposta boa, se houver).
+        """
+        logger.warning('Resposta %s inválida da API externa (%s): %s', resp.status_code, resp.url, erro)
+        return cls(STATUS_RESPOSTA_INVALIDA, {'message': 'Resposta inválida do serviço externo.'},
+                   size, digest=digest)
+
+    @classmethod
+    def from_response(cls, resp, transform=None):
+        """Converte um requests.Response; transform é aplicado ao JSON das respostas 2xx"""
+        with metrics.medir('upstream_json'):
+            content = resp.content or b''
+            digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+            try:
+                data = json_codec.loads(content) if content else None
+            except ValueError as e:
+                if 200 <= resp.status_code < 300:
+                    return cls.invalida(resp, e, len(content), digest)
+                # Corpo de erro que não é JSON (ex: página HTML de 502 do proxy)
+                data = None
+            result = cls(resp.status_code, data, len(content), digest=digest)
+            if result.ok and transform is not None:
+                result.data = transform(data)
+        return result
+
+    @classmethod
+    def from_stream(cls, resp, transform=None):
+        """
+        Converte uma resposta obtida com stream=True cujo corpo é um array JSON.
+
+        Os elementos são lidos um a um enquanto os blocos chegam e entregues
+        a transform (ou reunidos em uma lista), sem guardar o texto completo
+        da resposta. Respostas de erro são lidas normalmente; um array cortado
+        ou inválido vira um resultado 502 (ver invalida).
+        """
+        if not 200 <= resp.status_code < 300:
+            return cls.from_response(resp, transform)
+
+        hash_corpo = hashlib.blake2b(digest_size=16)
+        tamanho = 0
+
+        def blocos():
+            nonlocal tamanho
+            for bloco in resp.iter_content(chunk_size=64 * 1024):
+                hash_corpo.update(bloco)
+                tamanho += len(bloco)
+                yield bloco
+
+        try:
+            with metrics.medir('upstream_json'):
+                itens = iter_array(blocos())
+                try:
+                    data = transform(itens) if transform is not None else list(itens)
+                except ValueError as e:
+                    if tamanho:
+                        # Array cortado ou corpo que não é JSON: nada do que foi lido vale
+                        return cls.invalida(resp, e, tamanho, hash_corpo.hexdigest())
+                    # Corpo vazio: mesmo tratamento de from_response
+                    data = transform(None) if transform is not None else None
+        finally:
+            resp.close()
+        return cls(resp.status_code, data, tamanho, digest=hash_corpo.hexdigest())
+
+    def message(self, default):
+        """Mensagem de erro enviada pela API ou o texto padrão"""
+        if isinstance(self.data, dict):
+            return self.data.get('message', default)
+        return default
+
+
+class ApiClient:
+    """Cliente com pool de conexões para a API do Azure"""
+
+    def __init__(self, base_url=None, timeout=None, connect_timeout=None,
+                 pool_connections=None, pool_maxsize=None,
+                 breaker_threshold=None, breaker_reset=None):
+        self.base_url = (base_url or Config.API_URL_BASE).rstrip('/')
+        # requests aceita uma tupla (connect, read)
+        self.timeout = (
+            connect_timeout or Config.API_CONNECT_TIMEOUT,
+            timeout or Config.API_TIMEOUT,
+        )
+
+        self.session = requests.Session()
+        # A sessão é compartilhada por todos os chamadores: só o pool de conexões pode ser
+        # comum. Nenhum Set-Cookie da API (ex: ARRAffinity) é guardado e repassado a outros usuários
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections or Config.API_POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize or Config.API_POOL_MAXSIZE,
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # GETs idênticos simultâneos compartilham uma única requisição
+        self.flight = SingleFlight()
+        self.breakers = CircuitBreakerRegistry(
+            failure_threshold=breaker_threshold or Config.BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=breaker_reset or Config.BREAKER_RESET_TIMEOUT,
+        )
+
+    def url(self, path):
+        """Monta a URL completa a partir de um caminho como '/api/Chamados'"""
+        return f"{self.base_url}{path}"
+
+    def request(self, method, path, **kwargs):
+        """
+        Executa a requisição reaproveitando o pool; aplica o timeout padrão.
+
+        Raises:
+            CircuitOpenError: Se o circuito do endpoint estiver aberto
+            requests.exceptions.RequestException: Em falhas de rede/timeout
+        """
+        endpoint = endpoint_key(method, path)
+        breaker = self.breakers.get(endpoint)
+        if not breaker.allow():
+            metrics.observe_upstream(endpoint, None, outcome='circuit_open')
+            raise CircuitOpenError(f"API externa indisponível ({endpoint}); circuito aberto")
+
+        kwargs.setdefault('timeout', self.timeout)
+        inicio = time.perf_counter()
+        try:
+            resp = self.session.request(method, self.url(path), **kwargs)
+        except requests.exceptions.RequestException:
+            metrics.observe_upstream(endpoint, time.perf_counter() - inicio)
+            breaker.record_failure()
+            raise
+
+        metrics.observe_upstream(endpoint, time.perf_counter() - inicio, resp.status_code)
+        if resp.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return resp
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request('PUT', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def get_result(self, path, headers=None, transform=None, stream=False):
+        """
+        GET convertido em UpstreamResult, com coalescência.
+
+        Chamadas simultâneas para o mesmo caminho e o mesmo escopo de
+        autenticação compartilham uma única requisição à API do Azure e
+        recebem o mesmo objeto (somente leitura).
+
+        Com stream=True o corpo (um array JSON) é lido incrementalmente.
+        """
+        key = (path, caller_scope(), transform)
+        if stream:
+            def buscar():
+                return UpstreamResult.from_stream(self.get(path, headers=headers, stream=True), transform)
+        else:
+            def buscar():
+                return UpstreamResult.from_response(self.get(path, headers=headers), transform)
+        return self.flight.do(key, buscar)
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def init_app(app):
+    """Cria o cliente compartilhado a partir das configurações do app Flask"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = ApiClient(
+            base_url=app.config.get('API_URL_BASE'),
+            timeout=app.config.get('API_TIMEOUT'),
+            connect_timeout=app.config.get('API_CONNECT_TIMEOUT'),
+            pool_connections=app.config.get('API_POOL_CONNECTIONS'),
+            pool_maxsize=app.config.get('API_POOL_MAXSIZE'),
+            breaker_threshold=app.config.get('BREAKER_FAILURE_THRESHOLD'),
+            breaker_reset=app.config.get('BREAKER_RESET_TIMEOUT'),
+        )
+    app.extensions['api_client'] = _client
+    return _client
+
+
+def get_client():
+    """Retorna o cliente compartilhado (criado com Config se init_app não foi chamado)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ApiClient()
+    return _client
+
+
+def caller_scope():
+    """Identificador do chamador: hash do header Authorization (nunca o token em si)"""
+    auth = request.headers.get('Authorization') if has_request_context() else None
+    if not auth:
+        return 'anonimo'
+    return hashlib.sha256(auth.encode('utf-8')).hexdigest()[:32]
+
+
+def build_headers(json_body=False, forward_auth=True):
+    """
+    Monta os headers para a API do Azure.
+
+    Args:
+        json_body (bool): Adiciona Content-Type: application/json
+        forward_auth (bool): Repassa o header Authorization da requisição atual
+    """
+    headers = {'Accept': 'application/json'}
+    if json_body:
+        headers['Content-Type'] = 'application/json'
+    if forward_auth and has_request_context():
+        auth = request.headers.get('Authorization')
+        if auth:
+            headers['Authorization'] = auth
+    return headers
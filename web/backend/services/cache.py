@@ -0,0 +1,251 @@
+"""
+Cache read-through das respostas da API do Azure
+
+As respostas de GET são guardadas por (coleção, caminho, escopo do chamador),
+onde o escopo é derivado do header Authorization — usuários diferentes nunca
+compartilham entradas. As entradas expiram pelo TTL configurado para a
+coleção, o cache descarta as menos usadas (LRU) ao atingir o limite de
+entradas ou de bytes, e as rotas que alteram dados invalidam a coleção
+afetada explicitamente.
+
+Entradas vencidas ainda ficam guardadas por CACHE_STALE_TIMEOUT: se a API
+falhar (ou o circuit breaker estiver aberto), a última resposta boa é servida
+com o header 'Warning: 110' em vez de um 503.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from flask import after_this_request, has_request_context
+
+from config import Config
+from services.api_client import get_client, build_headers, caller_scope, UpstreamResult
+
+
+class _Entrada:
+    __slots__ = ('valor', 'expira_em', 'tamanho')
+
+    def __init__(self, valor, expira_em, tamanho):
+        self.valor = valor
+        self.expira_em = expira_em
+        self.tamanho = tamanho
+
+
+class ResponseCache:
+    """Cache LRU com TTL por entrada e limite aproximado de memória"""
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024,
+                 default_ttl=300, ttls=None, enabled=True, stale_ttl=0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.ttls = dict(ttls or {})
+        self.enabled = enabled
+
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        # Incrementada a cada invalidação; evita gravar respostas buscadas antes dela
+        self._geracoes = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_hits = 0
+
+    def ttl_for(self, namespace):
+        return self.ttls.get(namespace, self.default_ttl)
+
+    def get(self, key):
+        """Retorna o valor armazenado ou None (expirado/ausente)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entrada = self._entradas.get(key)
+            if entrada is None:
+                self.misses += 1
+                return None
+            agora = time.monotonic()
+            if entrada.expira_em <= agora:
+                # Mantém a entrada vencida para get_stale() durante a janela configurada
+                if entrada.expira_em + self.stale_ttl <= agora:
+                    self._remover(key)
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(key)
+            self.hits += 1
+            return entrada.valor
+
+    def get_stale(self, key):
+        """Retorna o valor mesmo vencido, se ainda estiver dentro da janela de stale"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entrada = self._entradas.get(key)
+            if entrada is None or entrada.expira_em + self.stale_ttl <= time.monotonic():
+                return None
+            self.stale_hits += 1
+            return entrada.valor
+
+    def generation(self, namespace):
+        return self._geracoes.get(namespace, 0)
+
+    def set(self, key, valor, ttl=None, tamanho=0, geracao=None):
+        """
+        Armazena um valor; key é uma tupla (coleção, caminho, escopo).
+
+        Se geracao for informada e a coleção tiver sido invalidada desde então,
+        o valor é descartado.
+        """
+        if not self.enabled or tamanho > self.max_bytes:
+            return
+        if ttl is None:
+            ttl = self.ttl_for(key[0])
+        with self._lock:
+            if geracao is not None and geracao != self._geracoes.get(key[0], 0):
+                return
+            if key in self._entradas:
+                self._remover(key)
+            self._entradas[key] = _Entrada(valor, time.monotonic() + ttl, tamanho)
+            self._bytes += tamanho
+            while self._entradas and (len(self._entradas) > self.max_entries or self._bytes > self.max_bytes):
+                antiga, _ = next(iter(self._entradas.items()))
+                self._remover(antiga)
+                self.evictions += 1
+
+    def invalidate(self, namespace, path=None):
+        """Remove todas as entradas da coleção (ou só as de um caminho), em todos os escopos"""
+        with self._lock:
+            self._geracoes[namespace] = self._geracoes.get(namespace, 0) + 1
+            chaves = [
+                key for key in self._entradas
+                if key[0] == namespace and (path is None or key[1] == path)
+            ]
+            for key in chaves:
+                self._remover(key)
+
+    def invalidate_paths(self, namespace, paths):
+        """Como invalidate(namespace, path) para vários caminhos, em uma única passada"""
+        paths = set(paths)
+        with self._lock:
+            self._geracoes[namespace] = self._geracoes.get(namespace, 0) + 1
+            chaves = [key for key in self._entradas if key[0] == namespace and key[1] in paths]
+            for key in chaves:
+                self._remover(key)
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entradas),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'stale_hits': self.stale_hits,
+            }
+
+    def _remover(self, key):
+        entrada = self._entradas.pop(key)
+        self._bytes -= entrada.tamanho
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _criar_cache(cfg):
+    return ResponseCache(
+        max_entries=cfg.get('CACHE_MAX_ENTRIES', 1024),
+        max_bytes=cfg.get('CACHE_MAX_BYTES', 64 * 1024 * 1024),
+        default_ttl=cfg.get('CACHE_DEFAULT_TIMEOUT', 300),
+        ttls=cfg.get('CACHE_TIMEOUTS'),
+        enabled=cfg.get('CACHE_TYPE', 'simple') != 'null',
+        stale_ttl=cfg.get('CACHE_STALE_TIMEOUT', 0),
+    )
+
+
+def init_app(app):
+    """Cria o cache compartilhado a partir das configurações do app Flask"""
+    global _cache
+    with _cache_lock:
+        _cache = _criar_cache(app.config)
+    app.extensions['response_cache'] = _cache
+    return _cache
+
+
+def get_cache():
+    """Retorna o cache compartilhado (criado com Config se init_app não foi chamado)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _criar_cache({k: getattr(Config, k) for k in dir(Config) if k.startswith('CACHE_')})
+    return _cache
+
+
+def cached_get(namespace, path, transform=None, stream=False):
+    """
+    GET na API do Azure com cache read-through.
+
+    Apenas respostas 2xx são armazenadas. O valor em cache é compartilhado
+    entre requisições do mesmo escopo e não deve ser modificado. Em um miss,
+    requisições simultâneas idênticas são coalescidas em uma única chamada.
+
+    Args:
+        namespace (str): Coleção usada para TTL e invalidação ('chamados', 'usuarios')
+        path (str): Caminho na API do Azure, ex: '/api/Chamados'
+        transform (callable): Aplicado ao JSON antes de armazenar (ex: ChamadosIndex)
+        stream (bool): Lê o array JSON da API incrementalmente (listas grandes)
+
+    Se a API falhar (rede, timeout, 5xx ou circuito aberto) e houver uma
+    resposta vencida dentro de CACHE_STALE_TIMEOUT, ela é retornada com
+    stale=True e a resposta HTTP recebe o header 'Warning: 110'.
+
+    Returns:
+        UpstreamResult
+
+    Raises:
+        requests.exceptions.RequestException: Em falhas de rede sem resposta em cache
+    """
+    cache = get_cache()
+    key = (namespace, path, caller_scope())
+
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    geracao = cache.generation(namespace)
+    try:
+        result = get_client().get_result(path, headers=build_headers(), transform=transform, stream=stream)
+    except requests.exceptions.RequestException:
+        stale = _servir_stale(cache, key)
+        if stale is None:
+            raise
+        return stale
+
+    if result.ok:
+        cache.set(key, result, tamanho=result.size, geracao=geracao)
+    elif result.status_code >= 500:
+        return _servir_stale(cache, key) or result
+    return result
+
+
+def _servir_stale(cache, key):
+    """Cópia marcada como stale da última resposta boa, ou None"""
+    anterior = cache.get_stale(key)
+    if anterior is None:
+        return None
+
+    if has_request_context():
+        @after_this_request
+        def _marcar_stale(response):
+            response.headers['Warning'] = '110 - "Response is Stale"'
+            return response
+
+    return UpstreamResult(anterior.status_code, anterior.data, anterior.size, stale=True, digest=anterior.digest)
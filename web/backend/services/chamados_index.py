@@ -0,0 +1,173 @@
+"""
+Visão indexada dos chamados retornados pela API do Azure
+
+A API C# não aceita filtros nem paginação em GET /api/Chamados. Esta visão
+normaliza a lista recebida em uma única passada e monta índices por
+solicitante, técnico e status, para que cada consulta percorra apenas os
+chamados do menor grupo filtrado em vez da coleção inteira.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from services.dto import CHAMADO_CHAVES
+
+
+# Campos aceitos em ?sort= (nome público -> chave normalizada)
+CAMPOS_ORDENACAO = {
+    'id': 'id',
+    'titulo': 'titulo',
+    'status': 'status',
+    'prioridade': 'prioridade',
+    'tipo': 'tipo',
+    'dataAbertura': 'dataAbertura',
+    'dataFechamento': 'dataFechamento',
+}
+
+
+def parse_data(valor):
+    """Converte uma data ISO 8601 para datetime UTC sem fuso (None se inválida)"""
+    if not valor:
+        return None
+    if isinstance(valor, datetime):
+        data = valor
+    else:
+        try:
+            data = datetime.fromisoformat(str(valor).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if data.tzinfo is not None:
+        data = data.astimezone(timezone.utc).replace(tzinfo=None)
+    return data
+
+
+class _Entrada:
+    """Chamado original acompanhado das chaves já normalizadas para filtro e ordenação"""
+
+    __slots__ = ('chamado', 'chaves', 'abertura')
+
+    def __init__(self, chamado):
+        self.chamado = chamado
+        # camelCase ou PascalCase, convertidos uma única vez por chamado
+        self.chaves = CHAMADO_CHAVES.normalizar(chamado)
+        self.abertura = parse_data(self.chaves['dataAbertura'])
+
+
+class ChamadosIndex:
+    """Índices em memória sobre uma lista de chamados"""
+
+    def __init__(self, chamados):
+        self.entradas = []
+        self.por_id = {}
+        self.por_solicitante = defaultdict(list)
+        self.por_tecnico = defaultdict(list)
+        self.por_status = defaultdict(list)
+
+        for chamado in chamados or []:
+            if not isinstance(chamado, dict):
+                continue
+            entrada = _Entrada(chamado)
+            self.entradas.append(entrada)
+
+            chamado_id = entrada.chaves['id']
+            if chamado_id is not None:
+                self.por_id[chamado_id] = entrada
+            self.por_solicitante[entrada.chaves['solicitanteId']].append(entrada)
+            self.por_tecnico[entrada.chaves['tecnicoResponsavelId']].append(entrada)
+            self.por_status[entrada.chaves['status']].append(entrada)
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def buscar(self, chamado_id):
+        """Retorna o chamado pelo ID ou None"""
+        entrada = self.por_id.get(chamado_id)
+        return entrada.chamado if entrada else None
+
+    def consultar(self, solicitante_id=None, tecnico_id=None, status=None,
+                  data_inicio=None, data_fim=None, sort=None):
+        """
+        Filtra e ordena os chamados.
+
+        Os filtros por igualdade usam o menor índice disponível como ponto de
+        partida; os demais critérios são verificados apenas nesse subconjunto.
+
+        Args:
+            solicitante_id (int): ID do solicitante
+            tecnico_id (int): ID do técnico responsável
+            status (int): Status numérico do chamado
+            data_inicio (datetime): Abertura a partir desta data (inclusive)
+            data_fim (datetime): Abertura até esta data (inclusive)
+            sort (str): Campo de ordenação; prefixo '-' para ordem decrescente
+
+        Returns:
+            list: Chamados (dicts originais) que atendem aos filtros
+
+        Raises:
+            ValueError: Se o campo de ordenação não for suportado
+        """
+        grupos = []
+        if solicitante_id is not None:
+            grupos.append(self.por_solicitante.get(solicitante_id, []))
+        if tecnico_id is not None:
+            grupos.append(self.por_tecnico.get(tecnico_id, []))
+        if status is not None:
+            grupos.append(self.por_status.get(status, []))
+
+        candidatos = min(grupos, key=len) if grupos else self.entradas
+
+        def atende(entrada):
+            chaves = entrada.chaves
+            if solicitante_id is not None and chaves['solicitanteId'] != solicitante_id:
+                return False
+            if tecnico_id is not None and chaves['tecnicoResponsavelId'] != tecnico_id:
+                return False
+            if status is not None and chaves['status'] != status:
+                return False
+            if data_inicio is not None and (entrada.abertura is None or entrada.abertura < data_inicio):
+                return False
+            if data_fim is not None and (entrada.abertura is None or entrada.abertura > data_fim):
+                return False
+            return True
+
+        if len(grupos) > 1 or data_inicio is not None or data_fim is not None:
+            resultado = [entrada for entrada in candidatos if atende(entrada)]
+        else:
+            resultado = list(candidatos)
+
+        if sort:
+            decrescente = sort.startswith('-')
+            nome = sort.lstrip('-+')
+            chave = CAMPOS_ORDENACAO.get(nome)
+            if chave is None:
+                raise ValueError(f"Campo de ordenação inválido: {nome}")
+            if chave == 'dataAbertura':
+                def valor(entrada):
+                    return entrada.abertura
+            else:
+                def valor(entrada):
+                    return entrada.chaves[chave]
+            # Valores nulos sempre no final, independente da direção
+            preenchidos = [e for e in resultado if valor(e) is not None]
+            vazios = [e for e in resultado if valor(e) is None]
+            preenchidos.sort(key=valor, reverse=decrescente)
+            resultado = preenchidos + vazios
+
+        return [entrada.chamado for entrada in resultado]
+
+
+def paginar(itens, page, page_size):
+    """
+    Fatia uma lista já filtrada.
+
+    Returns:
+        dict: {'items', 'page', 'pageSize', 'total', 'totalPages'}
+    """
+    total = len(itens)
+    inicio = (page - 1) * page_size
+    return {
+        'items': itens[inicio:inicio + page_size],
+        'page': page,
+        'pageSize': page_size,
+        'total': total,
+        'totalPages': (total + page_size - 1) // page_size,
+    }
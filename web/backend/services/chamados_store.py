@@ -0,0 +1,343 @@
+"""
+Store versionado dos chamados (GET /chamados/changes?since=)
+
+Clientes que só querem saber o que mudou baixavam a lista inteira a cada
+consulta. O store guarda a última versão conhecida de cada chamado com o
+número da versão em que ela mudou e mantém os chamados ordenados por essa
+versão; responder "o que mudou desde N" percorre só o fim da ordem, em
+O(mudanças).
+
+As versões avançam quando:
+- uma lista nova chega da API do Azure (cache vencido ou invalidado) e é
+  comparada com o store: chamados novos ou diferentes recebem nova versão e
+  os que sumiram viram tombstones (removidos);
+- uma escrita passa pelo proxy (POST/PUT de chamados) e o chamado devolvido
+  pela API é registrado na hora.
+
+O store é um só para todos os usuários: ele assume que GET /api/Chamados
+devolve a mesma lista para qualquer chamador autenticado (hoje
+ChamadosController.GetChamados lista todos os chamados, sem filtro por
+usuário), então qualquer lista recebida serve para versioná-lo. Se a API
+passar a filtrar por usuário, o store precisa ser separado por escopo, como o
+ResponseCache. A suposição é verificada a cada sincronização: IDs removidos não
+voltam na API, então um chamado removido que reaparece (sinal de listas
+diferentes por chamador) é registrado como erro no log e contado em
+'reaparecidos'.
+
+As versões são baseadas nos milissegundos do relógio (sempre crescentes), então
+uma versão emitida antes de um restart fica abaixo da carga inicial do novo
+processo. Versões que o store não consegue atender com um delta (anteriores à
+carga inicial ou a tombstones já descartados, ou maiores que a atual, vindas
+de outro worker) recebem a lista completa.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+from services.cache import cached_get
+from services.chamados_index import ChamadosIndex
+from services.dto import CHAMADO_CHAVES
+
+logger = logging.getLogger(__name__)
+
+
+class _Registro:
+    __slots__ = ('versao', 'chamado', 'criacao', 'solicitante_id')
+
+    def __init__(self, versao, chamado, criacao, solicitante_id):
+        self.versao = versao
+        # None indica um chamado removido (tombstone)
+        self.chamado = chamado
+        # Versão em que o chamado apareceu (== versao: criado nesta mudança)
+        self.criacao = criacao
+        # Mantido nos tombstones, para filtrar eventos por solicitante
+        self.solicitante_id = solicitante_id
+
+
+class Mudanca:
+    """Um chamado criado, alterado ou removido em uma versão"""
+
+    __slots__ = ('versao', 'chamado_id', 'chamado', 'tipo', 'solicitante_id')
+
+    def __init__(self, chamado_id, registro):
+        self.versao = registro.versao
+        self.chamado_id = chamado_id
+        self.chamado = registro.chamado
+        self.solicitante_id = registro.solicitante_id
+        if registro.chamado is None:
+            self.tipo = 'removido'
+        elif registro.criacao == registro.versao:
+            self.tipo = 'criado'
+        else:
+            self.tipo = 'atualizado'
+
+
+class ChamadosVersionados:
+    """Chamados por ID com a versão da última mudança de cada um"""
+
+    def __init__(self, max_tombstones=10000, fracao_minima=0.1):
+        self.max_tombstones = max_tombstones
+        # Listas com menos que esta fração dos chamados atuais não são sincronizadas
+        self.fracao_minima = fracao_minima
+        self.sincronizacoes_ignoradas = 0
+        # Chamados removidos que voltaram em uma lista da API (não deveria acontecer; ver docstring)
+        self.reaparecidos = 0
+        # ID -> _Registro, em ordem crescente de versão
+        self._registros = OrderedDict()
+        self._tombstones = 0
+        self.versao = 0
+        # Versões menores não têm como ser atendidas com um delta
+        self.versao_minima = None
+        # Índice usado na última sincronização (evita comparar a mesma lista de novo)
+        self._origem = None
+        # Incrementada a cada registrar(); listas buscadas antes disso não são sincronizadas
+        self._geracao = 0
+        self._lock = threading.Lock()
+        self._ouvintes = []
+
+    @property
+    def carregado(self):
+        return self.versao_minima is not None
+
+    def _proxima_versao(self):
+        self.versao = max(self.versao + 1, int(time.time() * 1000))
+        return self.versao
+
+    def _gravar(self, chamado_id, chamado, versao, solicitante_id=None):
+        anterior = self._registros.pop(chamado_id, None)
+        criacao = versao
+        if anterior is not None:
+            if anterior.chamado is None:
+                self._tombstones -= 1
+            else:
+                criacao = anterior.criacao
+            if chamado is None:
+                solicitante_id = anterior.solicitante_id
+        if chamado is None:
+            self._tombstones += 1
+        self._registros[chamado_id] = _Registro(versao, chamado, criacao, solicitante_id)
+
+    def _descartar_tombstones(self):
+        """Remove os tombstones mais antigos acima do limite e sobe versao_minima"""
+        if self._tombstones <= self.max_tombstones:
+            return
+        for chamado_id, registro in list(self._registros.items()):
+            if self._tombstones <= self.max_tombstones:
+                break
+            if registro.chamado is None:
+                del self._registros[chamado_id]
+                self._tombstones -= 1
+                self.versao_minima = max(self.versao_minima, registro.versao)
+
+    def geracao(self):
+        return self._geracao
+
+    def sincronizar(self, index, geracao=None):
+        """
+        Compara a lista completa da API (já indexada) com o store e versiona as diferenças.
+
+        Args:
+            index (ChamadosIndex): Lista recebida da API, com os chamados por ID
+            geracao (int): Valor de geracao() antes da busca; se um chamado foi
+                registrado desde então, a lista pode não incluí-lo e é ignorada
+
+        Returns:
+            int: Quantidade de chamados criados, alterados ou removidos
+        """
+        with self._lock:
+            if index is self._origem or (geracao is not None and geracao != self._geracao):
+                return 0
+
+            por_id = index.por_id
+            atuais = len(self._registros) - self._tombstones
+            if self.carregado and atuais and len(por_id) < atuais * self.fracao_minima:
+                # Queda brusca (lista vazia ou quase): mais provável ser uma resposta
+                # incompleta da API do que todos os chamados removidos de uma vez
+                self.sincronizacoes_ignoradas += 1
+                logger.warning('Lista de chamados com %d itens (store com %d); sincronização ignorada',
+                               len(por_id), atuais)
+                return 0
+            self._origem = index
+
+            alterados = []
+            reaparecidos = 0
+            for chamado_id, entrada in por_id.items():
+                registro = self._registros.get(chamado_id)
+                if registro is None or registro.chamado != entrada.chamado:
+                    alterados.append((chamado_id, entrada.chamado, entrada.chaves['solicitanteId']))
+                    if registro is not None and registro.chamado is None:
+                        reaparecidos += 1
+            if reaparecidos:
+                self.reaparecidos += reaparecidos
+                logger.error('%d chamados removidos reapareceram na lista de GET /api/Chamados: o store de '
+                             'chamados assume a mesma lista para todos os usuários', reaparecidos)
+            removidos = [
+                chamado_id for chamado_id, registro in self._registros.items()
+                if registro.chamado is not None and chamado_id not in por_id
+            ]
+
+            if not self.carregado:
+                # Carga inicial: tudo entra com a mesma versão, abaixo dela só a lista completa
+                versao = self._proxima_versao()
+                for chamado_id, chamado, solicitante_id in alterados:
+                    self._gravar(chamado_id, chamado, versao, solicitante_id)
+                self.versao_minima = versao
+                return len(alterados)
+
+            for chamado_id, chamado, solicitante_id in alterados:
+                self._gravar(chamado_id, chamado, self._proxima_versao(), solicitante_id)
+            for chamado_id in removidos:
+                self._gravar(chamado_id, None, self._proxima_versao())
+            self._descartar_tombstones()
+            mudancas = len(alterados) + len(removidos)
+        if mudancas:
+            self._notificar()
+        return mudancas
+
+    def registrar(self, chamado):
+        """
+        Registra um chamado criado/alterado pelo proxy (resposta da API).
+
+        Returns:
+            int: Nova versão, ou None se o store ainda não foi carregado ou o chamado não tem ID
+        """
+        chaves = CHAMADO_CHAVES.normalizar(chamado) if isinstance(chamado, dict) else {}
+        chamado_id = chaves.get('id')
+        with self._lock:
+            if chamado_id is None or not self.carregado:
+                return None
+            self._geracao += 1
+            registro = self._registros.get(chamado_id)
+            if registro is not None and registro.chamado == chamado:
+                return registro.versao
+            versao = self._proxima_versao()
+            self._gravar(chamado_id, chamado, versao, chaves['solicitanteId'])
+        self._notificar()
+        return versao
+
+    def pode_atender(self, desde):
+        """True se as mudanças desde esta versão ainda estão no store"""
+        return self.carregado and self.versao_minima <= desde <= self.versao
+
+    def registros_desde(self, desde):
+        """
+        Mudanças com versão maior que desde, em ordem crescente de versão.
+
+        Quem chama deve verificar pode_atender(desde) antes.
+        """
+        with self._lock:
+            return self._registros_desde(desde)
+
+    def _registros_desde(self, desde):
+        saida = []
+        for chamado_id in reversed(self._registros):
+            registro = self._registros[chamado_id]
+            if registro.versao <= desde:
+                break
+            saida.append(Mudanca(chamado_id, registro))
+        saida.reverse()
+        return saida
+
+    def mudancas(self, desde=None):
+        """
+        Chamados criados/alterados e IDs removidos depois da versão desde.
+
+        Returns:
+            dict: {'versao', 'completo', 'chamados', 'removidos'}. Com completo=True
+                (desde ausente ou antigo demais), 'chamados' é a lista inteira e o
+                cliente deve substituir a cópia local.
+        """
+        with self._lock:
+            if desde is None or not self.pode_atender(desde):
+                return {
+                    'versao': self.versao,
+                    'completo': True,
+                    'chamados': [r.chamado for r in self._registros.values() if r.chamado is not None],
+                    'removidos': [],
+                }
+
+            mudancas = self._registros_desde(desde)
+            chamados = [m.chamado for m in mudancas if m.chamado is not None]
+            removidos = [m.chamado_id for m in mudancas if m.chamado is None]
+            return {'versao': self.versao, 'completo': False, 'chamados': chamados, 'removidos': removidos}
+
+    def adicionar_ouvinte(self, funcao):
+        """funcao() é chamada (fora do lock) sempre que a versão avança"""
+        with self._lock:
+            self._ouvintes.append(funcao)
+
+    def remover_ouvinte(self, funcao):
+        with self._lock:
+            if funcao in self._ouvintes:
+                self._ouvintes.remove(funcao)
+
+    def _notificar(self):
+        with self._lock:
+            ouvintes = list(self._ouvintes)
+        for funcao in ouvintes:
+            funcao()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'versao': self.versao,
+                'chamados': len(self._registros) - self._tombstones,
+                'tombstones': self._tombstones,
+                'sincronizacoesIgnoradas': self.sincronizacoes_ignoradas,
+                'reaparecidos': self.reaparecidos,
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def init_app(app):
+    global _store
+    with _store_lock:
+        _store = ChamadosVersionados(
+            max_tombstones=app.config.get('CHAMADOS_MAX_TOMBSTONES', 10000),
+            fracao_minima=app.config.get('CHAMADOS_SYNC_MIN_FRACAO', 0.1),
+        )
+    app.extensions['chamados_store'] = _store
+    return _store
+
+
+def buscar_chamados():
+    """
+    GET /api/Chamados pelo cache (lido em streaming e indexado) e sincroniza o store.
+
+    A lista de qualquer chamador sincroniza o store global (ver a docstring do
+    módulo: a lista da API é a mesma para todos os usuários).
+
+    Precisa de um contexto de requisição com o header Authorization do chamador.
+
+    Returns:
+        UpstreamResult: Com o ChamadosIndex em .data quando status_code == 200
+
+    Raises:
+        requests.exceptions.RequestException: Em falhas de rede sem resposta em cache
+    """
+    store = get_store()
+    geracao = store.geracao()
+    result = cached_get('chamados', '/api/Chamados', transform=ChamadosIndex, stream=True)
+    # Lista nova da API: versiona o que mudou para GET /chamados/changes
+    # (só listas lidas por inteiro: corpo inválido vira 502 em UpstreamResult.from_stream)
+    if result.status_code == 200 and not result.stale and isinstance(result.data, ChamadosIndex):
+        store.sincronizar(result.data, geracao=geracao)
+    return result
+
+
+def get_store():
+    """Retorna o store compartilhado (criado com Config se init_app não foi chamado)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ChamadosVersionados(
+                    max_tombstones=Config.CHAMADOS_MAX_TOMBSTONES,
+                    fracao_minima=Config.CHAMADOS_SYNC_MIN_FRACAO,
+                )
+    return _store
@@ -0,0 +1,98 @@
+"""
+Circuit breaker por endpoint da API externa (Azure)
+
+Depois de uma sequência de falhas (erro de rede, timeout ou 5xx) o circuito
+do endpoint abre e as chamadas seguintes falham na hora, sem ocupar uma
+thread esperando o timeout. Passado o tempo de espera, uma única chamada de
+teste é liberada (half-open): se der certo o circuito fecha, se falhar abre
+de novo.
+"""
+import re
+import threading
+import time
+
+import requests
+
+
+FECHADO = 'closed'
+ABERTO = 'open'
+SEMIABERTO = 'half_open'
+
+_SEGMENTO_NUMERICO = re.compile(r'/\d+(?=/|$)')
+
+
+def endpoint_key(method, path):
+    """Agrupa caminhos com IDs: ('GET', '/api/Chamados/12') -> 'GET /api/Chamados/{id}'"""
+    path = path.split('?', 1)[0]
+    return f"{method.upper()} {_SEGMENTO_NUMERICO.sub('/{id}', path)}"
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Chamada recusada localmente porque o circuito do endpoint está aberto"""
+
+
+class CircuitBreaker:
+    """Estado do circuito de um endpoint (closed/open/half-open)"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.estado = FECHADO
+        self.falhas = 0
+        self.aberto_em = 0.0
+        self.teste_em_andamento = False
+        self.rejeitadas = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Indica se a chamada pode seguir para a API"""
+        with self._lock:
+            if self.estado == FECHADO:
+                return True
+            if self.estado == ABERTO and time.monotonic() - self.aberto_em >= self.reset_timeout:
+                self.estado = SEMIABERTO
+                self.teste_em_andamento = False
+            if self.estado == SEMIABERTO and not self.teste_em_andamento:
+                self.teste_em_andamento = True
+                return True
+            self.rejeitadas += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.estado = FECHADO
+            self.falhas = 0
+            self.teste_em_andamento = False
+
+    def record_failure(self):
+        with self._lock:
+            self.falhas += 1
+            if self.estado == SEMIABERTO or self.falhas >= self.failure_threshold:
+                self.estado = ABERTO
+                self.aberto_em = time.monotonic()
+            self.teste_em_andamento = False
+
+
+class CircuitBreakerRegistry:
+    """Um CircuitBreaker por endpoint, criado sob demanda"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint):
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    endpoint, CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                )
+        return breaker
+
+    def stats(self):
+        return {
+            endpoint: {'state': b.estado, 'failures': b.falhas, 'rejected': b.rejeitadas}
+            for endpoint, b in list(self._breakers.items())
+        }
@@ -0,0 +1,221 @@
+"""
+Normalização dos DTOs trocados com a API do Azure
+
+A API .NET pode devolver as propriedades em camelCase ou PascalCase, e o
+front-end usa camelCase. Em vez de cada rota repetir
+usuario.get('nome') or usuario.get('Nome') para cada campo, cada entidade
+declara aqui seus campos canônicos e valores padrão.
+
+Para cada formato de registro (as chaves recebidas) é montado um plano: o
+campo canônico -> chave de origem, resolvido uma vez a partir das variantes
+de nome declaradas. Em uma lista da API todos os itens têm as mesmas chaves,
+então o plano do primeiro item vale para a lista inteira e normalizar cada
+registro custa um acesso por campo, sem testar variantes (nome/Nome) a cada
+registro. Os planos não são guardados entre chamadas: valem só para a lista
+(ou o registro) em que foram montados.
+"""
+from operator import itemgetter
+
+
+def pascal(nome):
+    return nome[0].upper() + nome[1:]
+
+
+class _Plano:
+    """
+    Conversão de um formato de registro para os campos canônicos.
+
+    chaves: chave de origem de cada campo canônico presente
+    nomes: campo canônico correspondente
+    """
+
+    __slots__ = ('chaves', 'nomes', 'padroes', '_ler')
+
+    def __init__(self, origem, padroes):
+        self.nomes = tuple(origem)
+        self.chaves = tuple(origem.values())
+        self.padroes = padroes
+        if len(self.chaves) > 1:
+            self._ler = itemgetter(*self.chaves)
+        elif self.chaves:
+            # itemgetter de uma chave só devolve o valor, não uma tupla
+            chave = self.chaves[0]
+            self._ler = lambda item: (item[chave],)
+        else:
+            self._ler = lambda item: ()
+
+    def converter(self, item):
+        """Dict canônico: valores nulos e campos ausentes recebem o padrão"""
+        # A cópia dos padrões mantém a ordem dos campos; só os valores lidos não nulos a substituem
+        saida = self.padroes.copy()
+        saida.update({campo: valor for campo, valor in zip(self.nomes, self._ler(item)) if valor is not None})
+        return saida
+
+
+class Entidade:
+    """
+    Campos canônicos (camelCase) de uma entidade e seus valores padrão.
+
+    Args:
+        campos (dict): campo canônico -> valor padrão, na ordem da saída
+        apelidos (dict): nome alternativo aceito na entrada -> campo canônico
+    """
+
+    def __init__(self, campos, apelidos=None):
+        self.campos = dict(campos)
+        self.apelidos = dict(apelidos or {})
+        # Prioridade quando o mesmo campo vem em mais de uma forma: camelCase, apelido, PascalCase
+        self._variantes = {}
+        for canonico in self.campos:
+            self._variantes[pascal(canonico)] = (canonico, 2)
+        for apelido, canonico in self.apelidos.items():
+            self._variantes[apelido] = (canonico, 1)
+        for canonico in self.campos:
+            self._variantes[canonico] = (canonico, 0)
+
+    def com_campos(self, *nomes):
+        """Nova entidade só com alguns campos (mesmos padrões e apelidos)"""
+        return Entidade(
+            {nome: self.campos[nome] for nome in nomes},
+            {a: c for a, c in self.apelidos.items() if c in nomes},
+        )
+
+    def _plano(self, chaves):
+        """Plano para um formato de registro (a variante de maior prioridade de cada campo)"""
+        escolhidas = {}
+        for chave in chaves:
+            variante = self._variantes.get(chave)
+            if variante is None:
+                continue
+            canonico, prioridade = variante
+            atual = escolhidas.get(canonico)
+            if atual is None or prioridade < atual[1]:
+                escolhidas[canonico] = (chave, prioridade)
+        origem = {c: escolhidas[c][0] for c in self.campos if c in escolhidas}
+        return _Plano(origem, self.campos)
+
+    def normalizar(self, item):
+        """
+        Converte um registro para os campos canônicos.
+
+        Campos ausentes ou nulos recebem o valor padrão; chaves que não
+        pertencem à entidade são descartadas.
+        """
+        if not item:
+            return self.campos.copy()
+        return self._plano(tuple(item)).converter(item)
+
+    def normalizar_lista(self, itens):
+        """
+        Normaliza uma lista em uma passada (itens que não são dict são ignorados).
+
+        Numa lista da API todos os itens têm o mesmo formato: o plano do
+        primeiro item é aplicado a todos. Se algum item não tiver as chaves
+        desse plano, a lista é refeita buscando o plano de cada item.
+        """
+        if not isinstance(itens, (list, tuple)):
+            itens = list(itens or ())
+        primeiro = next((item for item in itens if isinstance(item, dict) and item), None)
+        if primeiro is not None:
+            converter = self._plano(tuple(primeiro)).converter
+            try:
+                return [converter(item) for item in itens]
+            except (KeyError, TypeError):
+                pass
+        normalizar = self.normalizar
+        return [normalizar(item) for item in itens if isinstance(item, dict)]
+
+    def para_api(self, dados, vazios_permitidos=()):
+        """
+        Monta o corpo para a API .NET (PascalCase) a partir de dados em qualquer formato.
+
+        Campos nulos ou com string vazia são omitidos, exceto os listados em
+        vazios_permitidos (ex: 'telefone', para apagar o valor).
+        """
+        saida = {}
+        if not dados:
+            return saida
+        plano = self._plano(tuple(dados))
+        for canonico, chave in zip(plano.nomes, plano.chaves):
+            valor = dados[chave]
+            if valor is None:
+                continue
+            if valor == '' and canonico not in vazios_permitidos:
+                continue
+            saida[pascal(canonico)] = valor
+        return saida
+
+
+# ----------------------------------------------------
+# Entidades da API (api/ApiParaBD)
+# ----------------------------------------------------
+
+# Usuario (sem SenhaHash)
+USUARIO = Entidade({
+    'id': None,
+    'nome': '',
+    'email': '',
+    'telefone': '',
+    'cargo': '',
+    'permissao': None,
+    'primeiroAcesso': False,
+})
+
+# Formato usado nas listagens, na consulta por ID e no login
+USUARIO_RESUMO = USUARIO.com_campos('id', 'nome', 'email', 'telefone', 'cargo', 'permissao')
+
+# CriarUsuarioDto
+USUARIO_CADASTRO = Entidade({
+    'nome': None,
+    'email': None,
+    'senha': None,
+    'telefone': None,
+    'cargo': None,
+    'permissao': None,
+})
+
+# AtualizarUsuarioAdminDto
+USUARIO_ATUALIZACAO_ADMIN = Entidade({
+    'nome': None,
+    'email': None,
+    'telefone': None,
+    'cargo': None,
+    'permissao': None,
+    'novaSenha': None,
+})
+
+# AtualizarUsuarioDto (meu perfil)
+USUARIO_ATUALIZACAO = USUARIO_ATUALIZACAO_ADMIN.com_campos('nome', 'email', 'telefone', 'cargo')
+
+# LoginResponseDto
+LOGIN_RESPOSTA = Entidade({'token': None, 'primeiroAcesso': False})
+
+# CriarChamadoDto
+CHAMADO_CRIACAO = Entidade(
+    {'tipo': None, 'titulo': None, 'descricao': None, 'solicitanteId': None, 'prioridade': None},
+    apelidos={'tipoChamado': 'tipo', 'solicitante_id': 'solicitanteId'},
+)
+
+# AtualizarChamadoDto
+CHAMADO_ATUALIZACAO = Entidade({
+    'status': None,
+    'tecnicoResponsavelId': None,
+    'dataFechamento': None,
+    'titulo': None,
+    'descricao': None,
+    'solucao': None,
+    'prioridade': None,
+})
+
+# Campos do Chamado usados para filtros e ordenação (ChamadosIndex)
+CHAMADO_CHAVES = Entidade({
+    'id': None,
+    'titulo': None,
+    'status': None,
+    'prioridade': None,
+    'tipo': None,
+    'dataAbertura': None,
+    'dataFechamento': None,
+    'solicitanteId': None,
+    'tecnicoResponsavelId': None,
+})
@@ -0,0 +1,380 @@
+"""
+Canal de eventos dos chamados (Server-Sent Events em GET /events/chamados)
+
+Cada mudança do store versionado (services/chamados_store.py) vira um evento
+SSE serializado uma única vez e guardado em um buffer circular compartilhado.
+Os assinantes não têm fila própria: esperam em uma Condition comum e, ao
+acordar, leem do fim do buffer só os eventos posteriores ao último que
+enviaram, filtrando pelo escopo (colaboradores só recebem os próprios
+chamados).
+
+Com o servidor gevent (serve.py), cada conexão aberta é um greenlet parado
+em Condition.wait(), sem thread por cliente. No servidor de desenvolvimento
+do Flask cada assinante ocupa uma thread.
+
+Enquanto houver assinantes, uma tarefa em segundo plano busca a lista da API
+do Azure a cada EVENTS_REFRESH_INTERVAL segundos (respeitando o cache), para
+que mudanças feitas direto na API também gerem eventos.
+
+O EventSource do navegador não envia headers, e o JWT não pode ir na query
+string (ela aparece nos logs de acesso). O cliente troca o token por um
+bilhete (POST /events/chamados/bilhete, com o header Authorization) e abre o
+stream com ?bilhete=: o bilhete vale uma única vez, por EVENTS_TICKET_TTL
+segundos. Os bilhetes ficam em um arquivo SQLite (EVENTS_TICKETS_PATH) para
+que o POST e o GET possam cair em workers diferentes do gunicorn.
+"""
+import hashlib
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from services import json_codec
+from services.chamados_store import buscar_chamados
+
+logger = logging.getLogger(__name__)
+
+# Permissões que veem todos os chamados (SuporteTecnico, Administrador)
+PERMISSOES_TODOS = (2, 3)
+
+
+def formatar_evento(evento, dados, evento_id=None):
+    """Evento SSE em bytes ('id', 'event' e 'data' em JSON)"""
+    linhas = []
+    if evento_id is not None:
+        linhas.append(f'id: {evento_id}')
+    linhas.append(f'event: {evento}')
+    texto = '\n'.join(linhas) + '\ndata: '
+    return texto.encode('utf-8') + json_codec.dumps_bytes(dados) + b'\n\n'
+
+
+class _Evento:
+    __slots__ = ('versao', 'solicitante_id', 'corpo', 'publico')
+
+    def __init__(self, versao, solicitante_id, corpo, publico=False):
+        self.versao = versao
+        self.solicitante_id = solicitante_id
+        self.corpo = corpo
+        # Eventos de controle (reset) vão para todos; os de chamado passam por Assinante.pode_ver
+        self.publico = publico
+
+
+class Assinante:
+    """Conexão SSE aberta"""
+
+    __slots__ = ('usuario_id', 'permissao', 'authorization', 'expira_em')
+
+    def __init__(self, usuario_id, permissao, authorization=None, expira_em=None):
+        self.usuario_id = usuario_id
+        self.permissao = permissao
+        # Usado pela atualização em segundo plano para buscar a lista na API
+        self.authorization = authorization
+        # 'exp' do token (epoch); a conexão é encerrada quando ele vence
+        self.expira_em = expira_em
+
+    def pode_ver(self, evento):
+        """Chamados sem solicitante conhecido só são vistos por suporte e administradores"""
+        if self.permissao in PERMISSOES_TODOS:
+            return True
+        return evento.solicitante_id is not None and evento.solicitante_id == self.usuario_id
+
+
+class CanalChamados:
+    """Fan-out das mudanças do store para os assinantes SSE"""
+
+    def __init__(self, store, max_eventos=1000, max_assinantes=5000, keepalive=15):
+        self.store = store
+        self.max_assinantes = max_assinantes
+        self.keepalive = keepalive
+        self._eventos = deque(maxlen=max_eventos)
+        # Última versão do store já convertida em eventos
+        self._versao = None
+        self._cond = threading.Condition()
+        self._assinantes = set()
+        self.publicados = 0
+        store.adicionar_ouvinte(self.publicar)
+
+    @property
+    def total_assinantes(self):
+        return len(self._assinantes)
+
+    def assinantes(self):
+        with self._cond:
+            return list(self._assinantes)
+
+    def publicar(self):
+        """Converte as mudanças novas do store em eventos e acorda os assinantes"""
+        store = self.store
+        with self._cond:
+            if self._versao is None:
+                # Primeira mudança depois da carga inicial: a carga não gera eventos
+                self._versao = store.versao_minima
+            if self._versao is None:
+                return
+            if not store.pode_atender(self._versao):
+                # Mudanças descartadas antes de virarem eventos: clientes devem recarregar
+                self._versao = store.versao
+                self._eventos.append(_Evento(self._versao, None, formatar_evento(
+                    'reset', {'versao': self._versao}, self._versao), publico=True))
+            else:
+                for mudanca in store.registros_desde(self._versao):
+                    corpo = formatar_evento('chamado', {
+                        'tipo': mudanca.tipo,
+                        'versao': mudanca.versao,
+                        'id': mudanca.chamado_id,
+                        'chamado': mudanca.chamado,
+                    }, mudanca.versao)
+                    self._eventos.append(_Evento(mudanca.versao, mudanca.solicitante_id, corpo))
+                    self._versao = mudanca.versao
+                    self.publicados += 1
+            self._cond.notify_all()
+
+    def _pendentes(self, desde):
+        """Eventos com versão maior que desde (lidos do fim do buffer); chamar com o lock"""
+        novos = []
+        for evento in reversed(self._eventos):
+            if evento.versao <= desde:
+                break
+            novos.append(evento)
+        novos.reverse()
+        return novos
+
+    def _versao_inicial(self, ultimo_id):
+        """
+        Versão a partir da qual o assinante recebe eventos.
+
+        Returns:
+            tuple: (versao, precisa_reset); reset quando Last-Event-ID é mais antigo que o buffer
+        """
+        atual = self._versao if self._versao is not None else (self.store.versao_minima or 0)
+        if ultimo_id is None or ultimo_id >= atual:
+            return atual, False
+        if self._eventos and ultimo_id >= self._eventos[0].versao - 1:
+            return ultimo_id, False
+        if not self._eventos and self.store.versao_minima is not None and ultimo_id >= self.store.versao_minima:
+            return ultimo_id, False
+        return atual, True
+
+    def assinar(self, assinante, ultimo_id=None):
+        """
+        Gerador com os bytes da resposta SSE de um assinante.
+
+        O assinante só entra no canal quando o gerador começa a ser consumido,
+        e sai no finally do mesmo gerador: uma resposta que nunca chega a ser
+        enviada não ocupa vaga.
+
+        Raises:
+            OverflowError: Se o limite de assinantes foi atingido
+        """
+        with self._cond:
+            if len(self._assinantes) >= self.max_assinantes:
+                raise OverflowError('Limite de conexões de eventos atingido')
+            versao, reset = self._versao_inicial(ultimo_id)
+        return self._transmitir(assinante, versao, reset)
+
+    def _transmitir(self, assinante, versao, reset):
+        try:
+            with self._cond:
+                # As vagas podem ter acabado entre assinar() e o início do stream
+                lotado = len(self._assinantes) >= self.max_assinantes
+                if not lotado:
+                    self._assinantes.add(assinante)
+            # Intervalo de reconexão sugerido ao EventSource (ms)
+            yield b'retry: 5000\n\n'
+            if lotado:
+                return
+            if reset:
+                yield formatar_evento('reset', {'versao': versao}, versao)
+            while True:
+                if assinante.expira_em is not None and time.time() >= assinante.expira_em:
+                    yield formatar_evento('expirado', {'message': 'Token expirado; reconecte após o login.'})
+                    return
+                with self._cond:
+                    pendentes = self._pendentes(versao)
+                    if not pendentes:
+                        self._cond.wait(self.keepalive)
+                        pendentes = self._pendentes(versao)
+                if not pendentes:
+                    # Comentário SSE: mantém proxies/conexão abertos e detecta clientes que saíram
+                    yield b': keepalive\n\n'
+                    continue
+                versao = pendentes[-1].versao
+                for evento in pendentes:
+                    if evento.publico or assinante.pode_ver(evento):
+                        yield evento.corpo
+        finally:
+            with self._cond:
+                self._assinantes.discard(assinante)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'assinantes': len(self._assinantes),
+                'eventos': len(self._eventos),
+                'publicados': self.publicados,
+            }
+
+
+class AtualizadorChamados:
+    """
+    Busca a lista de chamados na API periodicamente enquanto houver assinantes.
+
+    Usa o token de um dos assinantes conectados (qualquer usuário autenticado
+    recebe a lista completa da API) dentro de um contexto de requisição, para
+    passar pelo cache, pela coalescência e pelo circuit breaker normais.
+    """
+
+    def __init__(self, app, canal, intervalo=15):
+        self.app = app
+        self.canal = canal
+        self.intervalo = intervalo
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def garantir(self):
+        """Inicia a tarefa se ainda não estiver rodando"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._executar, name='atualizador-chamados', daemon=True)
+            self._thread.start()
+
+    def _executar(self):
+        while True:
+            time.sleep(self.intervalo)
+            assinantes = [a for a in self.canal.assinantes() if a.authorization]
+            if not assinantes:
+                with self._lock:
+                    self._thread = None
+                return
+            self.atualizar(assinantes[-1].authorization)
+
+    def atualizar(self, authorization):
+        try:
+            with self.app.test_request_context('/events/chamados', headers={'Authorization': authorization}):
+                result = buscar_chamados()
+            if result.status_code != 200:
+                logger.warning('Atualização dos chamados para os eventos: HTTP %s', result.status_code)
+        except Exception as e:
+            logger.warning('Falha ao atualizar chamados para os eventos: %s', e)
+
+
+_ESQUEMA_BILHETES = """
+CREATE TABLE IF NOT EXISTS bilhetes_eventos (
+    hash TEXT PRIMARY KEY,
+    authorization TEXT NOT NULL,
+    expira_em REAL NOT NULL
+);
+"""
+
+
+class BilhetesEventos:
+    """Bilhetes de uso único que substituem o token em GET /events/chamados"""
+
+    def __init__(self, caminho, ttl=30):
+        self.caminho = caminho
+        self.ttl = ttl
+        self._conexao = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _conectar(self):
+        """Conexão do processo atual (reaberta após fork dos workers); chamar com o lock"""
+        if self._conexao is None or self._pid != os.getpid():
+            conexao = sqlite3.connect(self.caminho, timeout=5, check_same_thread=False, isolation_level=None)
+            if self.caminho != ':memory:':
+                conexao.execute('PRAGMA journal_mode=WAL')
+            # O token não fica no arquivo depois que o bilhete é usado ou descartado
+            conexao.execute('PRAGMA secure_delete=ON')
+            conexao.executescript(_ESQUEMA_BILHETES)
+            self._conexao, self._pid = conexao, os.getpid()
+        return self._conexao
+
+    @staticmethod
+    def _hash(bilhete):
+        # Só o hash vai para o banco: ler o arquivo não dá bilhetes válidos
+        return hashlib.sha256(bilhete.encode('utf-8')).hexdigest()
+
+    def emitir(self, authorization):
+        """
+        Bilhete novo para o header Authorization já validado.
+
+        Returns:
+            str: Bilhete (texto aleatório, seguro em URL)
+
+        Raises:
+            sqlite3.Error: Se o banco falhar
+        """
+        bilhete = secrets.token_urlsafe(32)
+        agora = time.time()
+        with self._lock:
+            db = self._conectar()
+            with db:
+                db.execute('BEGIN IMMEDIATE')
+                db.execute('DELETE FROM bilhetes_eventos WHERE expira_em <= ?', (agora,))
+                db.execute('INSERT INTO bilhetes_eventos (hash, authorization, expira_em) VALUES (?, ?, ?)',
+                           (self._hash(bilhete), authorization, agora + self.ttl))
+        return bilhete
+
+    def resgatar(self, bilhete):
+        """Authorization do bilhete, que deixa de valer; None se inválido, vencido ou já usado"""
+        chave = self._hash(bilhete)
+        try:
+            with self._lock:
+                db = self._conectar()
+                with db:
+                    db.execute('BEGIN IMMEDIATE')
+                    linha = db.execute('SELECT authorization, expira_em FROM bilhetes_eventos WHERE hash = ?',
+                                       (chave,)).fetchone()
+                    if linha is not None:
+                        db.execute('DELETE FROM bilhetes_eventos WHERE hash = ?', (chave,))
+        except sqlite3.Error as e:
+            logger.warning('Falha ao consultar o bilhete de eventos: %s', e)
+            return None
+        if linha is None or linha[1] <= time.time():
+            return None
+        return linha[0]
+
+
+_canal = None
+_atualizador = None
+_bilhetes = None
+
+
+def _caminho_bilhetes(caminho):
+    """EVENTS_TICKETS_PATH; vazio usa web/backend/eventos_bilhetes.sqlite3"""
+    backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    return caminho or os.path.join(backend_dir, 'eventos_bilhetes.sqlite3')
+
+
+def init_app(app, store):
+    """Cria o canal sobre o store de chamados (ChamadosVersionados)"""
+    global _canal, _atualizador, _bilhetes
+    _canal = CanalChamados(
+        store,
+        max_eventos=app.config.get('EVENTS_BUFFER_SIZE', 1000),
+        max_assinantes=app.config.get('EVENTS_MAX_CLIENTS', 5000),
+        keepalive=app.config.get('EVENTS_KEEPALIVE', 15),
+    )
+    _atualizador = AtualizadorChamados(app, _canal, intervalo=app.config.get('EVENTS_REFRESH_INTERVAL', 15))
+    _bilhetes = BilhetesEventos(
+        _caminho_bilhetes(app.config.get('EVENTS_TICKETS_PATH')),
+        ttl=app.config.get('EVENTS_TICKET_TTL', 30),
+    )
+    app.extensions['eventos_chamados'] = _canal
+    return _canal
+
+
+def get_canal():
+    return _canal
+
+
+def get_atualizador():
+    return _atualizador
+
+
+def get_bilhetes():
+    return _bilhetes
@@ -0,0 +1,103 @@
+"""
+Codec JSON do backend: orjson quando instalado, json da biblioteca padrão como alternativa
+
+Usado pelo Flask (jsonify, request.get_json) através de FastJSONProvider e
+pelo cliente da API do Azure para ler as respostas. Listas grandes de
+chamados e usuários passam a maior parte do tempo de CPU aqui.
+
+JSON_CODEC em config.py escolhe o codec: 'auto' (orjson se disponível),
+'orjson' ou 'stdlib'.
+"""
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Opcional: sem o pacote, usa a biblioteca padrão
+    orjson = None
+
+
+_usar_orjson = orjson is not None
+
+
+def configurar(codec='auto'):
+    """Seleciona o codec ('auto', 'orjson' ou 'stdlib')"""
+    global _usar_orjson
+    _usar_orjson = orjson is not None and codec != 'stdlib'
+    return nome()
+
+
+def nome():
+    return 'orjson' if _usar_orjson else 'stdlib'
+
+
+def loads(dados):
+    """Converte bytes ou str em objetos Python (ValueError se inválido)"""
+    if _usar_orjson:
+        return orjson.loads(dados)
+    return json.loads(dados)
+
+
+def dumps_bytes(obj, default=None, sort_keys=False, indent=None):
+    """Serializa obj para JSON em UTF-8"""
+    if _usar_orjson:
+        opcoes = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        if indent:
+            opcoes |= orjson.OPT_INDENT_2
+        if default is not None:
+            # Datas seguem a conversão do default (ex: http_date no Flask), como no json padrão
+            opcoes |= orjson.OPT_PASSTHROUGH_DATETIME
+        try:
+            return orjson.dumps(obj, default=default, option=opcoes)
+        except TypeError:
+            # Ex: inteiros acima de 64 bits; a biblioteca padrão aceita
+            pass
+    separadores = None if indent else (',', ':')
+    return json.dumps(obj, default=default, sort_keys=sort_keys, indent=indent,
+                      separators=separadores, ensure_ascii=False).encode('utf-8')
+
+
+def dumps(obj, **kwargs):
+    return dumps_bytes(obj, **kwargs).decode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Provider JSON do Flask usando o codec configurado.
+
+    Mantém o comportamento do DefaultJSONProvider (chaves ordenadas,
+    indentação em modo debug, conversão de datas/Decimal/UUID), mas gera os
+    bytes da resposta diretamente, sem passar por str.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.keys() - {'sort_keys', 'indent', 'default'}:
+            return super().dumps(obj, **kwargs)
+        return dumps(
+            obj,
+            default=kwargs.get('default', self.default),
+            sort_keys=kwargs.get('sort_keys', self.sort_keys),
+            indent=kwargs.get('indent'),
+        )
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        corpo = dumps_bytes(obj, default=self.default, sort_keys=self.sort_keys, indent=indent)
+        return self._app.response_class(corpo + b'\n', mimetype=self.mimetype)
+
+
+def init_app(app):
+    """Seleciona o codec a partir de JSON_CODEC e instala o provider no app"""
+    configurar(app.config.get('JSON_CODEC', 'auto'))
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+    return nome()
@@ -0,0 +1,117 @@
+"""
+Leitura e escrita incremental de arrays JSON
+
+- iter_array(): lê um array JSON a partir dos blocos de bytes da resposta da
+  API do Azure, devolvendo um elemento por vez, sem montar o texto completo
+  da resposta em memória.
+- iter_array_json(): serializa uma sequência de itens como um array JSON em
+  blocos, para respostas em streaming (chunked) do Flask.
+"""
+import codecs
+import json
+
+from services import json_codec
+
+_decoder = json.JSONDecoder()
+
+ESPACOS = ' \t\n\r'
+CONTINUACAO_NUMERO = frozenset('0123456789.eE+-')
+
+
+def iter_array(chunks):
+    """
+    Gera os elementos de um array JSON recebido em blocos de bytes.
+
+    Raises:
+        ValueError: Se o conteúdo não for um array JSON válido
+    """
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    inicio = True     # Ainda não leu o '['
+    esperando = True  # Próximo token é um elemento (ou ']'), não uma vírgula
+    fim = False
+
+    def mais():
+        nonlocal buffer, pos
+        for chunk in chunks:
+            texto = utf8.decode(chunk)
+            if texto:
+                buffer = buffer[pos:] + texto
+                pos = 0
+                return True
+        resto = utf8.decode(b'', final=True)
+        if resto:
+            buffer = buffer[pos:] + resto
+            pos = 0
+            return True
+        return False
+
+    chunks = iter(chunks)
+    while not fim:
+        # Pula espaços
+        while pos < len(buffer) and buffer[pos] in ESPACOS:
+            pos += 1
+        if pos >= len(buffer):
+            if not mais():
+                raise ValueError('JSON incompleto: array não foi fechado')
+            continue
+
+        caractere = buffer[pos]
+        if inicio:
+            if caractere != '[':
+                raise ValueError('Esperado um array JSON')
+            inicio = False
+            pos += 1
+        elif caractere == ']':
+            fim = True
+            pos += 1
+        elif not esperando:
+            if caractere != ',':
+                raise ValueError(f"Esperado ',' ou ']' na posição {pos}")
+            esperando = True
+            pos += 1
+        else:
+            try:
+                elemento, novo_pos = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Elemento cortado no fim do bloco: lê mais e tenta de novo
+                if not mais():
+                    raise
+                continue
+            # Um número no fim do buffer pode continuar no próximo bloco ('1.' + '5e3')
+            if (isinstance(elemento, (int, float)) and not isinstance(elemento, bool)
+                    and len(buffer) - novo_pos < 32
+                    and all(c in CONTINUACAO_NUMERO for c in buffer[novo_pos:]) and mais()):
+                continue
+            pos = novo_pos
+            esperando = False
+            yield elemento
+
+    for resto in chunks:
+        if resto.strip():
+            raise ValueError('Conteúdo após o fim do array JSON')
+
+
+def iter_array_json(itens, dumps=None, itens_por_bloco=200):
+    """
+    Serializa itens como um array JSON, em blocos de bytes.
+
+    Cada bloco contém até itens_por_bloco elementos, então a memória usada
+    não depende do tamanho da lista. dumps deve devolver bytes.
+    """
+    dumps = dumps or json_codec.dumps_bytes
+    yield b'['
+    bloco = []
+    primeiro = True
+    for item in itens:
+        bloco.append(dumps(item))
+        if len(bloco) >= itens_por_bloco:
+            dados = b','.join(bloco)
+            yield dados if primeiro else b',' + dados
+            primeiro = False
+            bloco = []
+    if bloco:
+        dados = b','.join(bloco)
+        yield dados if primeiro else b',' + dados
+    yield b']'
@@ -0,0 +1,85 @@
+"""
+Logging do backend (substitui os print() das rotas)
+
+- Nível definido por Config.LOG_LEVEL: em produção, mensagens de DEBUG nem
+  chegam a ser formatadas (os módulos usam logger.debug('... %s', valor)).
+- As rotas só colocam o registro em uma fila; a escrita em stdout acontece
+  em uma thread separada (QueueHandler/QueueListener).
+- Cada requisição recebe um ID (header X-Request-ID, gerado se ausente) que
+  aparece em todas as linhas de log e é devolvido na resposta.
+- Payloads completos (respostas da API, dados normalizados) só são logados
+  em DEBUG e por amostragem (LOG_PAYLOAD_SAMPLE_RATE).
+"""
+import atexit
+import logging
+import queue
+import random
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, request, has_request_context
+
+
+FORMATO = '%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s'
+
+_listener = None
+_sample_rate = 0.0
+
+
+class RequestIdFilter(logging.Filter):
+    """Adiciona request_id a cada registro ('-' fora de uma requisição)"""
+
+    def filter(self, record):
+        record.request_id = getattr(g, 'request_id', '-') if has_request_context() else '-'
+        return True
+
+
+def init_app(app):
+    """Configura o logging a partir de LOG_LEVEL e registra o ID de requisição"""
+    global _listener, _sample_rate
+
+    nivel = logging.getLevelName(str(app.config.get('LOG_LEVEL', 'INFO')).upper())
+    if not isinstance(nivel, int):
+        nivel = logging.INFO
+    _sample_rate = float(app.config.get('LOG_PAYLOAD_SAMPLE_RATE', 0.0))
+
+    if _listener is None:
+        saida = logging.StreamHandler()
+        saida.setFormatter(logging.Formatter(FORMATO))
+
+        fila = queue.SimpleQueue()
+        handler = QueueHandler(fila)
+        # O filtro roda na thread da requisição, onde o contexto do Flask existe
+        handler.addFilter(RequestIdFilter())
+
+        raiz = logging.getLogger()
+        raiz.handlers = [handler]
+
+        _listener = QueueListener(fila, saida, respect_handler_level=False)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+    logging.getLogger().setLevel(nivel)
+    # O log de acesso do servidor de desenvolvimento segue o mesmo nível
+    logging.getLogger('werkzeug').setLevel(max(nivel, logging.INFO))
+
+    @app.before_request
+    def _atribuir_request_id():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+
+    @app.after_request
+    def _devolver_request_id(response):
+        request_id = getattr(g, 'request_id', None)
+        if request_id:
+            response.headers['X-Request-ID'] = request_id
+        return response
+
+
+def log_payload(logger, mensagem, *args):
+    """
+    Loga um payload completo em DEBUG, apenas para uma amostra das requisições.
+
+    Os argumentos só são formatados se o registro for realmente emitido.
+    """
+    if _sample_rate > 0 and logger.isEnabledFor(logging.DEBUG) and random.random() < _sample_rate:
+        logger.debug(mensagem, *args)
@@ -0,0 +1,170 @@
+"""
+Operações em lote sobre a API do Azure (POST .../batch, PUT /chamados/bulk)
+
+As telas de detalhe e de atividade faziam um GET por ID. Aqui cada ID é
+procurado primeiro no cache local (a entrada do GET individual ou, para
+chamados, a lista já indexada em cache) e só os que faltam são buscados na
+API do Azure, em paralelo, pelo mesmo cached_get das rotas individuais: as
+respostas entram no cache por ID e chamadas simultâneas iguais continuam
+coalescidas.
+
+As atualizações em lote (PUT /chamados/bulk) usam o mesmo pool para
+enviar os PUTs individuais simultaneamente.
+
+O paralelismo é limitado por um pool compartilhado (BATCH_MAX_WORKERS),
+que não deve passar do pool de conexões com a API (API_POOL_MAXSIZE). Com o
+servidor gevent (serve.py) as threads do pool são greenlets.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from flask import copy_current_request_context
+
+from config import Config
+from services.api_client import caller_scope
+from services.cache import cached_get, get_cache
+
+
+class ResultadoLote:
+    """Resultado da busca de um lote de IDs"""
+
+    def __init__(self):
+        # ID -> dados da API, para os encontrados
+        self.encontrados = {}
+        self.nao_encontrados = []
+        # IDs que a API não conseguiu responder (rede, timeout, 5xx)
+        self.falhas = []
+        # Primeira resposta 401/403: o chamador não pode ver os itens
+        self.negado = None
+        self.stale = False
+        self.locais = 0
+        # IDs respondidos pela API nesta busca (fora do cache local), em ordem
+        self.buscados = []
+
+
+def ler_ids(dados, maximo):
+    """
+    IDs do corpo da requisição ({'ids': [...]} ou a lista direto), sem repetições.
+
+    Returns:
+        list: IDs inteiros na ordem recebida
+
+    Raises:
+        ValueError: Se o corpo não tiver uma lista de IDs inteiros ou passar do máximo
+    """
+    ids = dados.get('ids') if isinstance(dados, dict) else dados
+    if not isinstance(ids, list):
+        raise ValueError("Envie os IDs em uma lista: {'ids': [1, 2, 3]}.")
+    unicos = {}
+    for valor in ids:
+        if isinstance(valor, bool):
+            raise ValueError('IDs devem ser números inteiros.')
+        try:
+            unicos.setdefault(int(valor), None)
+        except (TypeError, ValueError):
+            raise ValueError('IDs devem ser números inteiros.')
+    if len(unicos) > maximo:
+        raise ValueError(f'Máximo de {maximo} IDs por requisição.')
+    return list(unicos)
+
+
+def executar_em_paralelo(funcao, itens):
+    """
+    funcao(item) para cada item no pool compartilhado, com o contexto da requisição.
+
+    Returns:
+        list: Resultados na ordem dos itens
+    """
+    itens = list(itens)
+    if len(itens) <= 1:
+        return [funcao(item) for item in itens]
+    # Cada tarefa roda com uma cópia do contexto da requisição (headers do chamador)
+    futuros = [get_executor().submit(copy_current_request_context(funcao), item) for item in itens]
+    return [futuro.result() for futuro in futuros]
+
+
+def buscar_lote(namespace, caminho, ids, buscar_local=None):
+    """
+    Busca vários itens por ID, usando o cache e a API do Azure em paralelo.
+
+    Precisa de um contexto de requisição (o Authorization do chamador é
+    repassado em cada busca).
+
+    Args:
+        namespace (str): Coleção do cache ('chamados', 'usuarios')
+        caminho (str): Caminho do GET individual com {id}, ex: '/api/Chamados/{id}'
+        ids (list): IDs inteiros, sem repetições
+        buscar_local (callable): buscar_local(id) -> dados ou None; consultado
+            antes da API (ex: a lista de chamados já em cache)
+
+    Returns:
+        ResultadoLote
+    """
+    resultado = ResultadoLote()
+    cache = get_cache()
+    escopo = caller_scope()
+
+    faltando = []
+    for item_id in ids:
+        em_cache = cache.get((namespace, caminho.format(id=item_id), escopo))
+        if em_cache is not None:
+            resultado.encontrados[item_id] = em_cache.data
+            resultado.locais += 1
+            continue
+        local = buscar_local(item_id) if buscar_local is not None else None
+        if local is not None:
+            resultado.encontrados[item_id] = local
+            resultado.locais += 1
+        else:
+            faltando.append(item_id)
+
+    if not faltando:
+        return resultado
+
+    def buscar(item_id):
+        try:
+            return cached_get(namespace, caminho.format(id=item_id))
+        except requests.exceptions.RequestException:
+            return None
+
+    for item_id, result in zip(faltando, executar_em_paralelo(buscar, faltando)):
+        if result is None or result.status_code >= 500:
+            resultado.falhas.append(item_id)
+        elif result.status_code == 200:
+            resultado.encontrados[item_id] = result.data
+            resultado.stale = resultado.stale or result.stale
+            if not result.stale:
+                resultado.buscados.append(item_id)
+        elif result.status_code == 404:
+            resultado.nao_encontrados.append(item_id)
+        elif result.status_code in (401, 403):
+            resultado.negado = resultado.negado or result
+        else:
+            resultado.falhas.append(item_id)
+    return resultado
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def init_app(app):
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = ThreadPoolExecutor(
+            max_workers=app.config.get('BATCH_MAX_WORKERS', 8), thread_name_prefix='lote')
+    app.extensions['lote_executor'] = _executor
+    return _executor
+
+
+def get_executor():
+    """Retorna o pool compartilhado (criado com Config se init_app não foi chamado)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=Config.BATCH_MAX_WORKERS, thread_name_prefix='lote')
+    return _executor
@@ -0,0 +1,295 @@
+"""
+Métricas do backend no formato texto do Prometheus (GET /metrics)
+
+- helpwave_http_requests_total / helpwave_http_request_duration_seconds:
+  contagem e latência por rota (regra do Flask, não o caminho com IDs),
+  método e status.
+- helpwave_upstream_requests_total / helpwave_upstream_request_duration_seconds:
+  chamadas à API do Azure por endpoint (mesmo agrupamento do circuit breaker)
+  e resultado ('2xx', '4xx', '5xx', 'error', 'circuit_open').
+- helpwave_stage_duration_seconds: etapas internas medidas com medir(),
+  ex: conversão do JSON da API e geração de sugestões do Gemini.
+- helpwave_gemini_jobs*: profundidade e resultados da fila de sugestões.
+- helpwave_gemini_model_*: disponibilidade, gerações e latência média por
+  modelo do Gemini.
+- helpwave_gemini_cache_*: acertos (exatos e por similaridade) e tamanho do
+  cache persistente de sugestões.
+- Cache, single-flight e circuit breakers são lidos dos seus stats() no
+  momento da coleta, sem custo nas requisições.
+
+Sem dependências externas: contadores e histogramas simples protegidos por lock.
+"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, request
+
+
+# Limites dos histogramas (segundos), de respostas em cache até chamadas ao Gemini
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+ESTADOS_BREAKER = {'closed': 0, 'half_open': 1, 'open': 2}
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _rotulos(nomes, valores, extra=None):
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+class Counter:
+    def __init__(self, nome, descricao, rotulos=()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *valores, quantidade=1):
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + quantidade
+
+    def render(self):
+        linhas = [f'# HELP {self.nome} {self.descricao}', f'# TYPE {self.nome} counter']
+        with self._lock:
+            itens = sorted(self._valores.items())
+        for valores, total in itens:
+            linhas.append(f'{self.nome}{_rotulos(self.rotulos, valores)} {total}')
+        return linhas
+
+
+class Histogram:
+    def __init__(self, nome, descricao, rotulos=(), buckets=BUCKETS):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self.buckets = tuple(buckets)
+        # rótulos -> [contagem por bucket..., soma, total]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, segundos, *valores):
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [0] * len(self.buckets) + [0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if segundos <= limite:
+                    serie[i] += 1
+                    break
+            serie[-2] += segundos
+            serie[-1] += 1
+
+    def render(self):
+        linhas = [f'# HELP {self.nome} {self.descricao}', f'# TYPE {self.nome} histogram']
+        with self._lock:
+            itens = sorted((valores, list(serie)) for valores, serie in self._series.items())
+        for valores, serie in itens:
+            acumulado = 0
+            for limite, quantidade in zip(self.buckets, serie):
+                acumulado += quantidade
+                le = _rotulos(self.rotulos, valores, f'le="{limite}"')
+                linhas.append(f'{self.nome}_bucket{le} {acumulado}')
+            le = _rotulos(self.rotulos, valores, 'le="+Inf"')
+            linhas.append(f'{self.nome}_bucket{le} {serie[-1]}')
+            linhas.append(f'{self.nome}_sum{_rotulos(self.rotulos, valores)} {serie[-2]:.6f}')
+            linhas.append(f'{self.nome}_count{_rotulos(self.rotulos, valores)} {serie[-1]}')
+        return linhas
+
+
+def _gauge(nome, descricao, amostras, tipo='gauge'):
+    """amostras: lista de (dict de rótulos, valor)"""
+    linhas = [f'# HELP {nome} {descricao}', f'# TYPE {nome} {tipo}']
+    for rotulos, valor in amostras:
+        linhas.append(f'{nome}{_rotulos(rotulos.keys(), rotulos.values())} {valor}')
+    return linhas
+
+
+http_requests = Counter(
+    'helpwave_http_requests_total', 'Requisições atendidas pelo backend',
+    ('route', 'method', 'status'),
+)
+http_duration = Histogram(
+    'helpwave_http_request_duration_seconds', 'Latência das requisições por rota',
+    ('route', 'method'),
+)
+upstream_requests = Counter(
+    'helpwave_upstream_requests_total', 'Chamadas à API do Azure por endpoint e resultado',
+    ('endpoint', 'outcome'),
+)
+upstream_duration = Histogram(
+    'helpwave_upstream_request_duration_seconds', 'Duração das chamadas à API do Azure',
+    ('endpoint',),
+)
+stage_duration = Histogram(
+    'helpwave_stage_duration_seconds', 'Duração de etapas internas (conversão de JSON, Gemini...)',
+    ('stage',),
+)
+
+
+def observe_upstream(endpoint, segundos, status_code=None, outcome=None):
+    """Registra uma chamada à API do Azure; outcome tem precedência sobre status_code"""
+    if outcome is None:
+        outcome = f'{status_code // 100}xx' if status_code else 'error'
+    upstream_requests.inc(endpoint, outcome)
+    if segundos is not None:
+        upstream_duration.observe(segundos, endpoint)
+
+
+@contextmanager
+def medir(etapa):
+    """Mede a duração do bloco em helpwave_stage_duration_seconds{stage=etapa}"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_duration.observe(time.perf_counter() - inicio, etapa)
+
+
+def _coletar_servicos(app):
+    linhas = []
+
+    cache = app.extensions.get('response_cache')
+    if cache is not None:
+        s = cache.stats()
+        linhas += _gauge('helpwave_cache_entries', 'Entradas no cache de respostas', [({}, s['entries'])])
+        linhas += _gauge('helpwave_cache_bytes', 'Tamanho aproximado do cache de respostas', [({}, s['bytes'])])
+        linhas += _gauge('helpwave_cache_events_total', 'Acessos ao cache de respostas por resultado', [
+            ({'result': 'hit'}, s['hits']),
+            ({'result': 'miss'}, s['misses']),
+            ({'result': 'stale'}, s['stale_hits']),
+            ({'result': 'eviction'}, s['evictions']),
+        ], tipo='counter')
+
+    client = app.extensions.get('api_client')
+    if client is not None:
+        s = client.flight.stats()
+        linhas += _gauge('helpwave_singleflight_inflight', 'GETs à API do Azure em andamento',
+                         [({}, s['inflight'])])
+        linhas += _gauge('helpwave_singleflight_calls_total', 'GETs à API do Azure executados ou coalescidos', [
+            ({'result': 'executed'}, s['executed']),
+            ({'result': 'collapsed'}, s['collapsed']),
+        ], tipo='counter')
+
+        breakers = sorted(client.breakers.stats().items())
+        linhas += _gauge('helpwave_circuit_breaker_state', 'Estado do circuito (0=closed, 1=half_open, 2=open)',
+                         [({'endpoint': e}, ESTADOS_BREAKER.get(b['state'], 0)) for e, b in breakers])
+        linhas += _gauge('helpwave_circuit_breaker_rejected_total', 'Chamadas recusadas com o circuito aberto',
+                         [({'endpoint': e}, b['rejected']) for e, b in breakers], tipo='counter')
+
+    store = app.extensions.get('chamados_store')
+    if store is not None:
+        s = store.stats()
+        linhas += _gauge('helpwave_chamados_store_version', 'Versão atual do store de chamados (/chamados/changes)',
+                         [({}, s['versao'])])
+        linhas += _gauge('helpwave_chamados_store_tombstones', 'Chamados removidos guardados para os deltas',
+                         [({}, s['tombstones'])])
+        linhas += _gauge('helpwave_chamados_store_sync_skipped_total',
+                         'Listas da API ignoradas por queda brusca na quantidade de chamados',
+                         [({}, s['sincronizacoesIgnoradas'])], tipo='counter')
+        linhas += _gauge('helpwave_chamados_store_reappeared_total',
+                         'Chamados removidos que voltaram na lista da API (listas diferentes por usuário?)',
+                         [({}, s['reaparecidos'])], tipo='counter')
+
+    canal = app.extensions.get('eventos_chamados')
+    if canal is not None:
+        s = canal.stats()
+        linhas += _gauge('helpwave_events_subscribers', 'Conexões abertas em /events/chamados',
+                         [({}, s['assinantes'])])
+        linhas += _gauge('helpwave_events_published_total', 'Eventos de chamados publicados',
+                         [({}, s['publicados'])], tipo='counter')
+
+    fila = app.extensions.get('gemini_jobs')
+    if fila is not None:
+        s = fila.stats()
+        linhas += _gauge('helpwave_gemini_jobs', 'Tarefas do Gemini na fila por estado', [
+            ({'state': 'queued'}, s['pendentes']),
+            ({'state': 'running'}, s['executando']),
+        ])
+        linhas += _gauge('helpwave_gemini_jobs_total', 'Tarefas do Gemini finalizadas ou recusadas', [
+            ({'result': 'done'}, s['concluidas']),
+            ({'result': 'error'}, s['erros']),
+            ({'result': 'rejected'}, s['recusadas']),
+        ], tipo='counter')
+        linhas += _gauge('helpwave_gemini_jobs_wait_seconds_avg', 'Espera média na fila até a execução',
+                         [({}, round(s['espera_media'], 6))])
+
+    roteador = app.extensions.get('gemini_modelos')
+    if roteador is not None:
+        modelos = roteador.stats()['modelos']
+        linhas += _gauge('helpwave_gemini_model_available', 'Modelo na lista de genai.list_models (-1: não sondado)',
+                         [({'model': m['modelo']}, -1 if m['disponivel'] is None else int(m['disponivel']))
+                          for m in modelos])
+        linhas += _gauge('helpwave_gemini_model_requests_total', 'Gerações por modelo do Gemini',
+                         [({'model': m['modelo'], 'result': 'ok'}, m['sucessos']) for m in modelos]
+                         + [({'model': m['modelo'], 'result': 'error'}, m['falhas']) for m in modelos],
+                         tipo='counter')
+        linhas += _gauge('helpwave_gemini_model_latency_seconds_avg', 'Latência média móvel das gerações por modelo',
+                         [({'model': m['modelo']}, round(m['latenciaMedia'], 6))
+                          for m in modelos if m['latenciaMedia'] is not None])
+
+    sugestoes = app.extensions.get('gemini_sugestoes')
+    if sugestoes is not None and sugestoes.enabled:
+        s = sugestoes.stats()
+        linhas += _gauge('helpwave_gemini_cache_lookups_total', 'Consultas ao cache de sugestões do Gemini', [
+            ({'result': 'exact'}, s['hits_exatos']),
+            ({'result': 'similar'}, s['hits_similares']),
+            ({'result': 'miss'}, s['misses']),
+        ], tipo='counter')
+        linhas += _gauge('helpwave_gemini_cache_entries', 'Sugestões guardadas no cache',
+                         [({}, s['entradas'])])
+        linhas += _gauge('helpwave_gemini_cache_hit_ratio', 'Fração das consultas atendidas pelo cache',
+                         [({}, round(s['taxa_acerto'], 6))])
+
+    painel = app.extensions.get('stats')
+    if painel is not None:
+        s = painel.stats()
+        linhas += _gauge('helpwave_stats_updates_total', 'Agregados de /api/stats recalculados ou atualizados', [
+            ({'kind': 'rebuild'}, s['reconstrucoes']),
+            ({'kind': 'incremental'}, s['atualizacoes']),
+        ], tipo='counter')
+
+    return linhas
+
+
+def render(app):
+    linhas = []
+    for metrica in (http_requests, http_duration, upstream_requests, upstream_duration, stage_duration):
+        linhas += metrica.render()
+    linhas += _coletar_servicos(app)
+    return '\n'.join(linhas) + '\n'
+
+
+def init_app(app):
+    """Mede todas as rotas e registra GET /metrics"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    @app.before_request
+    def _iniciar_medicao():
+        g.metrics_inicio = time.perf_counter()
+
+    @app.after_request
+    def _registrar_medicao(response):
+        inicio = getattr(g, 'metrics_inicio', None)
+        if inicio is not None:
+            # A regra ('/chamados/<int:chamado_id>') evita uma série por ID;
+            # caminhos inexistentes ficam agrupados
+            rota = request.url_rule.rule if request.url_rule is not None else 'nao_encontrada'
+            http_requests.inc(rota, request.method, str(response.status_code))
+            http_duration.observe(time.perf_counter() - inicio, rota, request.method)
+        return response
+
+    def metrics_endpoint():
+        return Response(render(app), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint, methods=['GET'])
+    # Permite que blueprints fora de 'services' (ex: IAAPI) usem medir() via current_app
+    app.extensions['metrics'] = sys.modules[__name__]
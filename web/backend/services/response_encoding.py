@@ -0,0 +1,177 @@
+"""
+ETag/304 e compressão das respostas JSON do backend
+
+Clientes que consultam a lista de chamados periodicamente recebem a mesma
+resposta na maior parte das vezes. Para as respostas GET 200 em JSON:
+
+- É gerado um ETag forte a partir do hash do conteúdo. Se o cliente enviar
+  If-None-Match com o mesmo valor, a resposta vira um 304 sem corpo.
+- O corpo é comprimido com brotli (se o pacote estiver instalado) ou gzip,
+  conforme o Accept-Encoding do cliente. O ETag da versão comprimida recebe
+  um sufixo ('-br' / '-gzip'), já que é outra representação do recurso.
+
+Respostas em streaming não passam pelo hook; listas grandes usam
+resposta_json_streaming(), que aplica as mesmas regras bloco a bloco.
+"""
+import gzip
+import hashlib
+import zlib
+
+from flask import Response, current_app, request
+
+from services.json_stream import iter_array_json
+
+try:
+    import brotli
+except ImportError:  # Opcional: sem o pacote, apenas gzip
+    brotli = None
+
+
+SUFIXOS = {'br': '-br', 'gzip': '-gzip'}
+
+MIMETYPES_COMPRIMIVEIS = ('application/json', 'text/plain', 'text/html')
+
+
+def etag_do_conteudo(corpo):
+    return hashlib.blake2b(corpo, digest_size=16).hexdigest()
+
+
+def _sem_sufixo(etag):
+    for sufixo in SUFIXOS.values():
+        if etag.endswith(sufixo):
+            return etag[:-len(sufixo)]
+    return etag
+
+
+def _etag_confere(etag):
+    """If-None-Match contém o ETag (em qualquer codificação)?"""
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return False
+    if if_none_match.star_tag:
+        return True
+    return any(_sem_sufixo(tag) == etag for tag in if_none_match.as_set())
+
+
+def escolher_codificacao(accept_encodings):
+    if brotli is not None and accept_encodings.quality('br') > 0:
+        return 'br'
+    if accept_encodings.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def comprimir(corpo, codificacao, nivel_gzip=6, qualidade_brotli=4):
+    if codificacao == 'br':
+        return brotli.compress(corpo, quality=qualidade_brotli)
+    return gzip.compress(corpo, compresslevel=nivel_gzip)
+
+
+def _comprimir_blocos(blocos, codificacao, nivel_gzip, qualidade_brotli):
+    """Compressão incremental de um gerador de bytes"""
+    if codificacao == 'br':
+        compressor = brotli.Compressor(quality=qualidade_brotli)
+        for bloco in blocos:
+            saida = compressor.process(bloco)
+            if saida:
+                yield saida
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+    for bloco in blocos:
+        saida = compressor.compress(bloco)
+        if saida:
+            yield saida
+    yield compressor.flush()
+
+
+def resposta_json_streaming(itens, versao=None, headers=None):
+    """
+    Resposta em streaming (chunked) com os itens serializados como array JSON.
+
+    Args:
+        itens (iterable): Itens da resposta; serializados em blocos
+        versao (str): Identifica o conteúdo (ex: hash da resposta da API + filtros).
+            Se informado, vira o ETag e um If-None-Match igual retorna 304
+            sem serializar nada.
+        headers (dict): Headers adicionais (ex: X-Total-Count)
+    """
+    config = current_app.config
+    etag = None
+    if versao and config.get('ETAG_ENABLED', True):
+        etag = etag_do_conteudo(versao.encode('utf-8'))
+        if _etag_confere(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            _adicionar_vary(response, 'Accept-Encoding', 'Authorization')
+            return response
+
+    blocos = iter_array_json(itens)
+    codificacao = None
+    if config.get('COMPRESS_ENABLED', True):
+        codificacao = escolher_codificacao(request.accept_encodings)
+        if codificacao:
+            blocos = _comprimir_blocos(blocos, codificacao, config.get('COMPRESS_LEVEL', 6),
+                                       config.get('COMPRESS_BROTLI_QUALITY', 4))
+
+    response = Response(blocos, mimetype='application/json', headers=headers)
+    _adicionar_vary(response, 'Accept-Encoding', 'Authorization')
+    if codificacao:
+        response.headers['Content-Encoding'] = codificacao
+    if etag:
+        response.set_etag(etag + SUFIXOS.get(codificacao, ''))
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _adicionar_vary(response, *headers):
+    atuais = {h.strip().lower() for h in response.headers.get('Vary', '').split(',') if h.strip()}
+    for header in headers:
+        if header.lower() not in atuais:
+            response.vary.add(header)
+
+
+def init_app(app):
+    etag_ativo = app.config.get('ETAG_ENABLED', True)
+    compressao_ativa = app.config.get('COMPRESS_ENABLED', True)
+    tamanho_minimo = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    nivel_gzip = app.config.get('COMPRESS_LEVEL', 6)
+    qualidade_brotli = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+
+    @app.after_request
+    def _codificar_resposta(response):
+        if (request.method not in ('GET', 'HEAD') or response.status_code != 200
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in MIMETYPES_COMPRIMIVEIS):
+            return response
+
+        corpo = response.get_data()
+        # Respostas dependem do usuário (Authorization) e da codificação aceita
+        _adicionar_vary(response, 'Accept-Encoding', 'Authorization')
+
+        etag = None
+        if etag_ativo:
+            etag = etag_do_conteudo(corpo)
+            # 'no-cache': o cliente pode guardar, mas revalida com If-None-Match
+            response.headers.setdefault('Cache-Control', 'private, no-cache')
+            if _etag_confere(etag):
+                response.set_data(b'')
+                response.status_code = 304
+                response.set_etag(etag)
+                for header in ('Content-Type', 'Content-Length', 'X-Total-Count'):
+                    response.headers.pop(header, None)
+                return response
+
+        codificacao = None
+        if compressao_ativa and len(corpo) >= tamanho_minimo:
+            codificacao = escolher_codificacao(request.accept_encodings)
+            if codificacao:
+                response.set_data(comprimir(corpo, codificacao, nivel_gzip, qualidade_brotli))
+                response.headers['Content-Encoding'] = codificacao
+
+        if etag:
+            response.set_etag(etag + SUFIXOS.get(codificacao, ''))
+        return response
@@ -0,0 +1,71 @@
+"""
+Coalescência de requisições idênticas (single-flight)
+
+Quando várias requisições pedem o mesmo recurso ao mesmo tempo (ex: todos os
+técnicos abrindo a lista de pendentes no início do turno), apenas a primeira
+chama a API do Azure; as demais aguardam e recebem o mesmo resultado.
+"""
+import threading
+
+
+class _Chamada:
+    __slots__ = ('evento', 'resultado', 'erro', 'aguardando')
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+        self.aguardando = 0
+
+
+class SingleFlight:
+    """Executa no máximo uma chamada por chave ao mesmo tempo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chamadas = {}
+        self.executadas = 0
+        self.coalescidas = 0
+
+    def do(self, key, fn):
+        """
+        Executa fn() ou aguarda a execução em andamento para a mesma chave.
+
+        O resultado (ou a exceção) da execução é repassado a todos os que
+        aguardavam; por isso o valor retornado deve ser tratado como somente leitura.
+        """
+        with self._lock:
+            chamada = self._chamadas.get(key)
+            lider = chamada is None
+            if lider:
+                chamada = _Chamada()
+                self._chamadas[key] = chamada
+                self.executadas += 1
+            else:
+                chamada.aguardando += 1
+                self.coalescidas += 1
+
+        if not lider:
+            chamada.evento.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = fn()
+            return chamada.resultado
+        except BaseException as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self._lock:
+                del self._chamadas[key]
+            chamada.evento.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'inflight': len(self._chamadas),
+                'executed': self.executadas,
+                'collapsed': self.coalescidas,
+            }
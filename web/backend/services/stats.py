@@ -0,0 +1,321 @@
+"""
+Estatísticas agregadas de chamados e usuários para os painéis (GET /api/stats)
+
+Os painéis de relatórios só precisam de contagens, mas baixavam as coleções
+inteiras para contá-las no cliente. Aqui os agregados dos chamados (totais,
+por status, prioridade, tipo e técnico, percentis do tempo de resolução) são
+montados em uma única passada sobre o ChamadosIndex já em cache e guardados
+no PainelEstatisticas.
+
+Enquanto válidos (STATS_TIMEOUT), os agregados não são recalculados: as rotas
+de escrita de chamados repassam o chamado devolvido pela API do Azure e só a
+contribuição dele é trocada. Escritas feitas direto na API (sem passar pelo
+proxy) aparecem quando os agregados vencem.
+"""
+import bisect
+import math
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from config import Config
+from services.chamados_index import parse_data
+from services.dto import CHAMADO_CHAVES, USUARIO_RESUMO
+from services.user_profiles import remember_many
+
+
+# Enums da API (StatusChamado, PrioridadeChamado, PermissaoUsuario) -> chave na resposta
+STATUS = {1: 'aberto', 2: 'emAtendimento', 3: 'fechado'}
+PRIORIDADES = {1: 'baixa', 2: 'media', 3: 'alta'}
+PERMISSOES = {1: 'colaborador', 2: 'suporte', 3: 'admin'}
+STATUS_FECHADO = 3
+
+PERCENTIS = (50, 90, 95, 99)
+
+
+def percentil(ordenados, p):
+    """Percentil p (nearest-rank) de uma lista já ordenada, ou None se vazia"""
+    if not ordenados:
+        return None
+    posicao = max(math.ceil(p / 100 * len(ordenados)) - 1, 0)
+    return ordenados[posicao]
+
+
+def _contagem(contador, nomes):
+    """Contagem com todas as chaves conhecidas (zeradas) e as desconhecidas como vieram"""
+    saida = {nome: 0 for nome in nomes.values()}
+    for valor, total in contador.items():
+        if total:
+            saida[nomes.get(valor, str(valor))] = total
+    return saida
+
+
+def _tecnico(chamado):
+    tecnico = chamado.get('tecnicoResponsavel') or chamado.get('TecnicoResponsavel')
+    if isinstance(tecnico, dict):
+        return tecnico.get('nome') or tecnico.get('Nome')
+    return None
+
+
+class _Resumo:
+    """Contribuição de um chamado para os agregados"""
+
+    __slots__ = ('status', 'prioridade', 'tipo', 'tecnico_id', 'resolucao')
+
+    def __init__(self, chaves, abertura):
+        self.status = chaves['status']
+        self.prioridade = chaves['prioridade']
+        self.tipo = chaves['tipo']
+        self.tecnico_id = chaves['tecnicoResponsavelId']
+        self.resolucao = None
+        if self.status == STATUS_FECHADO and abertura is not None:
+            fechamento = parse_data(chaves['dataFechamento'])
+            if fechamento is not None and fechamento >= abertura:
+                self.resolucao = (fechamento - abertura).total_seconds()
+
+
+class EstatisticasChamados:
+    """Agregados dos chamados, atualizáveis chamado a chamado"""
+
+    def __init__(self):
+        self._resumos = {}
+        self.por_status = Counter()
+        self.por_prioridade = Counter()
+        self.por_tipo = Counter()
+        self.por_tecnico = Counter()
+        self.abertos_por_tecnico = Counter()
+        self.nomes_tecnicos = {}
+        self.sem_id = 0
+        # Tempos de resolução (segundos) em ordem crescente
+        self._resolucoes = []
+
+    @classmethod
+    def de_index(cls, index):
+        """Monta os agregados em uma passada pelas entradas de um ChamadosIndex"""
+        estatisticas = cls()
+        for entrada in index.entradas:
+            estatisticas._somar(entrada.chaves, entrada.abertura, entrada.chamado, ordenar=False)
+        estatisticas._resolucoes.sort()
+        return estatisticas
+
+    @property
+    def total(self):
+        return len(self._resumos) + self.sem_id
+
+    def atualizar(self, chamado):
+        """
+        Troca a contribuição de um chamado criado ou alterado.
+
+        Returns:
+            bool: False se o chamado não tiver ID (os agregados não foram alterados)
+        """
+        chaves = CHAMADO_CHAVES.normalizar(chamado)
+        if chaves['id'] is None:
+            return False
+        self._remover(chaves['id'])
+        self._somar(chaves, parse_data(chaves['dataAbertura']), chamado)
+        return True
+
+    def _somar(self, chaves, abertura, chamado, ordenar=True):
+        resumo = _Resumo(chaves, abertura)
+        if chaves['id'] is None:
+            self.sem_id += 1
+        else:
+            self._resumos[chaves['id']] = resumo
+
+        self.por_status[resumo.status] += 1
+        self.por_prioridade[resumo.prioridade] += 1
+        if resumo.tipo:
+            self.por_tipo[resumo.tipo] += 1
+        if resumo.tecnico_id is not None:
+            self.por_tecnico[resumo.tecnico_id] += 1
+            if resumo.status != STATUS_FECHADO:
+                self.abertos_por_tecnico[resumo.tecnico_id] += 1
+            nome = _tecnico(chamado)
+            if nome:
+                self.nomes_tecnicos[resumo.tecnico_id] = nome
+        if resumo.resolucao is not None:
+            if ordenar:
+                bisect.insort(self._resolucoes, resumo.resolucao)
+            else:
+                self._resolucoes.append(resumo.resolucao)
+
+    def _remover(self, chamado_id):
+        resumo = self._resumos.pop(chamado_id, None)
+        if resumo is None:
+            return
+        self.por_status[resumo.status] -= 1
+        self.por_prioridade[resumo.prioridade] -= 1
+        if resumo.tipo:
+            self.por_tipo[resumo.tipo] -= 1
+        if resumo.tecnico_id is not None:
+            self.por_tecnico[resumo.tecnico_id] -= 1
+            if resumo.status != STATUS_FECHADO:
+                self.abertos_por_tecnico[resumo.tecnico_id] -= 1
+        if resumo.resolucao is not None:
+            posicao = bisect.bisect_left(self._resolucoes, resumo.resolucao)
+            if posicao < len(self._resolucoes) and self._resolucoes[posicao] == resumo.resolucao:
+                del self._resolucoes[posicao]
+
+    def resumo(self):
+        """Agregados no formato da resposta de /api/stats"""
+        resolucoes = self._resolucoes
+        tempo = {'amostras': len(resolucoes), 'media': None}
+        if resolucoes:
+            tempo['media'] = round(sum(resolucoes) / len(resolucoes) / 3600, 2)
+        for p in PERCENTIS:
+            valor = percentil(resolucoes, p)
+            tempo[f'p{p}'] = round(valor / 3600, 2) if valor is not None else None
+
+        tecnicos = [
+            {
+                'tecnicoId': tecnico_id,
+                'nome': self.nomes_tecnicos.get(tecnico_id),
+                'total': total,
+                'emAberto': self.abertos_por_tecnico[tecnico_id],
+            }
+            for tecnico_id, total in self.por_tecnico.most_common() if total
+        ]
+
+        return {
+            'total': self.total,
+            'porStatus': _contagem(self.por_status, STATUS),
+            'porPrioridade': _contagem(self.por_prioridade, PRIORIDADES),
+            'porTipo': {tipo: total for tipo, total in self.por_tipo.most_common() if total},
+            'porTecnico': tecnicos,
+            'semTecnico': self.total - sum(self.por_tecnico.values()),
+            'tempoResolucaoHoras': tempo,
+        }
+
+
+def resumo_usuarios(dados):
+    """
+    Normaliza a resposta de GET /api/Usuarios e conta os usuários por permissão.
+
+    Usado como transform do cache: a normalização, a contagem e o
+    preenchimento do cache de perfis do login são feitos uma vez por resposta
+    da API, não a cada requisição.
+
+    Returns:
+        dict: {'total', 'usuarios', 'porPermissao'}
+    """
+    # A resposta pode vir como lista ou como dict com 'data'
+    if isinstance(dados, dict) and 'data' in dados:
+        dados = dados['data']
+    usuarios = USUARIO_RESUMO.normalizar_lista(dados if isinstance(dados, list) else [])
+    por_permissao = Counter(usuario['permissao'] for usuario in usuarios)
+    remember_many(usuarios)
+    return {
+        'total': len(usuarios),
+        'usuarios': usuarios,
+        'porPermissao': {nome: por_permissao[valor] for valor, nome in PERMISSOES.items()},
+    }
+
+
+class PainelEstatisticas:
+    """
+    Agregados de chamados compartilhados entre requisições.
+
+    Os chamados de GET /api/Chamados são os mesmos para qualquer usuário
+    autenticado, então os agregados não dependem do chamador; quem chama
+    continua validado pela API do Azure antes de recebê-los.
+    """
+
+    def __init__(self, ttl=300, enabled=True):
+        self.ttl = ttl
+        self.enabled = enabled
+        self._chamados = None
+        self._gerado_em = None
+        self._expira_em = 0
+        # Incrementada a cada escrita; agregados montados de dados anteriores a ela não são guardados
+        self._geracao = 0
+        self._lock = threading.Lock()
+        self.reconstrucoes = 0
+        self.atualizacoes = 0
+
+    def geracao(self):
+        return self._geracao
+
+    def chamados(self):
+        """Resumo atual dos chamados, ou None se vencido/ausente"""
+        with self._lock:
+            if self._chamados is None or self._expira_em <= time.monotonic():
+                return None
+            return self._resumo_locked()
+
+    def carregar_chamados(self, index, geracao=None, guardar=True):
+        """
+        Monta os agregados a partir de um ChamadosIndex e devolve o resumo.
+
+        Não guarda se houve escrita desde geracao (o index pode não incluí-la)
+        ou se guardar for False (ex: resposta vencida servida do cache).
+        """
+        estatisticas = EstatisticasChamados.de_index(index)
+        gerado_em = datetime.now(timezone.utc)
+        with self._lock:
+            self.reconstrucoes += 1
+            if (self.enabled and guardar
+                    and (geracao is None or geracao == self._geracao)):
+                self._chamados = estatisticas
+                self._gerado_em = gerado_em
+                self._expira_em = time.monotonic() + self.ttl
+                return self._resumo_locked()
+        resumo = estatisticas.resumo()
+        resumo['geradoEm'] = gerado_em.isoformat()
+        return resumo
+
+    def registrar_chamado(self, chamado):
+        """Aplica um chamado criado/alterado (resposta da API) aos agregados guardados"""
+        with self._lock:
+            self._geracao += 1
+            if self._chamados is None:
+                return
+            if not isinstance(chamado, dict) or not self._chamados.atualizar(chamado):
+                # Sem o chamado completo não há como atualizar: recalcula na próxima consulta
+                self._chamados = None
+                return
+            self.atualizacoes += 1
+
+    def invalidar(self):
+        with self._lock:
+            self._geracao += 1
+            self._chamados = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'reconstrucoes': self.reconstrucoes,
+                'atualizacoes': self.atualizacoes,
+                'chamados': self._chamados.total if self._chamados is not None else 0,
+            }
+
+    def _resumo_locked(self):
+        resumo = self._chamados.resumo()
+        resumo['geradoEm'] = self._gerado_em.isoformat()
+        return resumo
+
+
+_painel = None
+_painel_lock = threading.Lock()
+
+
+def init_app(app):
+    global _painel
+    with _painel_lock:
+        _painel = PainelEstatisticas(
+            ttl=app.config.get('STATS_TIMEOUT', 300),
+            enabled=app.config.get('CACHE_TYPE', 'simple') != 'null',
+        )
+    app.extensions['stats'] = _painel
+    return _painel
+
+
+def get_painel():
+    """Retorna o painel compartilhado (criado com Config se init_app não foi chamado)"""
+    global _painel
+    if _painel is None:
+        with _painel_lock:
+            if _painel is None:
+                _painel = PainelEstatisticas(ttl=Config.STATS_TIMEOUT)
+    return _painel
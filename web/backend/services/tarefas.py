@@ -0,0 +1,396 @@
+"""
+Fila de tarefas em segundo plano (geração de sugestões do Gemini)
+
+A geração pode tentar vários modelos e levar dezenas de segundos; rodando
+dentro da requisição, ela prende um worker do Flask e estoura o timeout dos
+clientes. Aqui as tarefas vão para um pool limitado (GEMINI_MAX_CONCURRENCY
+execuções simultâneas) e a requisição só recebe o ID da tarefa, consultado
+depois em GET /api/gemini/jobs/<id>.
+
+A fila tem tamanho máximo (GEMINI_MAX_QUEUE tarefas pendentes ou em
+execução); acima dele novas tarefas são recusadas, em vez de acumular espera
+sem limite. Tarefas concluídas ficam disponíveis por GEMINI_JOB_TTL segundos.
+
+Com o servidor gevent (serve.py) as threads do pool são greenlets e o cliente
+REST do Gemini coopera com eles. Cada worker do gunicorn executa as tarefas
+que recebeu, mas o estado delas também é gravado em um arquivo SQLite
+(RegistroTarefas, GEMINI_JOBS_PATH), então GET /api/gemini/jobs/<id> responde
+em qualquer worker. Falhas do banco não impedem a execução: a tarefa continua
+consultável no worker de origem e o erro é registrado no log.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDA = 'concluida'
+ERRO = 'erro'
+
+
+class FilaCheiaError(OverflowError):
+    """A fila atingiu o número máximo de tarefas pendentes"""
+
+
+class Tarefa:
+    """Uma execução enviada à fila"""
+
+    __slots__ = ('id', 'tipo', 'estado', 'resultado', 'erro', 'criada_em',
+                 'iniciada_em', 'concluida_em', '_fim')
+
+    def __init__(self, tipo):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.estado = PENDENTE
+        self.resultado = None
+        # Exceção levantada pela função (formatada por quem consulta)
+        self.erro = None
+        self.criada_em = time.time()
+        self.iniciada_em = None
+        self.concluida_em = None
+        self._fim = threading.Event()
+
+    @property
+    def finalizada(self):
+        return self.estado in (CONCLUIDA, ERRO)
+
+    def aguardar(self, timeout=None):
+        """Espera a conclusão por até timeout segundos; True se finalizada"""
+        return self._fim.wait(timeout)
+
+    def resumo(self):
+        return {
+            'jobId': self.id,
+            'tipo': self.tipo,
+            'status': self.estado,
+            'criadaEm': self.criada_em,
+            'iniciadaEm': self.iniciada_em,
+            'concluidaEm': self.concluida_em,
+        }
+
+
+# Intervalo entre as leituras do registro enquanto se espera uma tarefa de outro worker (segundos)
+INTERVALO_CONSULTA = 0.5
+
+# Exceções recriadas com o mesmo tipo ao ler o erro de outro worker (as demais viram Exception)
+_ERROS = {'ValueError': ValueError}
+
+
+class TarefaRemota(Tarefa):
+    """Tarefa executada por outro worker, lida do RegistroTarefas"""
+
+    __slots__ = ('_registro', 'pid')
+
+    def __init__(self, registro, linha):
+        super().__init__(linha['tipo'])
+        self._registro = registro
+        self.id = linha['id']
+        self.pid = linha['pid']
+        self._atualizar(linha)
+
+    def _atualizar(self, linha):
+        self.estado = linha['estado']
+        self.iniciada_em = linha['iniciada_em']
+        self.concluida_em = linha['concluida_em']
+        self.criada_em = linha['criada_em']
+        if linha['resultado'] is not None:
+            self.resultado = json.loads(linha['resultado'])
+        if linha['erro'] is not None:
+            self.erro = _ERROS.get(linha['erro_tipo'], Exception)(linha['erro'])
+        if self.finalizada:
+            self._fim.set()
+
+    def aguardar(self, timeout=None):
+        """Consulta o registro a cada INTERVALO_CONSULTA segundos até a conclusão ou o timeout"""
+        limite = None if timeout is None else time.monotonic() + timeout
+        while not self.finalizada:
+            restante = None if limite is None else limite - time.monotonic()
+            if restante is not None and restante <= 0:
+                break
+            time.sleep(INTERVALO_CONSULTA if restante is None else min(INTERVALO_CONSULTA, restante))
+            linha = self._registro.ler(self.id)
+            if linha is None:
+                break
+            self._atualizar(linha)
+        return self.finalizada
+
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tarefas (
+    id TEXT PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    estado TEXT NOT NULL,
+    resultado TEXT,
+    erro TEXT,
+    erro_tipo TEXT,
+    criada_em REAL NOT NULL,
+    iniciada_em REAL,
+    concluida_em REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tarefas_concluida_em ON tarefas (concluida_em);
+"""
+
+
+class RegistroTarefas:
+    """Estado das tarefas em SQLite, compartilhado pelos workers"""
+
+    def __init__(self, caminho, ttl=600):
+        self.caminho = caminho
+        self.ttl = ttl
+        self._conexao = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.erros = 0
+
+    def _conectar(self):
+        """Conexão do processo atual (reaberta após fork dos workers); chamar com o lock"""
+        if self._conexao is None or self._pid != os.getpid():
+            conexao = sqlite3.connect(self.caminho, timeout=5, check_same_thread=False, isolation_level=None)
+            conexao.row_factory = sqlite3.Row
+            if self.caminho != ':memory:':
+                conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.executescript(_ESQUEMA)
+            self._conexao, self._pid = conexao, os.getpid()
+        return self._conexao
+
+    def gravar(self, tarefa):
+        """Grava o estado atual da tarefa (inserida na criação, atualizada a cada mudança)"""
+        resultado, erro, erro_tipo = None, None, None
+        if tarefa.resultado is not None:
+            resultado = json.dumps(tarefa.resultado, ensure_ascii=False, default=str)
+        if tarefa.erro is not None:
+            erro, erro_tipo = str(tarefa.erro), type(tarefa.erro).__name__
+        try:
+            with self._lock:
+                db = self._conectar()
+                db.execute(
+                    'INSERT OR REPLACE INTO tarefas (id, tipo, pid, estado, resultado, erro, erro_tipo, '
+                    'criada_em, iniciada_em, concluida_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (tarefa.id, tarefa.tipo, os.getpid(), tarefa.estado, resultado, erro, erro_tipo,
+                     tarefa.criada_em, tarefa.iniciada_em, tarefa.concluida_em))
+                if tarefa.estado == PENDENTE:
+                    self._descartar(db)
+        except sqlite3.Error as e:
+            self.erros += 1
+            logger.warning('Falha ao gravar a tarefa %s no registro: %s', tarefa.id, e)
+
+    def _descartar(self, db):
+        """Remove as finalizadas há mais de ttl segundos e as que um worker encerrado deixou para trás"""
+        agora = time.time()
+        db.execute('DELETE FROM tarefas WHERE concluida_em <= ?', (agora - self.ttl,))
+        db.execute('DELETE FROM tarefas WHERE concluida_em IS NULL AND criada_em <= ?', (agora - 24 * 3600,))
+
+    def ler(self, tarefa_id):
+        """Linha da tarefa (sqlite3.Row), ou None se não existir, tiver expirado ou o banco falhar"""
+        try:
+            with self._lock:
+                return self._conectar().execute(
+                    'SELECT * FROM tarefas WHERE id = ? AND (concluida_em IS NULL OR concluida_em > ?)',
+                    (tarefa_id, time.time() - self.ttl)).fetchone()
+        except sqlite3.Error as e:
+            self.erros += 1
+            logger.warning('Falha ao consultar a tarefa %s no registro: %s', tarefa_id, e)
+            return None
+
+    def obter(self, tarefa_id):
+        linha = self.ler(tarefa_id)
+        return TarefaRemota(self, linha) if linha is not None else None
+
+    def posicao(self, tarefa):
+        """Tarefas pendentes do mesmo worker criadas antes desta"""
+        try:
+            with self._lock:
+                return self._conectar().execute(
+                    'SELECT COUNT(*) FROM tarefas WHERE pid = ? AND estado = ? AND criada_em < ?',
+                    (tarefa.pid, PENDENTE, tarefa.criada_em)).fetchone()[0]
+        except sqlite3.Error as e:
+            self.erros += 1
+            logger.warning('Falha ao consultar a fila no registro: %s', e)
+            return 0
+
+
+class FilaTarefas:
+    """Pool limitado com registro das tarefas por ID"""
+
+    def __init__(self, max_concorrencia=4, max_fila=100, ttl=600, nome='tarefas', registro=None):
+        self.max_concorrencia = max_concorrencia
+        self.max_fila = max_fila
+        self.ttl = ttl
+        # RegistroTarefas: torna as tarefas consultáveis pelos outros workers (None: só neste processo)
+        self.registro = registro
+        self._executor = ThreadPoolExecutor(max_workers=max_concorrencia, thread_name_prefix=nome)
+        # ID -> Tarefa, em ordem de criação
+        self._tarefas = OrderedDict()
+        self._lock = threading.Lock()
+        self.pendentes = 0
+        self.executando = 0
+        self.concluidas = 0
+        self.erros = 0
+        self.recusadas = 0
+        # Soma dos tempos de espera na fila (segundos), para a média nas métricas
+        self.espera_total = 0.0
+
+    def enviar(self, tipo, funcao, *args, **kwargs):
+        """
+        Agenda funcao(*args, **kwargs) e retorna a Tarefa sem esperar.
+
+        Raises:
+            FilaCheiaError: Se já houver max_fila tarefas pendentes ou em execução
+        """
+        tarefa = Tarefa(tipo)
+        with self._lock:
+            self._descartar_antigas()
+            if self.pendentes + self.executando >= self.max_fila:
+                self.recusadas += 1
+                raise FilaCheiaError(f'Fila de {tipo} cheia ({self.max_fila} tarefas)')
+            self.pendentes += 1
+            self._tarefas[tarefa.id] = tarefa
+        if self.registro is not None:
+            self.registro.gravar(tarefa)
+        self._executor.submit(self._executar, tarefa, funcao, args, kwargs)
+        return tarefa
+
+    def _executar(self, tarefa, funcao, args, kwargs):
+        with self._lock:
+            self.pendentes -= 1
+            self.executando += 1
+            tarefa.estado = EXECUTANDO
+            tarefa.iniciada_em = time.time()
+            self.espera_total += tarefa.iniciada_em - tarefa.criada_em
+        if self.registro is not None:
+            self.registro.gravar(tarefa)
+        resultado, erro = None, None
+        try:
+            resultado = funcao(*args, **kwargs)
+        except Exception as e:
+            erro = e
+        except BaseException as e:
+            # gevent.Timeout, GreenletExit, SystemExit: a tarefa termina com erro e a exceção segue
+            erro = RuntimeError(f'Execução interrompida ({type(e).__name__})')
+            raise
+        finally:
+            with self._lock:
+                self.executando -= 1
+                tarefa.resultado = resultado
+                tarefa.erro = erro
+                tarefa.concluida_em = time.time()
+                if erro is None:
+                    tarefa.estado = CONCLUIDA
+                    self.concluidas += 1
+                else:
+                    tarefa.estado = ERRO
+                    self.erros += 1
+            # Gravado antes de liberar quem espera: a consulta seguinte, em qualquer worker, já vê o fim
+            try:
+                if self.registro is not None:
+                    self.registro.gravar(tarefa)
+            finally:
+                tarefa._fim.set()
+
+    def obter(self, tarefa_id):
+        """
+        Tarefa pelo ID, ou None se não existir (ou já tiver expirado).
+
+        Tarefas enviadas a outro worker vêm do registro (TarefaRemota).
+        """
+        with self._lock:
+            self._descartar_antigas()
+            tarefa = self._tarefas.get(tarefa_id)
+        if tarefa is None and self.registro is not None:
+            tarefa = self.registro.obter(tarefa_id)
+        return tarefa
+
+    def posicao(self, tarefa):
+        """Quantas tarefas pendentes foram criadas antes desta (0 se já começou)"""
+        if tarefa.estado != PENDENTE:
+            return 0
+        if isinstance(tarefa, TarefaRemota):
+            return self.registro.posicao(tarefa)
+        with self._lock:
+            anteriores = 0
+            for outra in self._tarefas.values():
+                if outra is tarefa:
+                    break
+                if outra.estado == PENDENTE:
+                    anteriores += 1
+            return anteriores
+
+    def _descartar_antigas(self):
+        """Remove tarefas finalizadas há mais de ttl segundos; chamar com o lock"""
+        limite = time.time() - self.ttl
+        antigas = [
+            tarefa_id for tarefa_id, tarefa in self._tarefas.items()
+            if tarefa.finalizada and tarefa.concluida_em < limite
+        ]
+        for tarefa_id in antigas:
+            del self._tarefas[tarefa_id]
+
+    def stats(self):
+        with self._lock:
+            iniciadas = self.concluidas + self.erros + self.executando
+            return {
+                'pendentes': self.pendentes,
+                'executando': self.executando,
+                'concluidas': self.concluidas,
+                'erros': self.erros,
+                'recusadas': self.recusadas,
+                'espera_media': self.espera_total / iniciadas if iniciadas else 0.0,
+                'max_concorrencia': self.max_concorrencia,
+            }
+
+
+_fila = None
+_fila_lock = threading.Lock()
+
+
+def _caminho_registro(caminho, caminho_cache):
+    """GEMINI_JOBS_PATH; vazio usa o arquivo do cache de sugestões (GEMINI_CACHE_PATH ou o padrão)"""
+    backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    return caminho or caminho_cache or os.path.join(backend_dir, 'gemini_sugestoes.sqlite3')
+
+
+def init_app(app):
+    global _fila
+    ttl = app.config.get('GEMINI_JOB_TTL', 600)
+    with _fila_lock:
+        _fila = FilaTarefas(
+            max_concorrencia=app.config.get('GEMINI_MAX_CONCURRENCY', 4),
+            max_fila=app.config.get('GEMINI_MAX_QUEUE', 100),
+            ttl=ttl,
+            nome='gemini',
+            registro=RegistroTarefas(_caminho_registro(
+                app.config.get('GEMINI_JOBS_PATH'), app.config.get('GEMINI_CACHE_PATH')), ttl=ttl),
+        )
+    # O blueprint do Gemini (IAAPI) acessa a fila via current_app.extensions
+    app.extensions['gemini_jobs'] = _fila
+    return _fila
+
+
+def get_fila():
+    """Retorna a fila compartilhada (criada com Config se init_app não foi chamado)"""
+    global _fila
+    if _fila is None:
+        with _fila_lock:
+            if _fila is None:
+                _fila = FilaTarefas(
+                    max_concorrencia=Config.GEMINI_MAX_CONCURRENCY,
+                    max_fila=Config.GEMINI_MAX_QUEUE,
+                    ttl=Config.GEMINI_JOB_TTL,
+                    nome='gemini',
+                    registro=RegistroTarefas(
+                        _caminho_registro(Config.GEMINI_JOBS_PATH, Config.GEMINI_CACHE_PATH),
+                        ttl=Config.GEMINI_JOB_TTL,
+                    ),
+                )
+    return _fila
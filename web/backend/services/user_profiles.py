@@ -0,0 +1,120 @@
+"""
+Cache de perfis de usuário por ID
+
+O login precisa de nome, cargo e permissão do usuário, que não vêm no token.
+As rotas de usuários (listagem, consulta por ID, meu perfil) já recebem esses
+dados da API do Azure e os guardam aqui; o login consulta este cache em vez
+de fazer uma segunda chamada à API. Alterações e exclusões de usuário
+invalidam a entrada correspondente.
+"""
+import base64
+import json
+import threading
+
+from config import Config
+from services.cache import ResponseCache
+
+
+# Claim "role" do token (nome do enum PermissaoUsuario) -> valor numérico
+PERMISSOES = {
+    'Colaborador': 1,
+    'SuporteTecnico': 2,
+    'Administrador': 3,
+}
+
+CAMPOS_PERFIL = ('id', 'nome', 'email', 'cargo', 'telefone', 'permissao')
+
+_perfis = None
+_perfis_lock = threading.Lock()
+
+
+def init_app(app):
+    global _perfis
+    with _perfis_lock:
+        _perfis = ResponseCache(
+            max_entries=app.config.get('USER_PROFILE_CACHE_SIZE', 5000),
+            default_ttl=app.config.get('USER_PROFILE_TTL', 120),
+            enabled=app.config.get('CACHE_TYPE', 'simple') != 'null',
+        )
+    app.extensions['user_profiles'] = _perfis
+    return _perfis
+
+
+def _get_perfis():
+    global _perfis
+    if _perfis is None:
+        with _perfis_lock:
+            if _perfis is None:
+                _perfis = ResponseCache(
+                    max_entries=Config.USER_PROFILE_CACHE_SIZE,
+                    default_ttl=Config.USER_PROFILE_TTL,
+                )
+    return _perfis
+
+
+def _chave(user_id):
+    try:
+        return ('perfis', int(user_id), None)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_profile(user_id):
+    """Retorna uma cópia do perfil em cache ou None"""
+    chave = _chave(user_id)
+    perfil = _get_perfis().get(chave) if chave else None
+    return dict(perfil) if perfil else None
+
+
+def remember(usuario):
+    """Guarda um perfil já normalizado (chaves em camelCase, com 'id')"""
+    chave = _chave(usuario.get('id'))
+    if chave:
+        _get_perfis().set(chave, {campo: usuario.get(campo) for campo in CAMPOS_PERFIL})
+
+
+def remember_many(usuarios):
+    for usuario in usuarios:
+        remember(usuario)
+
+
+def forget(user_id=None):
+    """Remove um perfil (ou todos, se user_id for None)"""
+    if user_id is None:
+        _get_perfis().clear()
+        return
+    chave = _chave(user_id)
+    if chave:
+        _get_perfis().invalidate('perfis', chave[1])
+
+
+def token_claims(token):
+    """
+    Lê o payload de um JWT sem validar a assinatura (a API do Azure valida).
+
+    Aceita o token puro ou o valor do header Authorization ('Bearer ...').
+    Retorna {} se o token for inválido.
+    """
+    if not token:
+        return {}
+    if token.startswith('Bearer '):
+        token = token[len('Bearer '):]
+    parts = token.split('.')
+    if len(parts) < 2:
+        return {}
+    try:
+        padded = parts[1] + '==='  # padding para base64url
+        return json.loads(base64.urlsafe_b64decode(padded).decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        return {}
+
+
+def permissao_from_role(role, default=1):
+    """Converte o claim role (nome ou número) para o valor numérico da permissão"""
+    if role is None:
+        return default
+    if isinstance(role, int):
+        return role
+    if str(role).isdigit():
+        return int(role)
+    return PERMISSOES.get(str(role), default)
@@ -369,6 +369,15 @@ export const userService = {
     }
   },
 
+  /**
+   * Obtém vários usuários em uma requisição (servidos do cache do backend quando possível)
+   * @param {Array<number>} userIds - IDs dos usuários (máximo 200)
+   * @returns {Promise<{usuarios: Array, naoEncontrados: Array, falhas: Array}>}
+   */
+  async getUsersBatch(userIds) {
+    return await apiClient.post('/api/Usuarios/batch', { ids: userIds });
+  },
+
   /**
    * Atualiza dados do usuário
    */
@@ -416,6 +425,15 @@ export const ticketService = {
     return await apiClient.get(`/chamados/${ticketId}`);
   },
 
+  /**
+   * Obtém vários tickets em uma requisição (servidos do cache do backend quando possível)
+   * @param {Array<number>} ticketIds - IDs dos tickets (máximo 200)
+   * @returns {Promise<{chamados: Array, naoEncontrados: Array, falhas: Array}>}
+   */
+  async getTicketsBatch(ticketIds) {
+    return await apiClient.post('/chamados/batch', { ids: ticketIds });
+  },
+
   /**
    * Atualiza um ticket
    */
@@ -423,14 +441,107 @@ export const ticketService = {
     return await apiClient.put(`/chamados/${ticketId}`, ticketData);
   },
 
+  /**
+   * Atualiza vários tickets de uma vez (ex: fechar ou atribuir em massa)
+   * @param {Array<{id: number, fields: Object}>} updates - Campos a alterar em cada ticket
+   * @returns {Promise<{atualizados: number, falhas: number, resultados: Array}>} Resultado por ticket
+   */
+  async bulkUpdateTickets(updates) {
+    return await apiClient.put('/chamados/bulk', { chamados: updates });
+  },
+
   /**
    * Remove um ticket
    */
   async deleteTicket(ticketId) {
     return await apiClient.delete(`/chamados/${ticketId}`);
+  },
+
+  /**
+   * Obtém apenas os tickets criados/alterados (e IDs removidos) desde uma versão
+   * @param {number|null} since - Campo `versao` da resposta anterior (null na primeira chamada)
+   * @returns {Promise<{versao: number, completo: boolean, chamados: Array, removidos: Array}>}
+   */
+  async getTicketChanges(since = null) {
+    const endpoint = since == null ? '/chamados/changes' : `/chamados/changes?since=${since}`;
+    return await apiClient.get(endpoint);
   }
 };
 
+/**
+ * Aplica um delta de getTicketChanges a uma lista local de tickets
+ * @param {Array} tickets - Lista atual (não é modificada)
+ * @param {Object} delta - Resposta de getTicketChanges
+ * @returns {Array} Nova lista de tickets
+ */
+export const applyTicketChanges = (tickets, delta) => {
+  const porId = new Map(delta.completo ? [] : (tickets || []).map((t) => [t.id, t]));
+  (delta.removidos || []).forEach((id) => porId.delete(id));
+  (delta.chamados || []).forEach((t) => porId.set(t.id, t));
+  return Array.from(porId.values());
+};
+
+/**
+ * Assina os eventos de tickets (GET /events/chamados, Server-Sent Events)
+ * @param {Function} onEvent - Recebe {tipo, versao, id, chamado} a cada ticket criado/alterado/removido
+ * @param {Function} onReset - Chamada quando mudanças foram perdidas e a lista deve ser recarregada
+ * @returns {Function} Função que encerra a assinatura
+ */
+export const subscribeTicketEvents = (onEvent, onReset = () => {}) => {
+  let source = null;
+  let encerrada = false;
+  let ultimoId = null;
+  let reconexao = null;
+
+  const conectar = async () => {
+    // EventSource não envia headers: o token é trocado por um bilhete de uso único
+    // (o token nunca vai na URL, que aparece nos logs de acesso)
+    let bilhete;
+    try {
+      ({ bilhete } = await apiClient.post('/events/chamados/bilhete', {}));
+    } catch (error) {
+      // 401 já leva ao login; outras falhas tentam de novo
+      if (error.status !== 401 && !encerrada) {
+        reconexao = setTimeout(conectar, 5000);
+      }
+      return;
+    }
+    if (encerrada) return;
+
+    const params = new URLSearchParams({ bilhete });
+    if (ultimoId) params.set('lastEventId', ultimoId);
+    source = new EventSource(`${API_BASE_URL}/events/chamados?${params}`);
+    source.addEventListener('chamado', (e) => {
+      ultimoId = e.lastEventId || ultimoId;
+      onEvent(JSON.parse(e.data));
+    });
+    source.addEventListener('reset', (e) => {
+      ultimoId = e.lastEventId || ultimoId;
+      onReset();
+    });
+    // Token vencido: não adianta reconectar com o mesmo token
+    source.addEventListener('expirado', () => {
+      encerrada = true;
+      source.close();
+    });
+    // O bilhete já foi usado: a reconexão automática do EventSource seria recusada,
+    // então a conexão é refeita com um bilhete novo (e o último ID recebido)
+    source.onerror = () => {
+      source.close();
+      if (!encerrada) {
+        reconexao = setTimeout(conectar, 5000);
+      }
+    };
+  };
+
+  conectar();
+  return () => {
+    encerrada = true;
+    clearTimeout(reconexao);
+    if (source) source.close();
+  };
+};
+
 /**
  * Serviço para integração com IA (Gemini)
  */
@@ -442,10 +553,39 @@ export const aiService = {
    * @returns {Promise<{sugestao: string}>} Sugestão gerada pela IA
    */
   async gerarSugestao(titulo, descricao) {
-    return await apiClient.post('/api/gemini/sugerir-resposta', {
+    const result = await apiClient.post('/api/gemini/sugerir-resposta', {
       titulo: titulo || '',
       descricao: descricao
     }, false); // Não requer autenticação
+    // Geração demorada: o backend responde 202 com o jobId e o resultado é consultado depois
+    if (result && result.jobId && result.sugestao === undefined) {
+      return await this.aguardarTarefa(result.jobId);
+    }
+    return result;
+  },
+
+  /**
+   * Aguarda uma tarefa de geração (GET /api/gemini/jobs/<id>)
+   * Cada consulta espera até 20s no servidor, então não há polling apertado
+   * @param {string} jobId - ID devolvido no 202
+   * @param {number} limite - Tempo máximo de espera em segundos (o mesmo do cliente desktop)
+   * @returns {Promise<{sugestao: string}>}
+   */
+  async aguardarTarefa(jobId, limite = 300) {
+    const prazo = Date.now() + limite * 1000;
+    for (;;) {
+      const job = await apiClient.get(`/api/gemini/jobs/${jobId}?wait=20`, false);
+      if (job.status === 'concluida') {
+        return { sugestao: job.sugestao };
+      }
+      if (job.status === 'erro') {
+        throw new Error(job.erro || 'Erro ao gerar sugestão');
+      }
+      // Tarefa parada em pendente/executando: não prende a tela para sempre
+      if (Date.now() >= prazo) {
+        throw new Error('Sugestão ainda em geração; tente novamente mais tarde.');
+      }
+    }
   }
 };
 